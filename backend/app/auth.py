@@ -4,6 +4,7 @@ from .db_core import get_session
 from .models import AdminUser
 from .schemas import AdminLogin
 from .utils.security import hash_password, verify_password, create_access_token, decode_access_token
+from .utils.tenancy import current_property_id
 
 router = APIRouter(prefix="/api/auth", tags=["Auth"])
 
@@ -28,7 +29,7 @@ def login(credentials: AdminLogin, session: Session = Depends(get_session)):
     if not admin or not verify_password(credentials.password, admin.password_hash):
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
-    token = create_access_token({"sub": admin.email})
+    token = create_access_token({"sub": admin.email, "role": "admin", "property_id": current_property_id()})
     return {"access_token": token, "token_type": "bearer"}
 
 # ✅ Verify and decode JWT
@@ -1,28 +1,64 @@
 # app/database.py
 from sqlmodel import SQLModel, create_engine, Session
+from sqlalchemy import inspect, literal, text
+from sqlalchemy.exc import DBAPIError, OperationalError
 from dotenv import load_dotenv
 import os
 import logging
+import threading
+import time
+from .utils.metrics import observe_pool_checkout
+from .utils.replicas import DATABASE_REPLICA_URLS, READ_ROUTED, ReplicaSet
 
 # Load .env variables
 load_dotenv()
 
 # Default to SQLite for local testing; change to PostgreSQL when ready
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./roomdb.sqlite")
+FALLBACK_DATABASE_URL = "sqlite:///./roomdb.sqlite"
+# Per-request query accounting lives in utils/query_stats; echo is for local debugging only.
+SQL_ECHO = os.getenv("SQL_ECHO", "false").lower() == "true"
+# Upper bound (seconds) on connecting to a networked database before falling back.
+DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "5"))
+# "true" always runs create_all at startup, "false" never does; unset means
+# only when the resolved database is SQLite (local dev / fallback).
+DB_CREATE_ALL = os.getenv("DB_CREATE_ALL", "").lower()
+
+# Milliseconds spent in each startup phase, logged once the app has booted.
+startup_timings: dict[str, float] = {}
+
+_engine = None
+_engine_lock = threading.Lock()
+# Cleared while a background warm-up runs; sessions wait on it so no request
+# sees the schema half-created.
+_warmed_up = threading.Event()
+_warmed_up.set()
+_replicas = None
+
+
+def _connect_args(url: str) -> dict:
+    if url.startswith("postgres"):
+        return {"connect_timeout": DB_CONNECT_TIMEOUT}
+    if url.startswith("mysql"):
+        return {"connect_timeout": DB_CONNECT_TIMEOUT}
+    return {}
+
 
 def _create_engine_with_fallback(url: str):
     """Try to create an engine for `url`. If connecting fails, fall back to a local SQLite file.
 
     This prevents startup crashes for development machines that don't have the
     production Postgres database available or when the credentials are placeholders.
+    The probe connection is bounded by DB_CONNECT_TIMEOUT so an unreachable host
+    cannot hang the process.
     """
     # If the URL explicitly points to SQLite, just create that engine.
     try:
         if url.startswith("sqlite"):
-            return create_engine(url, echo=True)
+            return create_engine(url, echo=SQL_ECHO)
 
         # For non-SQLite DBs, try to create an engine and connect briefly.
-        engine = create_engine(url, echo=True)
+        engine = create_engine(url, echo=SQL_ECHO, pool_pre_ping=True, connect_args=_connect_args(url))
         try:
             # Try a short-lived connection to validate credentials/availability.
             with engine.connect() as _:
@@ -37,21 +73,181 @@ def _create_engine_with_fallback(url: str):
     except Exception as e:
         logging.warning("Failed to create engine for %s: %s", url, e)
 
-    fallback = "sqlite:///./roomdb.sqlite"
-    logging.info("Using fallback database: %s", fallback)
-    return create_engine(fallback, echo=True)
+    logging.info("Using fallback database: %s", FALLBACK_DATABASE_URL)
+    return create_engine(FALLBACK_DATABASE_URL, echo=SQL_ECHO)
 
 
-# Create the SQLModel engine (with a safe fallback)
-engine = _create_engine_with_fallback(DATABASE_URL)
+def get_engine():
+    """Return the process-wide engine, creating it on first use."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                start = time.perf_counter()
+                engine = _create_engine_with_fallback(DATABASE_URL)
+                observe_pool_checkout(engine.pool)
+                startup_timings["engine_ms"] = (time.perf_counter() - start) * 1000
+                _engine = engine
+    return _engine
+
+
+def get_replicas() -> ReplicaSet:
+    """The read replicas from DATABASE_REPLICA_URLS (see utils/replicas), created on first use.
+
+    Unlike the primary there is no SQLite fallback: an unreachable replica
+    just stays out of rotation until it answers its health check.
+    """
+    global _replicas
+    if _replicas is None:
+        with _engine_lock:
+            if _replicas is None:
+                engines = []
+                for url in DATABASE_REPLICA_URLS:
+                    if url.startswith("sqlite"):
+                        engine = create_engine(url, echo=SQL_ECHO)
+                    else:
+                        engine = create_engine(url, echo=SQL_ECHO, pool_pre_ping=True, connect_args=_connect_args(url))
+                    observe_pool_checkout(engine.pool)
+                    engines.append(engine)
+                _replicas = ReplicaSet(engines)
+    return _replicas
+
+
+def __getattr__(name):
+    # Keeps `from app.db_core import engine` working while deferring creation.
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _sync_schema(engine):
+    """Add columns and indexes that create_all skips on tables that already exist.
+
+    New columns are added as nullable, with the model's scalar or server
+    default when it has one, so existing rows stay valid.
+    """
+    inspector = inspect(engine)
+    quote = engine.dialect.identifier_preparer.quote
+    ddl_compiler = engine.dialect.ddl_compiler(engine.dialect, None)
+    with engine.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {column.type.compile(engine.dialect)}"
+                default = column.default.arg if column.default is not None and column.default.is_scalar else None
+                if default is not None:
+                    rendered = literal(default, column.type).compile(engine.dialect, compile_kwargs={"literal_binds": True})
+                    ddl += f" DEFAULT {rendered}"
+                elif column.server_default is not None:
+                    ddl += f" DEFAULT {ddl_compiler.get_column_default_string(column)}"
+                conn.execute(text(ddl))
+                logging.info("Added column %s.%s", table.name, column.name)
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
 
 
 def init_db():
     """Create all tables defined in SQLModel metadata."""
+    from . import models  # noqa: F401 - register every table before create_all
+    from .utils.guest_search import install_guest_search
+    from .utils.search_index import install_search_index
+    from .utils.tenancy import install_default_property
+
+    start = time.perf_counter()
+    engine = get_engine()
     SQLModel.metadata.create_all(engine)
+    _sync_schema(engine)
+    install_default_property(engine)
+    install_guest_search(engine)
+    install_search_index(engine)
+    startup_timings["schema_ms"] = (time.perf_counter() - start) * 1000
+
+
+def _wants_create_all() -> bool:
+    if DB_CREATE_ALL in ("1", "true", "yes"):
+        return True
+    if DB_CREATE_ALL in ("0", "false", "no"):
+        return False
+    return get_engine().dialect.name == "sqlite"
+
+
+def _warm_up():
+    try:
+        if _wants_create_all():
+            init_db()
+    except Exception:
+        logging.exception("Database warm-up failed")
+    finally:
+        _warmed_up.set()
+    logging.getLogger(__name__).info(
+        "Database ready: engine %.1f ms, schema %s",
+        startup_timings.get("engine_ms", 0.0),
+        f"{startup_timings['schema_ms']:.1f} ms" if "schema_ms" in startup_timings else "skipped",
+    )
+
+
+def startup_db(background: bool = True):
+    """Prepare the database at app startup without blocking on a slow server.
+
+    An explicit DB_CREATE_ALL=true runs schema creation inline; otherwise
+    engine creation (and the SQLite create_all) happens on a daemon thread
+    and request sessions wait for it, so the app can accept connections
+    early without serving from a half-created schema.
+    """
+    if DB_CREATE_ALL in ("1", "true", "yes") or not background:
+        _warm_up()
+        return None
+    _warmed_up.clear()
+    thread = threading.Thread(target=_warm_up, name="db-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+def wait_until_ready():
+    """Block until a background warm-up started by `startup_db` has finished."""
+    _warmed_up.wait()
 
 
 def get_session():
     """Yield a database session for FastAPI dependency injection."""
-    with Session(engine) as session:
+    wait_until_ready()
+    with Session(get_engine()) as session:
         yield session
+
+
+def get_read_session():
+    """Like `get_session`, but bound to a read replica when one is healthy.
+
+    For read-only routes (listings, reports, exports, public lookups) that
+    can tolerate REPLICA_MAX_LAG seconds of staleness. Falls back to the
+    primary when no replica is configured or usable, and for clients that
+    have just written (utils/replicas). Routes that write use `get_session`.
+    """
+    wait_until_ready()
+    replica = get_replicas().pick() if DATABASE_REPLICA_URLS else None
+    if replica is not None:
+        session = Session(replica.engine)
+        try:
+            # Fail over now rather than in the middle of the handler.
+            session.connection()
+        except Exception as e:
+            session.close()
+            replica.failed(e)
+            replica = None
+    if replica is None:
+        READ_ROUTED.inc(target="primary")
+        with Session(get_engine()) as session:
+            yield session
+        return
+    READ_ROUTED.inc(target="replica")
+    with session:
+        try:
+            yield session
+        except DBAPIError as e:
+            if e.connection_invalidated or isinstance(e, OperationalError):
+                replica.failed(e)
+            raise
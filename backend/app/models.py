@@ -1,10 +1,28 @@
 from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
 from datetime import datetime, date
 from typing import Optional
 
-class Booking(SQLModel, table=True):
+from .utils.tenancy import PropertyScoped
+
+class Property(SQLModel, table=True):
+    # One hotel; rows of PropertyScoped tables belong to one (utils/tenancy).
     id: Optional[int] = Field(default=None, primary_key=True)
-    reference_number: str
+    name: str
+    code: str = Field(unique=True)
+    address: Optional[str] = None
+    is_active: bool = True
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class Booking(PropertyScoped, table=True):
+    # (property_id, check_in, check_out) serves "stays spanning a date" lookups as a covered range scan.
+    __table_args__ = (
+        Index("ix_booking_property_stay", "property_id", "check_in", "check_out"),
+        Index("ix_booking_property_check_out", "property_id", "check_out"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    reference_number: str = Field(index=True)
     name: str
     email: str
     phone: Optional[str] = None
@@ -13,12 +31,50 @@ class Booking(SQLModel, table=True):
     check_out: date
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
+# Bookings whose stay ended more than BOOKING_ARCHIVE_DAYS ago, moved out of
+# the hot tables by utils/archive with their ids and references unchanged.
+class ArchivedBooking(PropertyScoped, table=True):
+    __table_args__ = (Index("ix_archivedbooking_property_check_out", "property_id", "check_out"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    reference_number: str = Field(index=True)
+    name: str
+    email: str
+    phone: Optional[str] = None
+    room_type: str
+    check_in: date
+    check_out: date
+    created_at: datetime
+    archived_at: datetime = Field(default_factory=datetime.utcnow)
+
+class ArchivedBookingMeta(PropertyScoped, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    booking_id: int = Field(index=True)
+    status: str = "pending"
+    payment_status: str = "unpaid"
+    payment_proof: Optional[str] = None
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
 class ContactMessage(SQLModel, table=True):
+    # Inbox pages are keyset scans in (created_at, id) order, within one status or across all (utils/inbox).
+    __table_args__ = (
+        Index("ix_contactmessage_status_created", "status", "created_at", "id"),
+        Index("ix_contactmessage_created", "created_at", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str
     email: str
     message: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    status: str = "new"  # new | read | archived
+    read_at: Optional[datetime] = None
+    archived_at: Optional[datetime] = None
+
+class Counter(SQLModel, table=True):
+    # Incrementally maintained aggregates (utils/counters), e.g. unread contact messages.
+    name: str = Field(primary_key=True)
+    value: int = 0
 
 class AdminUser(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -26,7 +82,9 @@ class AdminUser(SQLModel, table=True):
     password_hash: str
 
 # ERP entities
-class Room(SQLModel, table=True):
+class Room(PropertyScoped, table=True):
+    __table_args__ = (Index("ix_room_property_type", "property_id", "room_type"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str
     room_type: str
@@ -37,6 +95,23 @@ class Room(SQLModel, table=True):
     is_available: bool = True
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
+class RateRule(PropertyScoped, table=True):
+    """Adjusts a room type's nightly rate (see utils/rates)."""
+    __table_args__ = (Index("ix_raterule_property_type", "property_id", "room_type"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    room_type: str
+    name: str
+    start_date: Optional[date] = None  # first night covered (open when unset)
+    end_date: Optional[date] = None  # last night covered (open when unset)
+    weekdays: Optional[str] = None  # comma-separated, 0 = Monday; all nights when unset
+    min_nights: int = 1  # only stays at least this long get the rule
+    nightly_rate: Optional[float] = None  # replaces the rate when set
+    multiplier: float = 1.0  # then scales it
+    priority: int = 0  # rules apply in ascending priority
+    is_active: bool = True
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
 class PaymentAccount(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     label: str
@@ -46,15 +121,21 @@ class PaymentAccount(SQLModel, table=True):
     instructions: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
-class BookingMeta(SQLModel, table=True):
+class BookingMeta(PropertyScoped, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    booking_id: int
+    booking_id: int = Field(index=True)
     status: str = "pending"
     payment_status: str = "unpaid"
     payment_proof: Optional[str] = None  # base64 or URL
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
-class StaffMember(SQLModel, table=True):
+class StaffMember(PropertyScoped, table=True):
+    __table_args__ = (
+        Index("ix_staffmember_property_role", "property_id", "role"),
+        Index("ix_staffmember_property_department", "property_id", "department"),
+        Index("ix_staffmember_property_status", "property_id", "status"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str
     email: str
@@ -77,14 +158,20 @@ class StaffMember(SQLModel, table=True):
     password_hash: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
-class StaffDocument(SQLModel, table=True):
+class StaffDocument(PropertyScoped, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     staff_id: int
     name: str
     url: str
     uploaded_at: datetime = Field(default_factory=datetime.utcnow)
 
-class GuestProfile(SQLModel, table=True):
+class GuestProfile(PropertyScoped, table=True):
+    __table_args__ = (
+        Index("ix_guestprofile_property_name_norm", "property_id", "name_norm"),
+        Index("ix_guestprofile_property_email_norm", "property_id", "email_norm"),
+        Index("ix_guestprofile_property_phone_digits", "property_id", "phone_digits"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     guest_name: str
     email: str
@@ -92,17 +179,23 @@ class GuestProfile(SQLModel, table=True):
     preferences: Optional[str] = None  # comma-separated
     notes: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    # Normalised copies for indexed search-as-you-type (see utils/guest_search)
+    name_norm: Optional[str] = None
+    email_norm: Optional[str] = None
+    phone_digits: Optional[str] = None
 
-class GuestReceipt(SQLModel, table=True):
+class GuestReceipt(PropertyScoped, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     guest_id: int
     name: str
     data_url: str
     uploaded_at: datetime = Field(default_factory=datetime.utcnow)
 
-class CheckInRecord(SQLModel, table=True):
+class CheckInRecord(PropertyScoped, table=True):
+    __table_args__ = (Index("ix_checkinrecord_property_status", "property_id", "status"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
-    booking_id: int
+    booking_id: int = Field(index=True)
     guest_name: str
     room_id: str
     room_number: str
@@ -111,7 +204,9 @@ class CheckInRecord(SQLModel, table=True):
     status: str = "expected"
     notes: Optional[str] = None
 
-class HousekeepingTask(SQLModel, table=True):
+class HousekeepingTask(PropertyScoped, table=True):
+    __table_args__ = (Index("ix_housekeepingtask_property_status", "property_id", "status"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     room_id: str
     room_number: str
@@ -119,11 +214,15 @@ class HousekeepingTask(SQLModel, table=True):
     status: str
     priority: str
     assigned_to: str
+    # Set when the scheduler (utils/housekeeping) assigned the task to a staff member.
+    assigned_staff_id: Optional[int] = Field(default=None, index=True)
     description: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
     completed_at: Optional[datetime] = None
 
-class FloorPlanItem(SQLModel, table=True):
+class FloorPlanItem(PropertyScoped, table=True):
+    __table_args__ = (Index("ix_floorplanitem_property_floor", "property_id", "floor"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     room_id: str
     room_number: str
@@ -133,16 +232,37 @@ class FloorPlanItem(SQLModel, table=True):
     height: float
     floor: str = "1"
 
-class InventoryItem(SQLModel, table=True):
+class InventoryItem(PropertyScoped, table=True):
+    __table_args__ = (Index("ix_inventoryitem_property_status", "property_id", "status"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str
     category: str = "general"  # kitchen | bar | general
     quantity: float = 0
     unit: str = "pcs"
-    status: str = "available"  # available | low | out
+    status: str = "available"  # available | low | out, derived from quantity and low_threshold
+    low_threshold: float = 0
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
-class Announcement(SQLModel, table=True):
+class StockMovement(PropertyScoped, table=True):
+    # Append-only ledger of InventoryItem quantity changes (utils/inventory).
+    __table_args__ = (
+        Index("ix_stockmovement_item_id_id", "item_id", "id"),
+        Index("ix_stockmovement_property_created", "property_id", "created_at"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    item_id: int
+    delta: float
+    quantity_after: float
+    reason: str  # restock | consume | waste | adjust | count | initial
+    note: Optional[str] = None
+    actor: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class Announcement(PropertyScoped, table=True):
+    __table_args__ = (Index("ix_announcement_property_active", "property_id", "is_active"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str
     message: str
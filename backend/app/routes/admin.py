@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, Header, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Header, BackgroundTasks, Query
 import os
 import os
 from sqlmodel import Session, select
-from ..db_core import get_session, engine, init_db
-from ..models import AdminUser, Booking, ContactMessage, Room, PaymentAccount, BookingMeta, StaffMember
+from sqlalchemy import func
+from ..db_core import get_read_session, get_session
+from ..models import AdminUser, Booking, ContactMessage, Room, PaymentAccount, BookingMeta, StaffMember, Property
 from ..schemas import (
     AdminLogin,
     AdminChangePassword,
@@ -12,28 +13,45 @@ from ..schemas import (
     RoomUpdate,
     PaymentAccountCreate,
     PaymentAccountUpdate,
+    PropertyCreate,
+    PropertyUpdate,
     BookingStatusUpdate,
     PaymentProofUpdate,
     StaffCreate,
     StaffUpdate,
+    RoomRead,
+    StaffRead,
+    ContactMessageRead,
+    MessageStatusUpdate,
+    MessageBulkStatusUpdate,
 )
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
 from typing import Optional
-from fastapi.responses import StreamingResponse
+from fastapi.responses import FileResponse, StreamingResponse
 import csv
 import io
 from openpyxl import Workbook
+from ..utils import booking_lookup, forecast, inbox, rates, report_cache
 from ..utils.security import verify_password, create_access_token, decode_access_token, hash_password
+from ..utils.archive import archive_bookings, archived_listing, cutoff as archive_cutoff, stays
 from ..utils.email import send_email
+from ..utils.metrics import add_background_task
+from ..utils.search_index import search as search_index
+from ..utils.serialization import rows_response
+from ..utils.staff_directory import directory_response, export_rows as staff_export_rows
+from ..utils.profiler import list_profiles, profile_path
+from ..utils.tenancy import current_property_id, invalidate_properties
+from ..utils.write_queue import QueuedWriteRoute, exempt
 
-router = APIRouter(prefix="/api/admin", tags=["Admin"])
+router = APIRouter(prefix="/api/admin", tags=["Admin"], route_class=QueuedWriteRoute)
 
 @router.post("/login")
+@exempt  # read-only; keeps password hashing off the writer thread
 def admin_login(credentials: AdminLogin, session: Session = Depends(get_session)):
     admin = session.exec(select(AdminUser).where(AdminUser.email == credentials.email)).first()
     if not admin or not verify_password(credentials.password, admin.password_hash):
         raise HTTPException(status_code=401, detail="Invalid credentials")
-    token = create_access_token({"sub": admin.email})
+    token = create_access_token({"sub": admin.email, "role": "admin", "property_id": current_property_id()})
     return {"access_token": token, "token_type": "bearer"}
 
 def get_current_admin(authorization: str = Header(...)):
@@ -65,7 +83,11 @@ def init_admin(credentials: AdminLogin, session: Session = Depends(get_session))
 
 
 @router.get("/bookings")
-def get_bookings(session: Session = Depends(get_session), admin=Depends(get_current_admin)):
+def get_bookings(
+    include_archived: bool = False,
+    session: Session = Depends(get_read_session),
+    admin=Depends(get_current_admin),
+):
     bookings = session.exec(select(Booking)).all()
     metas = session.exec(select(BookingMeta)).all()
     meta_map = {m.booking_id: m for m in metas}
@@ -85,26 +107,105 @@ def get_bookings(session: Session = Depends(get_session), admin=Depends(get_curr
             "payment_status": meta.payment_status if meta else "unpaid",
             "payment_proof": meta.payment_proof if meta else None,
         })
+    if include_archived:
+        for row in enriched:
+            row["archived"] = False
+        enriched.extend(archived_listing(session))
     return enriched
 
-@router.get("/messages")
-def get_messages(session: Session = Depends(get_session), admin=Depends(get_current_admin)):
-    return session.exec(select(ContactMessage)).all()
+@router.get("/messages", response_model=list[ContactMessageRead])
+def get_messages(
+    folder: str = Query("inbox", pattern="^(inbox|new|read|archived|all)$"),
+    limit: int = Query(50, ge=1, le=200),
+    before: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+    session: Session = Depends(get_session),
+    admin=Depends(get_current_admin),
+):
+    """Newest-first page of messages; pass the last row's created_at/id as before/before_id for the next."""
+    return inbox.page(session, folder, limit, before, before_id)
+
+@router.get("/messages/unread-count")
+def get_unread_message_count(session: Session = Depends(get_session), admin=Depends(get_current_admin)):
+    return {"unread": inbox.unread_count(session)}
+
+@router.patch("/messages/{message_id}")
+def update_message_status(
+    message_id: int,
+    payload: MessageStatusUpdate,
+    session: Session = Depends(get_session),
+    admin=Depends(get_current_admin),
+):
+    changed = inbox.set_status(session, [message_id], payload.status)
+    if not changed and session.get(ContactMessage, message_id) is None:
+        raise HTTPException(status_code=404, detail="Message not found")
+    session.commit()
+    return {"message": "Message updated", "changed": changed}
+
+@router.post("/messages/status")
+def update_messages_status(
+    payload: MessageBulkStatusUpdate,
+    session: Session = Depends(get_session),
+    admin=Depends(get_current_admin),
+):
+    changed = inbox.set_status(session, payload.ids, payload.status)
+    session.commit()
+    return {"changed": changed}
+
+@router.get("/search")
+def search(
+    q: str,
+    type: Optional[str] = None,
+    page: int = 1,
+    page_size: int = 20,
+    session: Session = Depends(get_read_session),
+    admin=Depends(get_current_admin),
+):
+    """Full-text search across bookings, guests, staff and contact messages.
+
+    `type` optionally restricts results to a comma-separated subset of
+    booking, guest, staff and message.
+    """
+    types = [t.strip() for t in type.split(",") if t.strip()] if type else None
+    return search_index(session, q, types, page, page_size)
+
+@router.post("/bookings/archive")
+@exempt  # archive_bookings queues its own batches
+def run_booking_archive(before: Optional[date] = None, admin=Depends(get_current_admin)):
+    """Archive now instead of waiting for the job; `before` defaults to the BOOKING_ARCHIVE_DAYS horizon."""
+    before = before or archive_cutoff()
+    if before is None:
+        raise HTTPException(status_code=400, detail="Archival is disabled; pass `before`")
+    return {"archived": archive_bookings(before), "before": before}
+
+@router.get("/profiles")
+def get_profiles(admin=Depends(get_current_admin)):
+    """Stored request profiles (see utils/profiler), newest first."""
+    return list_profiles()
+
+@router.get("/profiles/{profile_id}")
+def download_profile(profile_id: str, admin=Depends(get_current_admin)):
+    """Download one profile in folded-stack format (speedscope / flamegraph.pl)."""
+    path = profile_path(profile_id)
+    if not path:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=f"{profile_id}.folded")
 
 # Rooms management
-@router.get("/rooms")
-def list_rooms(session: Session = Depends(get_session), admin=Depends(get_current_admin)):
-    return session.exec(select(Room)).all()
+@router.get("/rooms", response_model=list[RoomRead])
+def list_rooms(session: Session = Depends(get_read_session), admin=Depends(get_current_admin)):
+    return rows_response(session, Room, RoomRead)
 
-@router.post("/rooms")
+@router.post("/rooms", response_model=RoomRead)
 def create_room(payload: RoomCreate, session: Session = Depends(get_session), admin=Depends(get_current_admin)):
     room = Room(**payload.model_dump())
     session.add(room)
     session.commit()
+    rates.invalidate()
     session.refresh(room)
     return room
 
-@router.put("/rooms/{room_id}")
+@router.put("/rooms/{room_id}", response_model=RoomRead)
 def update_room(room_id: int, payload: RoomUpdate, session: Session = Depends(get_session), admin=Depends(get_current_admin)):
     room = session.get(Room, room_id)
     if not room:
@@ -113,6 +214,7 @@ def update_room(room_id: int, payload: RoomUpdate, session: Session = Depends(ge
         setattr(room, key, value)
     session.add(room)
     session.commit()
+    rates.invalidate()
     session.refresh(room)
     return room
 
@@ -123,6 +225,7 @@ def delete_room(room_id: int, session: Session = Depends(get_session), admin=Dep
         raise HTTPException(status_code=404, detail="Room not found")
     session.delete(room)
     session.commit()
+    rates.invalidate()
     return {"message": "Room deleted"}
 
 # Payment accounts management
@@ -172,6 +275,48 @@ def delete_payment_account(
     session.commit()
     return {"message": "Account deleted"}
 
+# Properties (hotels); admins pick one per request with X-Property-Id (utils/tenancy)
+@router.get("/properties")
+def list_properties(session: Session = Depends(get_session), admin=Depends(get_current_admin)):
+    return session.exec(select(Property).order_by(Property.id)).all()
+
+@router.post("/properties")
+def create_property(
+    payload: PropertyCreate,
+    session: Session = Depends(get_session),
+    admin=Depends(get_current_admin),
+):
+    if session.exec(select(Property).where(Property.code == payload.code)).first():
+        raise HTTPException(status_code=400, detail="Property code already exists")
+    prop = Property(**payload.model_dump())
+    session.add(prop)
+    session.commit()
+    invalidate_properties()
+    session.refresh(prop)
+    return prop
+
+@router.put("/properties/{property_id}")
+def update_property(
+    property_id: int,
+    payload: PropertyUpdate,
+    session: Session = Depends(get_session),
+    admin=Depends(get_current_admin),
+):
+    prop = session.get(Property, property_id)
+    if not prop:
+        raise HTTPException(status_code=404, detail="Property not found")
+    data = payload.model_dump(exclude_unset=True)
+    if data.get("code") and data["code"] != prop.code:
+        if session.exec(select(Property).where(Property.code == data["code"])).first():
+            raise HTTPException(status_code=400, detail="Property code already exists")
+    for key, value in data.items():
+        setattr(prop, key, value)
+    session.add(prop)
+    session.commit()
+    invalidate_properties()
+    session.refresh(prop)
+    return prop
+
 # Booking status updates + payment proof
 @router.post("/bookings/{booking_id}/status")
 def update_booking_status(
@@ -181,6 +326,9 @@ def update_booking_status(
     session: Session = Depends(get_session),
     admin=Depends(get_current_admin),
 ):
+    booking = session.get(Booking, booking_id)
+    if not booking:
+        raise HTTPException(status_code=404, detail="Booking not found")
     meta = session.exec(select(BookingMeta).where(BookingMeta.booking_id == booking_id)).first()
     if not meta:
         meta = BookingMeta(booking_id=booking_id)
@@ -189,20 +337,19 @@ def update_booking_status(
         meta.payment_status = payload.payment_status
     session.add(meta)
     session.commit()
-    session.refresh(meta)
+    booking_lookup.invalidate(booking_id)
+    forecast.booking_changed(booking_id)
     if payload.payment_status == "paid":
-        booking = session.get(Booking, booking_id)
-        if booking:
-            subject = "Payment confirmed"
-            body = (
-                f"<p>Hi {booking.name},</p>"
-                f"<p>Your payment has been confirmed. Your booking is now marked as paid.</p>"
-                f"<p><strong>Room:</strong> {booking.room_type}</p>"
-                f"<p><strong>Check In:</strong> {booking.check_in}</p>"
-                f"<p><strong>Check Out:</strong> {booking.check_out}</p>"
-                f"<p>Thank you for choosing us.</p>"
-            )
-            background_tasks.add_task(send_email, booking.email, subject, body)
+        subject = "Payment confirmed"
+        body = (
+            f"<p>Hi {booking.name},</p>"
+            f"<p>Your payment has been confirmed. Your booking is now marked as paid.</p>"
+            f"<p><strong>Room:</strong> {booking.room_type}</p>"
+            f"<p><strong>Check In:</strong> {booking.check_in}</p>"
+            f"<p><strong>Check Out:</strong> {booking.check_out}</p>"
+            f"<p>Thank you for choosing us.</p>"
+        )
+        add_background_task(background_tasks, send_email, booking.email, subject, body)
     return {"message": "Booking status updated"}
 
 @router.post("/bookings/{booking_id}/payment-proof")
@@ -212,21 +359,40 @@ def update_payment_proof(
     session: Session = Depends(get_session),
     admin=Depends(get_current_admin),
 ):
+    if session.get(Booking, booking_id) is None:
+        raise HTTPException(status_code=404, detail="Booking not found")
     meta = session.exec(select(BookingMeta).where(BookingMeta.booking_id == booking_id)).first()
     if not meta:
         meta = BookingMeta(booking_id=booking_id)
     meta.payment_proof = payload.payment_proof
     session.add(meta)
     session.commit()
-    session.refresh(meta)
+    booking_lookup.invalidate(booking_id)
     return {"message": "Payment proof updated"}
 
 # Staff management
 @router.get("/staff")
-def list_staff(session: Session = Depends(get_session), admin=Depends(get_current_admin)):
-    return session.exec(select(StaffMember)).all()
+def list_staff(
+    fields: Optional[str] = None,
+    department: Optional[str] = None,
+    role: Optional[str] = None,
+    status: Optional[str] = None,
+    page: int = 1,
+    page_size: int = 100,
+    session: Session = Depends(get_read_session),
+    admin=Depends(get_current_admin),
+):
+    """Staff directory; `fields` picks columns or presets (see utils/staff_directory)."""
+    return directory_response(session, fields, department, role, status, page, page_size)
+
+@router.get("/staff/{staff_id}", response_model=StaffRead)
+def get_staff(staff_id: int, session: Session = Depends(get_session), admin=Depends(get_current_admin)):
+    staff = session.get(StaffMember, staff_id)
+    if not staff:
+        raise HTTPException(status_code=404, detail="Staff not found")
+    return staff
 
-@router.post("/staff")
+@router.post("/staff", response_model=StaffRead)
 def create_staff(payload: StaffCreate, session: Session = Depends(get_session), admin=Depends(get_current_admin)):
     staff = StaffMember(**payload.model_dump())
     session.add(staff)
@@ -234,7 +400,7 @@ def create_staff(payload: StaffCreate, session: Session = Depends(get_session),
     session.refresh(staff)
     return staff
 
-@router.put("/staff/{staff_id}")
+@router.put("/staff/{staff_id}", response_model=StaffRead)
 def update_staff(staff_id: int, payload: StaffUpdate, session: Session = Depends(get_session), admin=Depends(get_current_admin)):
     staff = session.get(StaffMember, staff_id)
     if not staff:
@@ -260,41 +426,28 @@ def delete_staff(staff_id: int, session: Session = Depends(get_session), admin=D
 def report_summary(
     from_date: Optional[date] = None,
     to_date: Optional[date] = None,
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
     admin=Depends(get_current_admin),
 ):
     if not to_date:
         to_date = date.today()
     if not from_date:
         from_date = to_date - timedelta(days=30)
+    # Concurrent identical requests share one computation (utils/report_cache).
+    return report_cache.cached(
+        ("admin.reports.summary", from_date, to_date), lambda: _report_summary(session, from_date, to_date)
+    )
 
-    bookings = session.exec(select(Booking)).all()
-    rooms = session.exec(select(Room)).all()
 
-    rooms_count = len(rooms)
+def _report_summary(session: Session, from_date: date, to_date: date) -> dict:
+    # Only stays overlapping the range; reaches into the archive when the range is old enough.
+    bookings = stays(session, from_date, to_date)
+    rooms_count = session.exec(select(func.count()).select_from(Room)).one()
     days = (to_date - from_date).days or 1
 
-    # Average price per room_type
-    price_map: dict[str, float] = {}
-    type_counts: dict[str, int] = {}
-    for r in rooms:
-        price_map[r.room_type] = price_map.get(r.room_type, 0) + r.price
-        type_counts[r.room_type] = type_counts.get(r.room_type, 0) + 1
-    for t, total in price_map.items():
-        price_map[t] = total / max(type_counts.get(t, 1), 1)
-
-    total_bookings = 0
-    booked_nights = 0
-    estimated_revenue = 0.0
-    for b in bookings:
-        if b.check_out < from_date or b.check_in > to_date:
-            continue
-        total_bookings += 1
-        start = max(b.check_in, from_date)
-        end = min(b.check_out, to_date)
-        nights = max((end - start).days, 0)
-        booked_nights += nights
-        estimated_revenue += nights * price_map.get(b.room_type, 0)
+    total_bookings = len(bookings)
+    # Nights inside the range, each priced from the rate calendar.
+    booked_nights, estimated_revenue = rates.revenue(session, bookings, from_date, to_date)
 
     occupancy_rate = 0.0
     if rooms_count > 0:
@@ -343,23 +496,31 @@ def _export_rows_xlsx(rows: list[dict], filename: str):
     )
 
 @router.get("/reports/bookings.csv")
-def export_bookings_csv(session: Session = Depends(get_session), admin=Depends(get_current_admin)):
-    rows = get_bookings(session, admin)
+def export_bookings_csv(
+    include_archived: bool = False,
+    session: Session = Depends(get_read_session),
+    admin=Depends(get_current_admin),
+):
+    rows = get_bookings(include_archived, session, admin)
     return _export_rows_csv(rows, "bookings.csv")
 
 @router.get("/reports/bookings.xlsx")
-def export_bookings_xlsx(session: Session = Depends(get_session), admin=Depends(get_current_admin)):
-    rows = get_bookings(session, admin)
+def export_bookings_xlsx(
+    include_archived: bool = False,
+    session: Session = Depends(get_read_session),
+    admin=Depends(get_current_admin),
+):
+    rows = get_bookings(include_archived, session, admin)
     return _export_rows_xlsx(rows, "bookings.xlsx")
 
 @router.get("/reports/staff.csv")
-def export_staff_csv(session: Session = Depends(get_session), admin=Depends(get_current_admin)):
-    rows = [s.model_dump() for s in session.exec(select(StaffMember)).all()]
+def export_staff_csv(session: Session = Depends(get_read_session), admin=Depends(get_current_admin)):
+    rows = staff_export_rows(session)
     return _export_rows_csv(rows, "staff.csv")
 
 @router.get("/reports/staff.xlsx")
-def export_staff_xlsx(session: Session = Depends(get_session), admin=Depends(get_current_admin)):
-    rows = [s.model_dump() for s in session.exec(select(StaffMember)).all()]
+def export_staff_xlsx(session: Session = Depends(get_read_session), admin=Depends(get_current_admin)):
+    rows = staff_export_rows(session)
     return _export_rows_xlsx(rows, "staff.xlsx")
 
 @router.post("/change-password")
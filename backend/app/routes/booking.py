@@ -1,15 +1,20 @@
-from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException
-from sqlmodel import Session, select
-from ..db_core import get_session
+from fastapi import APIRouter, Depends, BackgroundTasks, Header, HTTPException, Response
+from sqlmodel import Session
+from ..db_core import get_read_session, get_session
 from ..models import Booking, BookingMeta
 from ..schemas import BookingCreate
+from ..utils import booking_lookup, report_cache
+from ..utils.archive import reference_exists
 from ..utils.email import send_email
+from ..utils.metrics import add_background_task
 from ..utils.sms import send_sms
+from ..utils.write_queue import QueuedWriteRoute
 import os
 import random
 import string
+from typing import Optional
 
-router = APIRouter(prefix="/api/booking", tags=["Booking"])
+router = APIRouter(prefix="/api/booking", tags=["Booking"], route_class=QueuedWriteRoute)
 
 @router.post("/")
 def submit_booking(
@@ -21,10 +26,8 @@ def submit_booking(
     ref = None
     for _ in range(5):
         candidate = "BK" + "".join(random.choices(string.digits, k=8))
-        exists = session.exec(
-            select(Booking).where(Booking.reference_number == candidate)
-        ).first()
-        if not exists:
+        # Archived bookings keep their references, so check both tables.
+        if not reference_exists(session, candidate):
             ref = candidate
             break
     if not ref:
@@ -42,6 +45,7 @@ def submit_booking(
         meta.payment_status = "pending"
     session.add(meta)
     session.commit()
+    report_cache.invalidate()
 
     admin_email = os.getenv("ADMIN_ALERT_EMAIL")
     admin_phone = os.getenv("ADMIN_ALERT_PHONE")
@@ -55,7 +59,7 @@ def submit_booking(
             f"<p><strong>Check Out:</strong> {booking.check_out}</p>"
             f"<p><strong>Reference:</strong> {b.reference_number}</p>"
         )
-        background_tasks.add_task(send_email, admin_email, subject, body)
+        add_background_task(background_tasks, send_email, admin_email, subject, body)
     # guest confirmation email
     subject = "Booking received"
     status_link = os.getenv("PUBLIC_STATUS_URL", "https://room-booker-web.onrender.com/#/booking-status")
@@ -65,34 +69,29 @@ def submit_booking(
         f"<p><strong>Reference:</strong> {b.reference_number}</p>"
         f"<p>You can check your status here: <a href='{status_link}'>Check Booking Status</a></p>"
     )
-    background_tasks.add_task(send_email, booking.email, subject, body)
+    add_background_task(background_tasks, send_email, booking.email, subject, body)
     if admin_phone:
         sms_body = (
             f"New booking: {booking.name} ({booking.email}) "
             f"Room: {booking.room_type} {booking.check_in} to {booking.check_out}"
         )
-        background_tasks.add_task(send_sms, admin_phone, sms_body)
+        add_background_task(background_tasks, send_sms, admin_phone, sms_body)
 
     return {"message": "Booking submitted successfully", "reference_number": b.reference_number}
 
 
 @router.get("/reference/{reference}")
-def get_booking_by_reference(reference: str, session: Session = Depends(get_session)):
-    booking = session.exec(select(Booking).where(Booking.reference_number == reference)).first()
-    if not booking:
+def get_booking_by_reference(
+    reference: str,
+    if_none_match: Optional[str] = Header(default=None),
+    session: Session = Depends(get_read_session),
+):
+    found = booking_lookup.lookup(session, reference)
+    if found is None:
         raise HTTPException(status_code=404, detail="Booking not found")
-    meta = session.exec(select(BookingMeta).where(BookingMeta.booking_id == booking.id)).first()
-    return {
-        "id": booking.id,
-        "reference_number": booking.reference_number,
-        "name": booking.name,
-        "email": booking.email,
-        "phone": booking.phone,
-        "room_type": booking.room_type,
-        "check_in": booking.check_in,
-        "check_out": booking.check_out,
-        "created_at": booking.created_at,
-        "status": meta.status if meta else "pending",
-        "payment_status": meta.payment_status if meta else "unpaid",
-        "payment_proof": meta.payment_proof if meta else None,
-    }
+    body, etag = found
+    # no-cache: browsers keep the copy but revalidate it with If-None-Match on every refresh.
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if booking_lookup.etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
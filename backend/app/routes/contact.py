@@ -3,11 +3,14 @@ from sqlmodel import Session
 from ..db_core import get_session
 from ..models import ContactMessage
 from ..schemas import ContactCreate
+from ..utils import inbox
 from ..utils.email import send_email
+from ..utils.metrics import add_background_task
 from ..utils.sms import send_sms
+from ..utils.write_queue import QueuedWriteRoute
 import os
 
-router = APIRouter(prefix="/api/contact", tags=["Contact"])
+router = APIRouter(prefix="/api/contact", tags=["Contact"], route_class=QueuedWriteRoute)
 
 @router.post("/")
 def submit_contact(
@@ -17,6 +20,7 @@ def submit_contact(
 ):
     msg = ContactMessage(**contact.dict())
     session.add(msg)
+    inbox.record_new(session)
     session.commit()
     session.refresh(msg)
 
@@ -29,9 +33,9 @@ def submit_contact(
             f"<p><strong>Email:</strong> {contact.email}</p>"
             f"<p><strong>Message:</strong> {contact.message}</p>"
         )
-        background_tasks.add_task(send_email, admin_email, subject, body)
+        add_background_task(background_tasks, send_email, admin_email, subject, body)
     if admin_phone:
         sms_body = f"Contact message from {contact.name} ({contact.email}): {contact.message}"
-        background_tasks.add_task(send_sms, admin_phone, sms_body)
+        add_background_task(background_tasks, send_sms, admin_phone, sms_body)
 
     return {"message": "Contact form submitted successfully"}
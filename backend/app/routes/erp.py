@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, Header
+from fastapi import APIRouter, Depends, HTTPException, Header, Query
 from sqlmodel import Session, select
-from sqlalchemy import func
+from sqlalchemy import func, inspect
+from pydantic import ValidationError
 from typing import Optional
-from datetime import datetime
+from datetime import date, datetime, timedelta
+import os
 
-from ..db_core import get_session
+from ..db_core import get_read_session, get_session
 from ..models import (
     AdminUser,
     StaffMember,
@@ -15,10 +17,12 @@ from ..models import (
     HousekeepingTask,
     FloorPlanItem,
     Room,
+    RateRule,
     Booking,
     BookingMeta,
     PaymentAccount,
     InventoryItem,
+    StockMovement,
     Announcement,
 )
 from ..schemas import (
@@ -35,6 +39,7 @@ from ..schemas import (
     HousekeepingUpdate,
     FloorPlanItemCreate,
     FloorPlanItemUpdate,
+    FloorPlanBatchUpdate,
     BookingStatusUpdate,
     PaymentProofUpdate,
     StaffDocumentCreate,
@@ -42,11 +47,36 @@ from ..schemas import (
     InventoryUpdate,
     AnnouncementCreate,
     AnnouncementUpdate,
+    BatchRequest,
+    StockAdjust,
+    StockCount,
+    RoomRead,
+    RateRuleCreate,
+    RateRuleRead,
+    RateRuleUpdate,
+    StaffRead,
+    GuestProfileRead,
+    CheckInRead,
 )
 from ..utils.security import verify_password, create_access_token, decode_access_token, hash_password
+from ..utils import booking_lookup, dashboard, forecast, rates, report_cache
+from ..utils.archive import archived_listing, stays
+from ..utils.guest_search import search_guests
+from ..utils.floorplan import floor_index, invalidate as invalidate_floorplan, overlap_report, parse_bbox
+from ..utils.serialization import rows_response
+from ..utils.staff_directory import directory_response
+from ..utils.inventory import adjust_stock, consumption_summary, count_stock, derive_status
+from ..utils.housekeeping import assign_tasks, create_checkout_task, rebalance_after_completion
+from ..utils.tenancy import current_property_id
+from ..utils.write_queue import QueuedWriteRoute, exempt
 import secrets
 
-router = APIRouter(prefix="/api/erp", tags=["ERP"])
+router = APIRouter(prefix="/api/erp", tags=["ERP"], route_class=QueuedWriteRoute)
+
+# Upper bound on operations per POST /batch request.
+MAX_BATCH_OPERATIONS = int(os.getenv("ERP_BATCH_MAX_OPERATIONS", "500"))
+# Longest stay the front desk views look back for; bounds the check_in range scan.
+FRONTDESK_MAX_STAY_DAYS = int(os.getenv("FRONTDESK_MAX_STAY_DAYS", "90"))
 
 
 def _get_current_erp_user(authorization: str = Header(...)):
@@ -64,12 +94,15 @@ def _require_admin(user: dict):
 
 
 @router.post("/login")
+@exempt  # read-only; keeps password hashing off the writer thread
 def erp_login(payload: ERPLogin, session: Session = Depends(get_session)):
     # Admin login (email + password)
     if payload.email and payload.password:
         admin = session.exec(select(AdminUser).where(AdminUser.email == payload.email)).first()
         if admin and verify_password(payload.password, admin.password_hash):
-            token = create_access_token({"sub": admin.email, "role": "admin", "name": admin.email})
+            token = create_access_token(
+                {"sub": admin.email, "role": "admin", "name": admin.email, "property_id": current_property_id()}
+            )
             return {"access_token": token, "user": {"email": admin.email, "role": "admin", "name": admin.email}}
 
     # Staff login (role + password, no staff ID)
@@ -89,7 +122,10 @@ def erp_login(payload: ERPLogin, session: Session = Depends(get_session)):
         if len(matches) > 1:
             raise HTTPException(status_code=409, detail="Multiple staff match this role/password. Ask admin to reset passwords.")
         staff = matches[0]
-        token = create_access_token({"sub": staff.email, "role": role, "name": staff.name})
+        # Staff stay pinned to the property they belong to (utils/tenancy).
+        token = create_access_token(
+            {"sub": staff.email, "role": role, "name": staff.name, "property_id": staff.property_id}
+        )
         return {"access_token": token, "user": {"email": staff.email, "role": role, "name": staff.name}}
 
     raise HTTPException(status_code=400, detail="Invalid login payload")
@@ -101,13 +137,12 @@ def erp_me(user: dict = Depends(_get_current_erp_user)):
 
 
 # Rooms
-@router.get("/rooms")
-def list_rooms(user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
-    return session.exec(select(Room)).all()
+@router.get("/rooms", response_model=list[RoomRead])
+def list_rooms(user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_read_session)):
+    return rows_response(session, Room, RoomRead)
 
 
-@router.put("/rooms/{room_id}")
-def update_room(room_id: int, payload: dict, user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
+def _apply_room_update(session: Session, room_id: int, payload: dict) -> Room:
     room = session.get(Room, room_id)
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
@@ -115,14 +150,106 @@ def update_room(room_id: int, payload: dict, user: dict = Depends(_get_current_e
         if hasattr(room, key):
             setattr(room, key, value)
     session.add(room)
+    return room
+
+
+@router.put("/rooms/{room_id}", response_model=RoomRead)
+def update_room(room_id: int, payload: dict, user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
+    room = _apply_room_update(session, room_id, payload)
     session.commit()
+    rates.invalidate()
     session.refresh(room)
     return room
 
 
+# Rates
+@router.get("/rate-rules", response_model=list[RateRuleRead])
+def list_rate_rules(
+    room_type: Optional[str] = None,
+    user: dict = Depends(_get_current_erp_user),
+    session: Session = Depends(get_read_session),
+):
+    stmt = select(RateRule).order_by(RateRule.room_type, RateRule.priority, RateRule.id)
+    if room_type:
+        stmt = stmt.where(RateRule.room_type == room_type)
+    return session.exec(stmt).all()
+
+
+@router.post("/rate-rules", response_model=RateRuleRead)
+def create_rate_rule(payload: RateRuleCreate, user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
+    _require_admin(user)
+    rule = RateRule(**rates.rule_values(payload.model_dump()))
+    session.add(rule)
+    session.commit()
+    rates.invalidate()
+    session.refresh(rule)
+    return rule
+
+
+@router.put("/rate-rules/{rule_id}", response_model=RateRuleRead)
+def update_rate_rule(rule_id: int, payload: RateRuleUpdate, user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
+    _require_admin(user)
+    rule = session.get(RateRule, rule_id)
+    if not rule:
+        raise HTTPException(status_code=404, detail="Rate rule not found")
+    for key, value in rates.rule_values(payload.model_dump(exclude_unset=True)).items():
+        setattr(rule, key, value)
+    if rule.start_date and rule.end_date and rule.end_date < rule.start_date:
+        raise HTTPException(status_code=422, detail="end_date must not be before start_date")
+    session.add(rule)
+    session.commit()
+    rates.invalidate()
+    session.refresh(rule)
+    return rule
+
+
+@router.delete("/rate-rules/{rule_id}")
+def delete_rate_rule(rule_id: int, user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
+    _require_admin(user)
+    rule = session.get(RateRule, rule_id)
+    if not rule:
+        raise HTTPException(status_code=404, detail="Rate rule not found")
+    session.delete(rule)
+    session.commit()
+    rates.invalidate()
+    return {"message": "Rate rule deleted"}
+
+
+@router.get("/rates/calendar")
+def rate_calendar(
+    start: Optional[date] = None,
+    days: int = Query(31, ge=1, le=366),
+    nights: int = Query(1, ge=1, le=365),
+    room_type: Optional[str] = None,
+    user: dict = Depends(_get_current_erp_user),
+    session: Session = Depends(get_read_session),
+):
+    """Nightly rates per room type for stays of `nights` nights, from `start` (default today)."""
+    start = start or date.today()
+    end = start + timedelta(days=days)
+    calendars = rates.calendars(session, start, end)
+    if room_type:
+        if room_type not in calendars:
+            raise HTTPException(status_code=404, detail="Unknown room type")
+        calendars = {room_type: calendars[room_type]}
+    offset = (start - next(iter(calendars.values())).start).days if calendars else 0
+    return {
+        "start": start,
+        "nights": nights,
+        "rates": {
+            name: cal.nightly(nights)[offset:offset + days].round(2).tolist()
+            for name, cal in sorted(calendars.items())
+        },
+    }
+
+
 # Bookings
 @router.get("/bookings")
-def list_bookings(user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
+def list_bookings(
+    include_archived: bool = False,
+    user: dict = Depends(_get_current_erp_user),
+    session: Session = Depends(get_read_session),
+):
     bookings = session.exec(select(Booking)).all()
     metas = session.exec(select(BookingMeta)).all()
     meta_map = {m.booking_id: m for m in metas}
@@ -141,16 +268,129 @@ def list_bookings(user: dict = Depends(_get_current_erp_user), session: Session
             "payment_status": meta.payment_status if meta else "unpaid",
             "payment_proof": meta.payment_proof if meta else None,
         })
+    if include_archived:
+        for row in enriched:
+            row["archived"] = False
+        enriched.extend(archived_listing(session))
     return enriched
 
 
-@router.post("/bookings/{booking_id}/status")
-def update_booking_status(
-    booking_id: int,
-    payload: BookingStatusUpdate,
+@router.get("/dashboard")
+def dashboard_kpis(user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_read_session)):
+    """Today's KPIs for the dashboard in one response (see utils/dashboard)."""
+    return dashboard.kpis(session, user.get("role") or "")
+
+
+@router.get("/frontdesk")
+def frontdesk(
+    day: Optional[date] = Query(None, alias="date"),
     user: dict = Depends(_get_current_erp_user),
     session: Session = Depends(get_session),
 ):
+    """Arrivals, departures, in-house guests and no-shows for one day.
+
+    One query over the bookings spanning `date` (a range scan on the
+    (check_in, check_out) index, bounded by FRONTDESK_MAX_STAY_DAYS) joined to
+    their meta and check-in records; cancelled bookings are skipped.
+
+    In-house and no-show are judged as of `date` from the check-in/out
+    timestamps; a booking only counts as a no-show once its check-in date
+    has passed.
+    """
+    day = day or date.today()
+    today = date.today()
+    rows = session.exec(
+        select(
+            Booking.id,
+            Booking.reference_number,
+            Booking.name,
+            Booking.email,
+            Booking.phone,
+            Booking.room_type,
+            Booking.check_in,
+            Booking.check_out,
+            BookingMeta.status,
+            BookingMeta.payment_status,
+            CheckInRecord.id.label("checkin_id"),
+            CheckInRecord.status.label("checkin_status"),
+            CheckInRecord.room_number,
+            CheckInRecord.checked_in_at,
+            CheckInRecord.checked_out_at,
+        )
+        .outerjoin(BookingMeta, BookingMeta.booking_id == Booking.id)
+        .outerjoin(CheckInRecord, CheckInRecord.booking_id == Booking.id)
+        .where(
+            Booking.check_in >= day - timedelta(days=FRONTDESK_MAX_STAY_DAYS),
+            Booking.check_in <= day,
+            Booking.check_out >= day,
+        )
+        .order_by(Booking.id, CheckInRecord.id)
+    ).all()
+
+    # A booking can have several check-in records; the latest one wins.
+    latest: dict[int, dict] = {}
+    for row in rows:
+        if row.status == "cancelled":
+            continue
+        latest[row.id] = {
+            "booking_id": row.id,
+            "reference_number": row.reference_number,
+            "name": row.name,
+            "email": row.email,
+            "phone": row.phone,
+            "room_type": row.room_type,
+            "check_in": row.check_in,
+            "check_out": row.check_out,
+            "status": row.status or "pending",
+            "payment_status": row.payment_status or "unpaid",
+            "checkin_id": row.checkin_id,
+            "checkin_status": row.checkin_status,
+            "room_number": row.room_number,
+            "checked_in_at": row.checked_in_at,
+            "checked_out_at": row.checked_out_at,
+        }
+
+    arrivals, departures, in_house, no_shows = [], [], [], []
+    for entry in latest.values():
+        # Dates the guest actually arrived/left, so past and future days are
+        # answered as of `day` rather than from the current status.
+        status = entry["checkin_status"]
+        arrived_on = left_on = None
+        if status in ("checked_in", "checked_out"):
+            arrived_on = entry["checked_in_at"].date() if entry["checked_in_at"] else entry["check_in"]
+        if status == "checked_out":
+            left_on = entry["checked_out_at"].date() if entry["checked_out_at"] else entry["check_out"]
+        if entry["check_in"] == day:
+            arrivals.append(entry)
+        if entry["check_out"] == day:
+            departures.append(entry)
+        if arrived_on is not None and arrived_on <= day and (left_on is None or left_on > day):
+            in_house.append(entry)
+        elif (
+            (arrived_on is None or arrived_on > day)
+            and entry["check_in"] < min(day, today)
+            and entry["check_out"] > day
+        ):
+            no_shows.append(entry)
+
+    return {
+        "date": day,
+        "counts": {
+            "arrivals": len(arrivals),
+            "departures": len(departures),
+            "in_house": len(in_house),
+            "no_shows": len(no_shows),
+        },
+        "arrivals": arrivals,
+        "departures": departures,
+        "in_house": in_house,
+        "no_shows": no_shows,
+    }
+
+
+def _apply_booking_status(session: Session, booking_id: int, payload: BookingStatusUpdate) -> BookingMeta:
+    if session.get(Booking, booking_id) is None:
+        raise HTTPException(status_code=404, detail="Booking not found")
     meta = session.exec(select(BookingMeta).where(BookingMeta.booking_id == booking_id)).first()
     if not meta:
         meta = BookingMeta(booking_id=booking_id)
@@ -158,8 +398,20 @@ def update_booking_status(
     if payload.payment_status:
         meta.payment_status = payload.payment_status
     session.add(meta)
+    return meta
+
+
+@router.post("/bookings/{booking_id}/status")
+def update_booking_status(
+    booking_id: int,
+    payload: BookingStatusUpdate,
+    user: dict = Depends(_get_current_erp_user),
+    session: Session = Depends(get_session),
+):
+    _apply_booking_status(session, booking_id, payload)
     session.commit()
-    session.refresh(meta)
+    booking_lookup.invalidate(booking_id)
+    forecast.booking_changed(booking_id)
     return {"message": "Booking status updated"}
 
 
@@ -170,41 +422,33 @@ def update_booking_proof(
     user: dict = Depends(_get_current_erp_user),
     session: Session = Depends(get_session),
 ):
+    if session.get(Booking, booking_id) is None:
+        raise HTTPException(status_code=404, detail="Booking not found")
     meta = session.exec(select(BookingMeta).where(BookingMeta.booking_id == booking_id)).first()
     if not meta:
         meta = BookingMeta(booking_id=booking_id)
     meta.payment_proof = payload.payment_proof
     session.add(meta)
     session.commit()
-    session.refresh(meta)
+    booking_lookup.invalidate(booking_id)
     return {"message": "Payment proof updated"}
 
 
 # Reports
 @router.get("/reports/summary")
-def report_summary(user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
-    bookings = session.exec(select(Booking)).all()
-    rooms = session.exec(select(Room)).all()
+def report_summary(user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_read_session)):
+    # Concurrent identical requests share one computation (utils/report_cache).
+    return report_cache.cached(("erp.reports.summary",), lambda: _report_summary(session))
+
 
-    rooms_count = len(rooms)
+def _report_summary(session: Session) -> dict:
+    bookings = stays(session)
+    rooms_count = session.exec(select(func.count()).select_from(Room)).one()
     days = 30
 
-    price_map: dict[str, float] = {}
-    type_counts: dict[str, int] = {}
-    for r in rooms:
-        price_map[r.room_type] = price_map.get(r.room_type, 0) + r.price
-        type_counts[r.room_type] = type_counts.get(r.room_type, 0) + 1
-    for t, total in price_map.items():
-        price_map[t] = total / max(type_counts.get(t, 1), 1)
-
-    total_bookings = 0
-    booked_nights = 0
-    estimated_revenue = 0.0
-    for b in bookings:
-        total_bookings += 1
-        nights = max((b.check_out - b.check_in).days, 0)
-        booked_nights += nights
-        estimated_revenue += nights * price_map.get(b.room_type, 0)
+    total_bookings = len(bookings)
+    # Priced night by night from the rate calendar.
+    booked_nights, estimated_revenue = rates.revenue(session, bookings)
 
     occupancy_rate = 0.0
     if rooms_count > 0:
@@ -219,6 +463,17 @@ def report_summary(user: dict = Depends(_get_current_erp_user), session: Session
     }
 
 
+@router.get("/reports/forecast")
+def occupancy_forecast(
+    days: int = Query(30, ge=1, le=365),
+    room_type: Optional[str] = None,
+    user: dict = Depends(_get_current_erp_user),
+    session: Session = Depends(get_session),
+):
+    """Projected occupancy per room type for the next `days` nights (see utils/forecast)."""
+    return forecast.forecast(session, days, room_type)
+
+
 @router.get("/payment-accounts")
 def list_payment_accounts(user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
     return session.exec(select(PaymentAccount)).all()
@@ -226,12 +481,31 @@ def list_payment_accounts(user: dict = Depends(_get_current_erp_user), session:
 
 # Staff
 @router.get("/staff")
-def list_staff(user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
+def list_staff(
+    fields: Optional[str] = None,
+    department: Optional[str] = None,
+    role: Optional[str] = None,
+    status: Optional[str] = None,
+    page: int = 1,
+    page_size: int = 100,
+    user: dict = Depends(_get_current_erp_user),
+    session: Session = Depends(get_read_session),
+):
+    """Staff directory; `fields` picks columns or presets (see utils/staff_directory)."""
+    _require_admin(user)
+    return directory_response(session, fields, department, role, status, page, page_size)
+
+
+@router.get("/staff/{staff_id}", response_model=StaffRead)
+def get_staff(staff_id: int, user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
     _require_admin(user)
-    return session.exec(select(StaffMember)).all()
+    staff = session.get(StaffMember, staff_id)
+    if not staff:
+        raise HTTPException(status_code=404, detail="Staff not found")
+    return staff
 
 
-@router.post("/staff")
+@router.post("/staff", response_model=StaffRead)
 def create_staff(payload: StaffCreate, user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
     _require_admin(user)
     data = payload.model_dump()
@@ -249,7 +523,7 @@ def create_staff(payload: StaffCreate, user: dict = Depends(_get_current_erp_use
     return staff
 
 
-@router.put("/staff/{staff_id}")
+@router.put("/staff/{staff_id}", response_model=StaffRead)
 def update_staff(staff_id: int, payload: StaffUpdate, user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
     _require_admin(user)
     staff = session.get(StaffMember, staff_id)
@@ -332,12 +606,22 @@ def delete_staff_document(
 
 
 # Guests + receipts
-@router.get("/guests")
-def list_guests(user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
-    return session.exec(select(GuestProfile)).all()
+@router.get("/guests", response_model=list[GuestProfileRead])
+def list_guests(user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_read_session)):
+    return rows_response(session, GuestProfile, GuestProfileRead)
 
 
-@router.post("/guests")
+@router.get("/guests/search")
+def search_guest_profiles(
+    q: str,
+    limit: int = 10,
+    user: dict = Depends(_get_current_erp_user),
+    session: Session = Depends(get_read_session),
+):
+    return search_guests(session, q, limit)
+
+
+@router.post("/guests", response_model=GuestProfileRead)
 def create_guest(payload: GuestProfileCreate, user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
     guest = GuestProfile(**payload.model_dump())
     session.add(guest)
@@ -346,7 +630,7 @@ def create_guest(payload: GuestProfileCreate, user: dict = Depends(_get_current_
     return guest
 
 
-@router.put("/guests/{guest_id}")
+@router.put("/guests/{guest_id}", response_model=GuestProfileRead)
 def update_guest(guest_id: int, payload: GuestProfileUpdate, user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
     guest = session.get(GuestProfile, guest_id)
     if not guest:
@@ -394,12 +678,12 @@ def delete_receipt(guest_id: int, receipt_id: int, user: dict = Depends(_get_cur
 
 
 # Check-in/out
-@router.get("/checkins")
-def list_checkins(user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
-    return session.exec(select(CheckInRecord)).all()
+@router.get("/checkins", response_model=list[CheckInRead])
+def list_checkins(user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_read_session)):
+    return rows_response(session, CheckInRecord, CheckInRead)
 
 
-@router.post("/checkins")
+@router.post("/checkins", response_model=CheckInRead)
 def create_checkin(payload: CheckInCreate, user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
     record = CheckInRecord(**payload.model_dump())
     session.add(record)
@@ -408,11 +692,11 @@ def create_checkin(payload: CheckInCreate, user: dict = Depends(_get_current_erp
     return record
 
 
-@router.put("/checkins/{checkin_id}")
-def update_checkin(checkin_id: int, payload: CheckInUpdate, user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
+def _apply_checkin_update(session: Session, checkin_id: int, payload: CheckInUpdate) -> CheckInRecord:
     record = session.get(CheckInRecord, checkin_id)
     if not record:
         raise HTTPException(status_code=404, detail="Check-in record not found")
+    previous_status = record.status
     for key, value in payload.model_dump(exclude_unset=True).items():
         setattr(record, key, value)
     if payload.status == "checked_in" and not record.checked_in_at:
@@ -420,6 +704,14 @@ def update_checkin(checkin_id: int, payload: CheckInUpdate, user: dict = Depends
     if payload.status == "checked_out" and not record.checked_out_at:
         record.checked_out_at = datetime.utcnow()
     session.add(record)
+    if payload.status == "checked_out" and previous_status != "checked_out":
+        create_checkout_task(session, record.room_id, record.room_number, record.guest_name)
+    return record
+
+
+@router.put("/checkins/{checkin_id}", response_model=CheckInRead)
+def update_checkin(checkin_id: int, payload: CheckInUpdate, user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
+    record = _apply_checkin_update(session, checkin_id, payload)
     session.commit()
     session.refresh(record)
     return record
@@ -427,7 +719,7 @@ def update_checkin(checkin_id: int, payload: CheckInUpdate, user: dict = Depends
 
 # Housekeeping
 @router.get("/housekeeping")
-def list_housekeeping(user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
+def list_housekeeping(user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_read_session)):
     return session.exec(select(HousekeepingTask)).all()
 
 
@@ -435,26 +727,49 @@ def list_housekeeping(user: dict = Depends(_get_current_erp_user), session: Sess
 def create_housekeeping(payload: HousekeepingCreate, user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
     task = HousekeepingTask(**payload.model_dump())
     session.add(task)
+    if not task.assigned_to.strip():
+        session.flush()
+        assign_tasks(session, [task])
     session.commit()
     session.refresh(task)
     return task
 
 
-@router.put("/housekeeping/{task_id}")
-def update_housekeeping(task_id: int, payload: HousekeepingUpdate, user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
+def _apply_housekeeping_update(session: Session, task_id: int, payload: HousekeepingUpdate) -> HousekeepingTask:
     task = session.get(HousekeepingTask, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
-    for key, value in payload.model_dump(exclude_unset=True).items():
+    was_open = task.status != "completed"
+    updates = payload.model_dump(exclude_unset=True)
+    for key, value in updates.items():
         setattr(task, key, value)
+    if "assigned_to" in updates:
+        # A manual reassignment takes the task out of the scheduler's hands.
+        task.assigned_staff_id = None
     if payload.status == "completed" and not task.completed_at:
         task.completed_at = datetime.utcnow()
     session.add(task)
+    if was_open and task.status == "completed":
+        rebalance_after_completion(session, task)
+    return task
+
+
+@router.put("/housekeeping/{task_id}")
+def update_housekeeping(task_id: int, payload: HousekeepingUpdate, user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
+    task = _apply_housekeeping_update(session, task_id, payload)
     session.commit()
     session.refresh(task)
     return task
 
 
+@router.post("/housekeeping/schedule")
+def schedule_housekeeping(user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
+    """Assign every open, unassigned task to an active housekeeper."""
+    assigned = assign_tasks(session)
+    session.commit()
+    return {"assigned": [{"task_id": task_id, "staff_id": staff_id} for task_id, staff_id in assigned.items()]}
+
+
 @router.delete("/housekeeping/{task_id}")
 def delete_housekeeping(task_id: int, user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
     task = session.get(HousekeepingTask, task_id)
@@ -467,8 +782,31 @@ def delete_housekeeping(task_id: int, user: dict = Depends(_get_current_erp_user
 
 # Floor plan
 @router.get("/floorplan")
-def list_floorplan(user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
-    return session.exec(select(FloorPlanItem)).all()
+def list_floorplan(
+    floor: Optional[str] = None,
+    bbox: Optional[str] = Query(None, description="min_x,min_y,max_x,max_y; a zero-size box is a hit test"),
+    user: dict = Depends(_get_current_erp_user),
+    session: Session = Depends(get_session),
+):
+    if bbox is None and floor is None:
+        return session.exec(select(FloorPlanItem)).all()
+    try:
+        box = parse_bbox(bbox) if bbox is not None else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid bbox: {e}")
+    floors = [floor] if floor is not None else session.exec(select(FloorPlanItem.floor).distinct()).all()
+    items = []
+    for name in floors:
+        index = floor_index(session, name)
+        items.extend(index.query(box) if box else sorted(index.items.values(), key=lambda item: item["id"]))
+    return items
+
+
+@router.get("/floorplan/overlaps")
+def list_floorplan_overlaps(floor: Optional[str] = None, user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
+    """Pairs of rooms whose rectangles overlap, per floor."""
+    floors = [floor] if floor is not None else session.exec(select(FloorPlanItem.floor).distinct()).all()
+    return overlap_report(session, floors)
 
 
 @router.post("/floorplan")
@@ -477,19 +815,52 @@ def create_floorplan_item(payload: FloorPlanItemCreate, user: dict = Depends(_ge
     session.add(item)
     session.commit()
     session.refresh(item)
+    invalidate_floorplan(item.floor)
     return item
 
 
+@router.patch("/floorplan")
+def batch_update_floorplan(payload: FloorPlanBatchUpdate, user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
+    """Apply many geometry updates in one transaction (e.g. dragging a block of rooms).
+
+    Unknown ids fail the whole batch with 404. Overlaps involving the moved
+    rooms are reported; with `reject_overlaps` they roll the batch back with 409.
+    """
+    ids = [entry.id for entry in payload.items]
+    items = {item.id: item for item in session.exec(select(FloorPlanItem).where(FloorPlanItem.id.in_(ids))).all()}
+    missing = sorted(set(ids) - set(items))
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Floor plan items not found: {missing}")
+    floors = {item.floor for item in items.values()}
+    for entry in payload.items:
+        item = items[entry.id]
+        for key, value in entry.model_dump(exclude_unset=True, exclude={"id"}).items():
+            setattr(item, key, value)
+        session.add(item)
+    floors |= {item.floor for item in items.values()}
+    session.flush()
+    overlaps = overlap_report(session, floors, only=set(items), cached=False)
+    if overlaps and payload.reject_overlaps:
+        session.rollback()
+        raise HTTPException(status_code=409, detail={"message": "Rooms would overlap", "overlaps": overlaps})
+    updated = [items[item_id].model_dump() for item_id in dict.fromkeys(ids)]
+    session.commit()
+    invalidate_floorplan(*floors)
+    return {"updated": updated, "overlaps": overlaps}
+
+
 @router.put("/floorplan/{item_id}")
 def update_floorplan_item(item_id: int, payload: FloorPlanItemUpdate, user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
     item = session.get(FloorPlanItem, item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Floor plan item not found")
+    old_floor = item.floor
     for key, value in payload.model_dump(exclude_unset=True).items():
         setattr(item, key, value)
     session.add(item)
     session.commit()
     session.refresh(item)
+    invalidate_floorplan(old_floor, item.floor)
     return item
 
 
@@ -498,40 +869,116 @@ def delete_floorplan_item(item_id: int, user: dict = Depends(_get_current_erp_us
     item = session.get(FloorPlanItem, item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Floor plan item not found")
+    floor = item.floor
     session.delete(item)
     session.commit()
+    invalidate_floorplan(floor)
     return {"message": "Floor plan item deleted"}
 
 
 # Inventory
 @router.get("/inventory")
-def list_inventory(user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
+def list_inventory(user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_read_session)):
     return session.exec(select(InventoryItem)).all()
 
 
 @router.post("/inventory")
 def create_inventory_item(payload: InventoryCreate, user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
-    item = InventoryItem(**payload.model_dump())
+    item = InventoryItem(**payload.model_dump(), status=derive_status(payload.quantity, payload.low_threshold))
     session.add(item)
+    session.flush()
+    if item.quantity:
+        session.add(StockMovement(
+            item_id=item.id, delta=item.quantity, quantity_after=item.quantity, reason="initial", actor=user.get("sub")
+        ))
     session.commit()
     session.refresh(item)
     return item
 
 
-@router.put("/inventory/{item_id}")
-def update_inventory_item(item_id: int, payload: InventoryUpdate, user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
+def _apply_inventory_update(session: Session, item_id: int, payload: InventoryUpdate, actor: Optional[str] = None) -> InventoryItem:
     item = session.get(InventoryItem, item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Inventory item not found")
-    for key, value in payload.model_dump(exclude_unset=True).items():
+    data = payload.model_dump(exclude_unset=True)
+    quantity = data.pop("quantity", None)
+    for key, value in data.items():
         setattr(item, key, value)
     item.updated_at = datetime.utcnow()
+    if "low_threshold" in data:
+        item.status = derive_status(item.quantity, item.low_threshold)
     session.add(item)
+    if quantity is not None:
+        # Absolute quantities are stock counts: applied atomically and logged in the ledger.
+        session.flush()
+        count_stock(session, item_id, quantity, actor=actor)
+    return item
+
+
+@router.put("/inventory/{item_id}")
+def update_inventory_item(item_id: int, payload: InventoryUpdate, user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
+    item = _apply_inventory_update(session, item_id, payload, actor=user.get("sub"))
     session.commit()
     session.refresh(item)
     return item
 
 
+@router.post("/inventory/{item_id}/adjust")
+def adjust_inventory_item(item_id: int, payload: StockAdjust, user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
+    """Add (restock) or remove (consume/waste) stock without knowing the current quantity."""
+    movement = adjust_stock(session, item_id, payload.delta, payload.reason, payload.note, actor=user.get("sub"))
+    session.commit()
+    item = session.get(InventoryItem, item_id)
+    return {"item": item, "movement": movement}
+
+
+@router.post("/inventory/{item_id}/count")
+def count_inventory_item(item_id: int, payload: StockCount, user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
+    """Record a physical stock take; the difference goes into the ledger."""
+    movement = count_stock(session, item_id, payload.quantity, payload.note, actor=user.get("sub"))
+    session.commit()
+    item = session.get(InventoryItem, item_id)
+    return {"item": item, "movement": movement}
+
+
+@router.get("/inventory/{item_id}/movements")
+def list_stock_movements(
+    item_id: int,
+    limit: int = Query(50, ge=1, le=500),
+    before_id: Optional[int] = None,
+    user: dict = Depends(_get_current_erp_user),
+    session: Session = Depends(get_read_session),
+):
+    """Newest-first ledger entries for one item; pass the last id as `before_id` for the next page."""
+    stmt = select(StockMovement).where(StockMovement.item_id == item_id)
+    if before_id is not None:
+        stmt = stmt.where(StockMovement.id < before_id)
+    return session.exec(stmt.order_by(StockMovement.id.desc()).limit(limit)).all()
+
+
+@router.get("/inventory/consumption")
+def inventory_consumption(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    period: str = Query("day", pattern="^(day|week|month)$"),
+    category: Optional[str] = None,
+    item_id: Optional[int] = None,
+    user: dict = Depends(_get_current_erp_user),
+    session: Session = Depends(get_read_session),
+):
+    """Per-item consumed/restocked/net totals per period, aggregated in SQL from the ledger."""
+    end = end or date.today()
+    start = start or end - timedelta(days=30)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    return {
+        "start": start,
+        "end": end,
+        "period": period,
+        "rows": consumption_summary(session, start, end, period, category, item_id),
+    }
+
+
 @router.delete("/inventory/{item_id}")
 def delete_inventory_item(item_id: int, user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
     item = session.get(InventoryItem, item_id)
@@ -571,15 +1018,20 @@ def create_announcement(payload: AnnouncementCreate, user: dict = Depends(_get_c
     return ann
 
 
-@router.put("/announcements/{ann_id}")
-def update_announcement(ann_id: int, payload: AnnouncementUpdate, user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
-    _require_admin(user)
+def _apply_announcement_update(session: Session, ann_id: int, payload: AnnouncementUpdate) -> Announcement:
     ann = session.get(Announcement, ann_id)
     if not ann:
         raise HTTPException(status_code=404, detail="Announcement not found")
     for key, value in payload.model_dump(exclude_unset=True).items():
         setattr(ann, key, value)
     session.add(ann)
+    return ann
+
+
+@router.put("/announcements/{ann_id}")
+def update_announcement(ann_id: int, payload: AnnouncementUpdate, user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
+    _require_admin(user)
+    ann = _apply_announcement_update(session, ann_id, payload)
     session.commit()
     session.refresh(ann)
     return ann
@@ -594,3 +1046,89 @@ def delete_announcement(ann_id: int, user: dict = Depends(_get_current_erp_user)
     session.delete(ann)
     session.commit()
     return {"message": "Announcement deleted"}
+
+
+# Batch
+# op -> (payload schema, apply function, model prefetched by id, admin only)
+BATCH_OPERATIONS = {
+    "room.update": (None, _apply_room_update, Room, False),
+    "booking.status": (BookingStatusUpdate, _apply_booking_status, Booking, False),
+    "checkin.update": (CheckInUpdate, _apply_checkin_update, CheckInRecord, False),
+    "housekeeping.update": (HousekeepingUpdate, _apply_housekeeping_update, HousekeepingTask, False),
+    "inventory.update": (InventoryUpdate, _apply_inventory_update, InventoryItem, False),
+    "announcement.update": (AnnouncementUpdate, _apply_announcement_update, Announcement, True),
+}
+
+
+def _batch_result(session: Session, obj) -> dict:
+    if isinstance(obj, BookingMeta):
+        # Leave the (possibly large) payment proof out of the echo.
+        return {"booking_id": obj.booking_id, "status": obj.status, "payment_status": obj.payment_status}
+    if inspect(obj).expired_attributes:
+        session.refresh(obj)  # e.g. inventory quantities written by an atomic UPDATE
+    return obj.model_dump()
+
+
+@router.post("/batch")
+def run_batch(payload: BatchRequest, user: dict = Depends(_get_current_erp_user), session: Session = Depends(get_session)):
+    """Apply many single-row updates in one transaction with one commit.
+
+    Every operation is validated against the schema of its single-row
+    endpoint before anything is written, and admin-only operations keep
+    their role check. The batch is all or nothing: the first failing
+    operation rolls everything back and its status code is returned along
+    with per-operation results.
+    """
+    operations = payload.operations
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_OPERATIONS} operations per batch")
+
+    if any(BATCH_OPERATIONS[operation.op][3] for operation in operations):
+        _require_admin(user)
+
+    parsed, errors = [], []
+    for index, operation in enumerate(operations):
+        schema, apply, _, _ = BATCH_OPERATIONS[operation.op]
+        try:
+            parsed.append((operation, apply, schema.model_validate(operation.data) if schema else operation.data))
+        except ValidationError as e:
+            errors.append({"index": index, "op": operation.op, "errors": e.errors(include_url=False)})
+    if errors:
+        raise HTTPException(status_code=422, detail=errors)
+
+    # Load every targeted row up front so each operation's session.get is an
+    # identity-map hit; `loaded` keeps them referenced (the map is weak).
+    ids_by_model: dict = {}
+    for operation in operations:
+        model = BATCH_OPERATIONS[operation.op][2]
+        if model is not None:
+            ids_by_model.setdefault(model, set()).add(operation.id)
+    loaded = [session.exec(select(model).where(model.id.in_(ids))).all() for model, ids in ids_by_model.items()]
+
+    results, applied = [], []
+    for index, (operation, apply, data) in enumerate(parsed):
+        try:
+            applied.append(apply(session, operation.id, data))
+        except HTTPException as e:
+            session.rollback()
+            results.append({"index": index, "op": operation.op, "id": operation.id, "status": "error", "detail": e.detail})
+            results.extend(
+                {"index": i, "op": op.op, "id": op.id, "status": "skipped"}
+                for i, (op, _, _) in enumerate(parsed[index + 1:], start=index + 1)
+            )
+            for result in results[:index]:
+                result["status"] = "rolled_back"
+            raise HTTPException(status_code=e.status_code, detail={"message": "Batch rolled back", "results": results})
+        results.append({"index": index, "op": operation.op, "id": operation.id, "status": "ok"})
+    # One flush lets the ORM group identical UPDATEs into executemany calls.
+    session.flush()
+    for result, obj in zip(results, applied):
+        result["result"] = _batch_result(session, obj)
+    session.commit()
+    booking_ids = [op.id for op in operations if op.op == "booking.status"]
+    if booking_ids:
+        booking_lookup.invalidate(*booking_ids)
+        forecast.booking_changed(*booking_ids)
+    if any(op.op == "room.update" for op in operations):
+        rates.invalidate()
+    return {"results": results}
@@ -1,13 +1,15 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlmodel import Session, select
-from datetime import datetime
-from ..db_core import get_session
+from datetime import date, datetime, timedelta
+from ..db_core import get_read_session
 from ..models import Announcement
+from ..schemas import QuoteRequest
+from ..utils import rates
 
 router = APIRouter(prefix="/api/public", tags=["Public"])
 
 @router.get("/announcements")
-def list_public_announcements(session: Session = Depends(get_session)):
+def list_public_announcements(session: Session = Depends(get_read_session)):
     now = datetime.utcnow()
     announcements = session.exec(select(Announcement)).all()
     filtered = []
@@ -20,3 +22,30 @@ def list_public_announcements(session: Session = Depends(get_session)):
             continue
         filtered.append(a)
     return filtered
+
+
+@router.get("/rates/grid")
+def rate_grid(
+    room_type: str,
+    start: date,
+    days: int = Query(31, ge=1, le=366),
+    nights: int = Query(1, ge=1, le=365),
+    session: Session = Depends(get_read_session),
+):
+    """Price of a `nights`-night stay for each check-in day from `start` (month views)."""
+    totals = rates.grid(session, room_type, start, days, nights)
+    return {"room_type": room_type, "start": start, "nights": nights, "totals": totals}
+
+
+@router.post("/rates/quote")
+def quote_stays(payload: QuoteRequest, session: Session = Depends(get_read_session)):
+    check_ins = [stay.check_in for stay in payload.stays]
+    nights = [stay.nights for stay in payload.stays]
+    totals = rates.quote(session, payload.room_type, check_ins, nights)
+    return {
+        "room_type": payload.room_type,
+        "quotes": [
+            {"check_in": d, "check_out": d + timedelta(days=n), "nights": n, "total": total}
+            for d, n, total in zip(check_ins, nights, totals)
+        ],
+    }
@@ -1,5 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator, model_validator
 from datetime import date, datetime
+from typing import Annotated, Any, Literal
 
 class BookingCreate(BaseModel):
     name: str
@@ -15,6 +16,19 @@ class ContactCreate(BaseModel):
     email: str
     message: str
 
+class ContactMessageRead(ContactCreate):
+    id: int
+    created_at: datetime
+    status: str
+    read_at: datetime | None = None
+    archived_at: datetime | None = None
+
+class MessageStatusUpdate(BaseModel):
+    status: Literal["new", "read", "archived"]
+
+class MessageBulkStatusUpdate(MessageStatusUpdate):
+    ids: list[int] = Field(min_length=1, max_length=500)
+
 class AdminLogin(BaseModel):
     email: str
     password: str
@@ -45,6 +59,54 @@ class RoomUpdate(BaseModel):
     image_url: str | None = None
     is_available: bool | None = None
 
+class RoomRead(RoomCreate):
+    id: int
+    created_at: datetime
+
+class RateRuleCreate(BaseModel):
+    room_type: str
+    name: str
+    start_date: date | None = None
+    end_date: date | None = None
+    weekdays: list[Annotated[int, Field(ge=0, le=6)]] | None = None  # 0 = Monday
+    min_nights: int = Field(1, ge=1)
+    nightly_rate: float | None = Field(None, ge=0)
+    multiplier: float = Field(1.0, ge=0)
+    priority: int = 0
+    is_active: bool = True
+
+class RateRuleUpdate(BaseModel):
+    room_type: str | None = None
+    name: str | None = None
+    start_date: date | None = None
+    end_date: date | None = None
+    weekdays: list[Annotated[int, Field(ge=0, le=6)]] | None = None
+    min_nights: int | None = Field(None, ge=1)
+    nightly_rate: float | None = Field(None, ge=0)
+    multiplier: float | None = Field(None, ge=0)
+    priority: int | None = None
+    is_active: bool | None = None
+
+class RateRuleRead(RateRuleCreate):
+    id: int
+    created_at: datetime
+
+    @field_validator("weekdays", mode="before")
+    @classmethod
+    def _split_weekdays(cls, value):
+        # Stored as a comma-separated string on RateRule.
+        if isinstance(value, str):
+            return [int(part) for part in value.split(",") if part.strip()]
+        return value
+
+class StayQuote(BaseModel):
+    check_in: date
+    nights: int = Field(ge=1, le=365)
+
+class QuoteRequest(BaseModel):
+    room_type: str
+    stays: list[StayQuote] = Field(min_length=1, max_length=1000)
+
 class PaymentAccountCreate(BaseModel):
     label: str
     bank_name: str
@@ -59,6 +121,18 @@ class PaymentAccountUpdate(BaseModel):
     account_number: str | None = None
     instructions: str | None = None
 
+class PropertyCreate(BaseModel):
+    name: str
+    code: str
+    address: str | None = None
+    is_active: bool = True
+
+class PropertyUpdate(BaseModel):
+    name: str | None = None
+    code: str | None = None
+    address: str | None = None
+    is_active: bool | None = None
+
 class BookingStatusUpdate(BaseModel):
     status: str
     payment_status: str | None = None
@@ -108,6 +182,29 @@ class StaffUpdate(BaseModel):
     password: str | None = None
     staff_code: str | None = None
 
+# Never carries password_hash.
+class StaffRead(BaseModel):
+    id: int
+    name: str
+    email: str
+    phone: str
+    role: str
+    staff_code: str | None = None
+    department: str | None = None
+    gender: str | None = None
+    house_resident: bool = False
+    state_of_origin: str | None = None
+    town: str | None = None
+    next_of_kin_name: str | None = None
+    next_of_kin_phone: str | None = None
+    address: str | None = None
+    shift: str | None = None
+    account_details: str | None = None
+    status: str
+    salary: float = 0
+    hired_at: date | None = None
+    created_at: datetime
+
 class ERPLogin(BaseModel):
     email: str | None = None
     password: str | None = None
@@ -119,19 +216,40 @@ class ERPUserResponse(BaseModel):
     role: str
     name: str
 
+# Inventory status is derived server-side from quantity and low_threshold.
 class InventoryCreate(BaseModel):
     name: str
     category: str = "general"
     quantity: float = 0
     unit: str = "pcs"
-    status: str = "available"
+    low_threshold: float = 0
 
 class InventoryUpdate(BaseModel):
     name: str | None = None
     category: str | None = None
-    quantity: float | None = None
+    quantity: float | None = None  # absolute stock count, logged as a "count" movement
     unit: str | None = None
-    status: str | None = None
+    low_threshold: float | None = None
+
+class StockAdjust(BaseModel):
+    delta: float
+    reason: Literal["restock", "consume", "waste", "adjust"] = "adjust"
+    note: str | None = None
+
+    @model_validator(mode="after")
+    def _delta_matches_reason(self):
+        # The ledger and consumption reports trust the reason's direction.
+        if self.reason == "restock" and self.delta <= 0:
+            raise ValueError("restock delta must be positive")
+        if self.reason in ("consume", "waste") and self.delta >= 0:
+            raise ValueError(f"{self.reason} delta must be negative")
+        if self.delta == 0:
+            raise ValueError("delta must not be zero")
+        return self
+
+class StockCount(BaseModel):
+    quantity: float
+    note: str | None = None
 
 class AnnouncementCreate(BaseModel):
     title: str
@@ -161,6 +279,10 @@ class GuestProfileUpdate(BaseModel):
     preferences: str | None = None
     notes: str | None = None
 
+class GuestProfileRead(GuestProfileCreate):
+    id: int
+    created_at: datetime
+
 class GuestReceiptCreate(BaseModel):
     name: str
     data_url: str
@@ -184,13 +306,16 @@ class CheckInUpdate(BaseModel):
     status: str | None = None
     notes: str | None = None
 
+class CheckInRead(CheckInCreate):
+    id: int
+
 class HousekeepingCreate(BaseModel):
     room_id: str
     room_number: str
     task_type: str
     status: str
     priority: str
-    assigned_to: str
+    assigned_to: str = ""  # empty: assign automatically
     description: str
 
 class HousekeepingUpdate(BaseModel):
@@ -203,24 +328,49 @@ class HousekeepingUpdate(BaseModel):
     description: str | None = None
     completed_at: datetime | None = None
 
+# Infinity/NaN would break the floor index spans and overlap checks.
+FiniteFloat = Annotated[float, Field(allow_inf_nan=False)]
+
 class FloorPlanItemCreate(BaseModel):
     room_id: str
     room_number: str
-    x: float
-    y: float
-    width: float
-    height: float
+    x: FiniteFloat
+    y: FiniteFloat
+    width: FiniteFloat
+    height: FiniteFloat
     floor: str = "1"
 
 class FloorPlanItemUpdate(BaseModel):
     room_id: str | None = None
     room_number: str | None = None
-    x: float | None = None
-    y: float | None = None
-    width: float | None = None
-    height: float | None = None
+    x: FiniteFloat | None = None
+    y: FiniteFloat | None = None
+    width: FiniteFloat | None = None
+    height: FiniteFloat | None = None
     floor: str | None = None
 
+class FloorPlanBatchItem(FloorPlanItemUpdate):
+    id: int
+
+class FloorPlanBatchUpdate(BaseModel):
+    items: list[FloorPlanBatchItem]
+    reject_overlaps: bool = False  # roll back with 409 if any moved room overlaps another
+
 class StaffDocumentCreate(BaseModel):
     name: str
     url: str
+
+class BatchOperation(BaseModel):
+    op: Literal[
+        "room.update",
+        "booking.status",
+        "checkin.update",
+        "housekeeping.update",
+        "inventory.update",
+        "announcement.update",
+    ]
+    id: int
+    data: dict[str, Any] = Field(default_factory=dict)
+
+class BatchRequest(BaseModel):
+    operations: list[BatchOperation]
@@ -0,0 +1,164 @@
+"""Hot/cold archival of finished bookings.
+
+Bookings whose check_out is more than BOOKING_ARCHIVE_DAYS days ago move,
+together with their BookingMeta row, into ArchivedBooking /
+ArchivedBookingMeta with the same ids and reference numbers. A background
+job (utils/jobs) does this every BOOKING_ARCHIVE_INTERVAL seconds in
+batches of BOOKING_ARCHIVE_BATCH, each batch one transaction (through the
+SQLite write queue when that is on). The newest booking is never moved so
+SQLite cannot hand its id out again.
+
+Readers fall through to the archive only when they have to: reference
+lookups after a miss on the hot table, reports when their date range
+reaches back past the archive horizon, listings/exports on request.
+"""
+from datetime import date, datetime, timedelta
+import os
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, literal, select, union_all
+from sqlmodel import Session
+
+from ..models import ArchivedBooking, ArchivedBookingMeta, Booking, BookingMeta
+from .cache import TTLCache
+from .jobs import in_transaction
+from .tenancy import bound
+
+BOOKING_ARCHIVE_DAYS = int(os.getenv("BOOKING_ARCHIVE_DAYS", "365"))  # 0 disables archival
+BOOKING_ARCHIVE_INTERVAL = float(os.getenv("BOOKING_ARCHIVE_INTERVAL", "21600"))
+BOOKING_ARCHIVE_BATCH = int(os.getenv("BOOKING_ARCHIVE_BATCH", "1000"))
+
+_BOOKING_COLUMNS = [c.name for c in Booking.__table__.c]
+_META_COLUMNS = [c.name for c in BookingMeta.__table__.c]
+
+# Latest archived check_out, cached so reports do not ask on every request.
+_watermark = TTLCache(float(os.getenv("ARCHIVE_WATERMARK_TTL", "300")), maxsize=1)
+
+
+def cutoff(today: Optional[date] = None) -> Optional[date]:
+    """Bookings checking out before this date are due for archival (None when disabled)."""
+    if BOOKING_ARCHIVE_DAYS <= 0:
+        return None
+    return (today or date.today()) - timedelta(days=BOOKING_ARCHIVE_DAYS)
+
+
+def _move_batch(conn, before: date, batch_size: int) -> tuple[int, Optional[date]]:
+    hot, meta = Booking.__table__, BookingMeta.__table__
+    cold, cold_meta = ArchivedBooking.__table__, ArchivedBookingMeta.__table__
+    newest = select(func.max(hot.c.id)).scalar_subquery()
+    due = select(hot.c.id).where(hot.c.check_out < before, hot.c.id < newest).order_by(hot.c.id).limit(batch_size)
+
+    def copy(ids):
+        return insert(cold).from_select(
+            _BOOKING_COLUMNS + ["archived_at"],
+            select(*(hot.c[name] for name in _BOOKING_COLUMNS), literal(datetime.utcnow(), cold.c.archived_at.type))
+            .where(hot.c.id.in_(ids)),
+        )
+
+    if conn.dialect.insert_returning:
+        # Write first so SQLite takes the write lock before anything is read;
+        # RETURNING hands back exactly the ids this batch copied.
+        ids = conn.execute(copy(due).returning(cold.c.id)).scalars().all()
+    else:
+        ids = conn.execute(due).scalars().all()
+        if ids:
+            conn.execute(copy(ids))
+    if not ids:
+        return 0, None
+    latest = conn.execute(select(func.max(hot.c.check_out)).where(hot.c.id.in_(ids))).scalar()
+    conn.execute(
+        insert(cold_meta).from_select(
+            _META_COLUMNS, select(*(meta.c[name] for name in _META_COLUMNS)).where(meta.c.booking_id.in_(ids))
+        )
+    )
+    conn.execute(delete(meta).where(meta.c.booking_id.in_(ids)))
+    conn.execute(delete(hot).where(hot.c.id.in_(ids)))
+    return len(ids), latest
+
+
+def archive_bookings(before: Optional[date] = None, batch_size: int = BOOKING_ARCHIVE_BATCH) -> int:
+    """Move bookings checking out before `before` (default: the horizon) to the archive; returns how many."""
+    before = before or cutoff()
+    if before is None:
+        return 0
+    moved = 0
+    while True:
+        count, latest = in_transaction(lambda conn: _move_batch(conn, before, batch_size))
+        if not count:
+            break
+        moved += count
+        current = _watermark.get("latest", (None,))[0]
+        if current is None or latest > current:
+            _watermark.set("latest", (latest,))
+    return moved
+
+
+def run_scheduled() -> dict:
+    return {"archived": archive_bookings()}
+
+
+def archived_until(session: Session) -> Optional[date]:
+    """Latest check_out in the archive across every property (None when empty)."""
+    cached = _watermark.get("latest")
+    if cached is None:
+        with bound(None):
+            cached = (session.execute(select(func.max(ArchivedBooking.check_out))).scalar(),)
+        _watermark.set("latest", cached)
+    return cached[0]
+
+
+def archive_needed(session: Session, start: Optional[date]) -> bool:
+    """Whether bookings checking out on/after `start` (None: any) can be in the archive."""
+    if start is None:
+        return True
+    horizon = cutoff()
+    if horizon is not None and start < horizon:
+        return True
+    watermark = archived_until(session)
+    return watermark is not None and start <= watermark
+
+
+def stays(session: Session, start: Optional[date] = None, end: Optional[date] = None) -> list:
+    """(room_type, check_in, check_out) rows of bookings overlapping [start, end], hot and archived as needed."""
+    def stmt(model):
+        query = select(model.room_type, model.check_in, model.check_out)
+        if start is not None:
+            query = query.where(model.check_out >= start)
+        if end is not None:
+            query = query.where(model.check_in <= end)
+        return query
+
+    if archive_needed(session, start):
+        return session.execute(union_all(stmt(Booking), stmt(ArchivedBooking))).all()
+    return session.execute(stmt(Booking)).all()
+
+
+def archived_listing(session: Session) -> list[dict]:
+    """Archived bookings in the shape of the booking listings, marked ``archived``."""
+    rows = session.execute(
+        select(
+            ArchivedBooking.id,
+            ArchivedBooking.reference_number,
+            ArchivedBooking.name,
+            ArchivedBooking.email,
+            ArchivedBooking.room_type,
+            ArchivedBooking.check_in,
+            ArchivedBooking.check_out,
+            ArchivedBooking.created_at,
+            func.coalesce(ArchivedBookingMeta.status, "pending").label("status"),
+            func.coalesce(ArchivedBookingMeta.payment_status, "unpaid").label("payment_status"),
+            ArchivedBookingMeta.payment_proof,
+        )
+        .outerjoin(ArchivedBookingMeta, ArchivedBookingMeta.booking_id == ArchivedBooking.id)
+        .order_by(ArchivedBooking.id)
+    )
+    return [{**row._mapping, "archived": True} for row in rows]
+
+
+def reference_exists(session: Session, reference: str) -> bool:
+    # References are unique across properties, so look past the current one.
+    with bound(None):
+        for model in (Booking, ArchivedBooking):
+            if session.execute(select(model.id).where(model.reference_number == reference).limit(1)).first():
+                return True
+    return False
@@ -0,0 +1,107 @@
+"""Public booking status lookup by reference number.
+
+Guests poll the status page, so the lookup is one indexed join of Booking
+and BookingMeta that leaves the payment proof blob out (only whether one is
+on file), and the encoded response is cached for BOOKING_LOOKUP_TTL seconds
+per property and reference together with an ETag. Staff status/proof
+changes drop the entry via `invalidate` once they commit, and for a few
+seconds afterwards (plus REPLICA_MAX_LAG with read replicas) lookups of
+those bookings are not cached, so a read that raced the change cannot put
+the old row back. Unknown references are not cached, so a booking is
+visible as soon as it is created. References missing from the hot tables
+are looked up in the archive (utils/archive).
+"""
+import hashlib
+import json
+import os
+from typing import Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
+from sqlmodel import Session
+
+from ..models import ArchivedBooking, ArchivedBookingMeta, Booking, BookingMeta
+from .cache import TTLCache
+from .replicas import DATABASE_REPLICA_URLS, REPLICA_MAX_LAG
+from .tenancy import current_property_id
+from .write_queue import after_commit
+
+BOOKING_LOOKUP_TTL = float(os.getenv("BOOKING_LOOKUP_TTL", "30"))
+
+# (property id, reference) -> (booking id, encoded body, etag)
+_cache = TTLCache(BOOKING_LOOKUP_TTL, maxsize=4096)
+# booking id -> True for bookings changed within the last few seconds
+_changed = TTLCache(1 + (REPLICA_MAX_LAG if DATABASE_REPLICA_URLS else 0), maxsize=4096)
+
+
+def _query(session: Session, reference: str, booking=Booking, meta=BookingMeta) -> Optional[dict]:
+    stmt = (
+        select(
+            booking.id,
+            booking.reference_number,
+            booking.name,
+            booking.email,
+            booking.phone,
+            booking.room_type,
+            booking.check_in,
+            booking.check_out,
+            booking.created_at,
+            meta.status,
+            meta.payment_status,
+            meta.payment_proof.is_not(None).label("has_payment_proof"),
+        )
+        .outerjoin(meta, meta.booking_id == booking.id)
+        .where(booking.reference_number == reference)
+        .limit(1)
+    )
+    row = session.execute(stmt).first()
+    if row is None:
+        if booking is Booking:
+            return _query(session, reference, ArchivedBooking, ArchivedBookingMeta)
+        return None
+    data = dict(row._mapping)
+    data["status"] = data["status"] or "pending"
+    data["payment_status"] = data["payment_status"] or "unpaid"
+    data["has_payment_proof"] = bool(data["has_payment_proof"])
+    return data
+
+
+def lookup(session: Session, reference: str) -> Optional[tuple[bytes, str]]:
+    """(JSON body, ETag) for `reference`, or None when there is no such booking."""
+    key = (current_property_id(), reference)
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached[1], cached[2]
+    data = _query(session, reference)
+    if data is None:
+        return None
+    body = json.dumps(jsonable_encoder(data), separators=(",", ":")).encode()
+    etag = '"%s"' % hashlib.sha1(body).hexdigest()[:20]
+    if _changed.get(data["id"]) is None:
+        _cache.set(key, (data["id"], body, etag))
+    return body, etag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def _drop(booking_ids: tuple[int, ...]) -> None:
+    if not booking_ids:
+        _cache.clear()
+        return
+    ids = set(booking_ids)
+    for booking_id in ids:
+        _changed.set(booking_id, True)
+    _cache.pop_where(lambda _, value: value[0] in ids)
+
+
+def invalidate(*booking_ids: int) -> None:
+    """Drop cached lookups for `booking_ids` (everything when none given) once the write commits."""
+    after_commit(lambda: _drop(booking_ids))
@@ -0,0 +1,46 @@
+"""Named counters kept in the Counter table.
+
+Writers call `add` in the same transaction as the change being counted, so
+reading a count is a primary-key lookup instead of a COUNT(*). A counter
+row only exists once it has been read: `get` seeds it from the `recount`
+query the first time, and `add` on a missing row is a no-op because the
+seed will include that change anyway. The seed counts and inserts in one
+statement; on databases with concurrent writers a change committed while
+that statement runs can still be missed, leaving the count off until the
+next `reset` (used by periodic jobs to correct any drift).
+"""
+from sqlalchemy import Select, insert, literal, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+
+from ..models import Counter
+
+
+def add(session: Session, name: str, delta: int) -> None:
+    if delta:
+        session.execute(update(Counter).where(Counter.name == name).values(value=Counter.value + delta))
+
+
+def get(session: Session, name: str, recount: Select) -> int:
+    """Current value of counter `name`, seeding it from the `recount` COUNT query if missing."""
+    value = session.execute(select(Counter.value).where(Counter.name == name)).scalar()
+    if value is not None:
+        return value
+    try:
+        with session.begin_nested():
+            session.execute(
+                insert(Counter).from_select(["name", "value"], select(literal(name), recount.scalar_subquery()))
+            )
+        session.commit()
+    except IntegrityError:
+        # Another request seeded it first.
+        session.rollback()
+    return session.execute(select(Counter.value).where(Counter.name == name)).scalar_one()
+
+
+def reset(session: Session, name: str, recount: Select) -> int:
+    """Overwrite the counter with a fresh recount; the caller commits."""
+    value = session.execute(recount).scalar_one()
+    if session.execute(update(Counter).where(Counter.name == name).values(value=value)).rowcount == 0:
+        session.add(Counter(name=name, value=value))
+    return value
@@ -0,0 +1,117 @@
+"""ERP dashboard KPIs.
+
+Everything the dashboard shows comes from a handful of aggregate queries
+(conditional sums and GROUP BYs, no row lists), cached per property and
+role for DASHBOARD_TTL seconds. Only admins get the staff figures, matching the
+staff endpoints. The numbers can be that many seconds behind; writers in
+this process do not invalidate them.
+"""
+from datetime import date
+import os
+from typing import Optional
+
+from sqlalchemy import case, distinct, func, select
+from sqlmodel import Session
+
+from ..models import Booking, BookingMeta, CheckInRecord, HousekeepingTask, InventoryItem, Room, StaffMember
+from .cache import TTLCache
+from .tenancy import current_property_id
+
+DASHBOARD_TTL = float(os.getenv("DASHBOARD_TTL", "15"))
+
+_cache = TTLCache(DASHBOARD_TTL, maxsize=256)
+
+
+def _count_when(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def _bookings(session: Session, today: date) -> dict:
+    not_cancelled = func.coalesce(BookingMeta.status, "pending") != "cancelled"
+    row = session.execute(
+        select(
+            _count_when(Booking.check_in == today),
+            _count_when(Booking.check_out == today),
+            _count_when(Booking.check_out > today),
+        )
+        .outerjoin(BookingMeta, BookingMeta.booking_id == Booking.id)
+        .where(Booking.check_in <= today, Booking.check_out >= today, not_cancelled)
+    ).one()
+    pending_payments = session.execute(
+        select(func.count()).select_from(BookingMeta).where(BookingMeta.payment_status == "pending", not_cancelled)
+    ).scalar_one()
+    return {
+        "arrivals": row[0],
+        "departures": row[1],
+        "staying_tonight": row[2],
+        "pending_payments": pending_payments,
+    }
+
+
+def _housekeeping(session: Session) -> dict:
+    by_status: dict[str, int] = {}
+    open_by_priority: dict[str, int] = {}
+    for status, priority, count in session.execute(
+        select(HousekeepingTask.status, HousekeepingTask.priority, func.count())
+        .group_by(HousekeepingTask.status, HousekeepingTask.priority)
+    ):
+        by_status[status] = by_status.get(status, 0) + count
+        if status != "completed":
+            key = (priority or "medium").lower()
+            open_by_priority[key] = open_by_priority.get(key, 0) + count
+    dirty_rooms = session.execute(
+        select(func.count(distinct(HousekeepingTask.room_id))).where(
+            HousekeepingTask.task_type == "cleaning", HousekeepingTask.status != "completed"
+        )
+    ).scalar_one()
+    return {"by_status": by_status, "open_by_priority": open_by_priority, "dirty_rooms": dirty_rooms}
+
+
+def compute(session: Session, role: str, today: Optional[date] = None) -> dict:
+    today = today or date.today()
+    bookings = _bookings(session, today)
+    housekeeping = _housekeeping(session)
+    rooms_total, rooms_unavailable = session.execute(
+        select(func.count(), _count_when(Room.is_available.is_(False)))
+    ).one()
+    in_house = session.execute(
+        select(func.count(distinct(CheckInRecord.booking_id))).where(CheckInRecord.status == "checked_in")
+    ).scalar_one()
+    stock = dict(
+        session.execute(
+            select(InventoryItem.status, func.count())
+            .where(InventoryItem.status.in_(("low", "out")))
+            .group_by(InventoryItem.status)
+        ).all()
+    )
+    kpis = {
+        "date": today,
+        "arrivals_today": bookings["arrivals"],
+        "departures_today": bookings["departures"],
+        "in_house": in_house,
+        "pending_payments": bookings["pending_payments"],
+        "dirty_rooms": housekeeping["dirty_rooms"],
+        "housekeeping_by_status": housekeeping["by_status"],
+        "open_tasks_by_priority": housekeeping["open_by_priority"],
+        "low_stock_items": stock.get("low", 0),
+        "out_of_stock_items": stock.get("out", 0),
+        "rooms_total": rooms_total,
+        "rooms_unavailable": rooms_unavailable,
+        "booked_tonight": bookings["staying_tonight"],
+        "occupancy_rate": bookings["staying_tonight"] / rooms_total if rooms_total else 0.0,
+    }
+    if role == "admin":
+        kpis["active_staff"] = session.execute(
+            select(func.count()).select_from(StaffMember).where(StaffMember.status == "active")
+        ).scalar_one()
+    return kpis
+
+
+def kpis(session: Session, role: str) -> dict:
+    """Cached `compute` for `role`."""
+    key = (current_property_id(), role, date.today())
+    cached = _cache.get(key)
+    if cached is None:
+        cached = compute(session, role)
+        _cache.set(key, cached)
+    return cached
@@ -2,6 +2,8 @@ from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
 from pydantic import EmailStr
 from dotenv import load_dotenv
 import os
+import time
+from .metrics import NOTIFY_LATENCY, NOTIFY_FAILURES
 
 load_dotenv()
 
@@ -36,5 +38,12 @@ async def send_email(to: EmailStr, subject: str, body: str):
         subtype="html"
     )
     fm = FastMail(_build_mail_config())
-    await fm.send_message(message)
+    start = time.perf_counter()
+    try:
+        await fm.send_message(message)
+    except Exception:
+        NOTIFY_FAILURES.inc(channel="email")
+        raise
+    finally:
+        NOTIFY_LATENCY.observe(time.perf_counter() - start, channel="email")
     return {"status": "Email sent"}
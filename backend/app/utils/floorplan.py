@@ -0,0 +1,166 @@
+"""Per-floor uniform grid index over FloorPlanItem rectangles.
+
+Each floor's rectangles are bucketed into square cells of GRID_CELL_SIZE
+floor plan units, so viewport (bbox) queries, hit tests and overlap checks
+only look at items sharing a cell instead of the whole floor. Indexes are
+built lazily from the database per property (utils/tenancy), dropped by
+`invalidate` after this process writes, and rebuilt after
+FLOORPLAN_INDEX_TTL seconds so writes from other workers show up too.
+"""
+from math import floor as _floor, isfinite
+import os
+import threading
+import time
+from typing import Iterable, Optional
+
+from sqlmodel import Session, select
+
+from ..models import FloorPlanItem
+from .tenancy import current_property_id
+
+GRID_CELL_SIZE = float(os.getenv("FLOORPLAN_GRID_CELL", "200"))
+FLOORPLAN_INDEX_TTL = float(os.getenv("FLOORPLAN_INDEX_TTL", "30"))
+MAX_CELLS_PER_ITEM = 1024
+
+Box = tuple[float, float, float, float]  # (min_x, min_y, max_x, max_y)
+
+
+def parse_bbox(value: str) -> Box:
+    """Parse ``min_x,min_y,max_x,max_y``; raises ValueError on bad input."""
+    parts = [float(p) for p in value.split(",")]
+    if len(parts) != 4:
+        raise ValueError("bbox must be min_x,min_y,max_x,max_y")
+    if not all(isfinite(p) for p in parts):
+        raise ValueError("bbox values must be finite numbers")
+    min_x, min_y, max_x, max_y = parts
+    if min_x > max_x or min_y > max_y:
+        raise ValueError("bbox min must not exceed max")
+    return min_x, min_y, max_x, max_y
+
+
+def _box(item: dict) -> Box:
+    return item["x"], item["y"], item["x"] + item["width"], item["y"] + item["height"]
+
+
+def overlap_area(a: Box, b: Box) -> float:
+    """Area shared by two boxes; touching edges do not count."""
+    w = min(a[2], b[2]) - max(a[0], b[0])
+    h = min(a[3], b[3]) - max(a[1], b[1])
+    return w * h if w > 0 and h > 0 else 0.0
+
+
+class FloorIndex:
+    """Grid of item ids for one floor; items are plain FloorPlanItem row dicts."""
+
+    def __init__(self, items: Iterable[dict], cell: float = GRID_CELL_SIZE):
+        self.cell = cell
+        self.items: dict[int, dict] = {}
+        self.boxes: dict[int, Box] = {}
+        self.cells: dict[tuple[int, int], list[int]] = {}
+        # Items spanning more than MAX_CELLS_PER_ITEM cells are checked on every query instead.
+        self.large: list[int] = []
+        for item in items:
+            box = _box(item)
+            self.items[item["id"]] = item
+            self.boxes[item["id"]] = box
+            if self._cell_count(box) > MAX_CELLS_PER_ITEM:
+                self.large.append(item["id"])
+                continue
+            for key in self._cells(box):
+                self.cells.setdefault(key, []).append(item["id"])
+
+    def _span(self, box: Box) -> tuple[int, int, int, int]:
+        c = self.cell
+        return _floor(box[0] / c), _floor(box[1] / c), _floor(box[2] / c), _floor(box[3] / c)
+
+    def _cell_count(self, box: Box) -> int:
+        x0, y0, x1, y1 = self._span(box)
+        return (x1 - x0 + 1) * (y1 - y0 + 1)
+
+    def _cells(self, box: Box):
+        x0, y0, x1, y1 = self._span(box)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                yield cx, cy
+
+    def _candidates(self, box: Box) -> set[int]:
+        if self._cell_count(box) > len(self.cells):
+            return set(self.boxes)  # visiting the cells would cost more than a scan
+        found: set[int] = set(self.large)
+        for key in self._cells(box):
+            found.update(self.cells.get(key, ()))
+        return found
+
+    def query(self, box: Box) -> list[dict]:
+        """Items intersecting `box`, edges included (a zero-size box is a hit test)."""
+        hits = []
+        for item_id in self._candidates(box):
+            b = self.boxes[item_id]
+            if b[0] <= box[2] and b[2] >= box[0] and b[1] <= box[3] and b[3] >= box[1]:
+                hits.append(self.items[item_id])
+        return sorted(hits, key=lambda item: item["id"])
+
+    def overlaps(self, only: Optional[set[int]] = None) -> list[tuple[int, int, float]]:
+        """(id_a, id_b, area) for every overlapping pair, optionally only pairs touching `only`."""
+        pairs = {}
+        sources = self.boxes if only is None else [i for i in only if i in self.boxes]
+        for item_id in sources:
+            box = self.boxes[item_id]
+            for other in self._candidates(box):
+                if other == item_id:
+                    continue
+                key = (min(item_id, other), max(item_id, other))
+                if key in pairs:
+                    continue
+                area = overlap_area(box, self.boxes[other])
+                if area:
+                    pairs[key] = area
+        return [(a, b, area) for (a, b), area in sorted(pairs.items())]
+
+
+# (property id, floor) -> (built at, index)
+_indexes: dict[tuple[Optional[int], str], tuple[float, FloorIndex]] = {}
+_lock = threading.Lock()
+_COLUMNS = [getattr(FloorPlanItem, column.name) for column in FloorPlanItem.__table__.c]
+
+
+def floor_index(session: Session, floor: str, cached: bool = True) -> FloorIndex:
+    """Return the grid index for `floor`.
+
+    Pass ``cached=False`` inside a write transaction: the index is then built
+    from the session's uncommitted view and is not shared.
+    """
+    now = time.monotonic()
+    key = (current_property_id(), floor)
+    if cached:
+        with _lock:
+            entry = _indexes.get(key)
+        if entry and now - entry[0] < FLOORPLAN_INDEX_TTL:
+            return entry[1]
+    # Plain dicts rather than ORM instances: the index outlives this session.
+    rows = session.execute(select(*_COLUMNS).where(FloorPlanItem.floor == floor)).mappings()
+    index = FloorIndex(dict(row) for row in rows)
+    if cached:
+        with _lock:
+            _indexes[key] = (now, index)
+    return index
+
+
+def invalidate(*floors: str) -> None:
+    """Drop the current property's cached indexes for `floors` (every index when none given)."""
+    property_id = current_property_id()
+    with _lock:
+        if not floors:
+            _indexes.clear()
+        for floor in floors:
+            _indexes.pop((property_id, floor), None)
+
+
+def overlap_report(
+    session: Session, floors: Iterable[str], only: Optional[set[int]] = None, cached: bool = True
+) -> list[dict]:
+    report = []
+    for floor in sorted(set(floors)):
+        for a, b, area in floor_index(session, floor, cached).overlaps(only):
+            report.append({"floor": floor, "item_ids": [a, b], "area": round(area, 2)})
+    return report
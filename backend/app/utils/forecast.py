@@ -0,0 +1,258 @@
+"""Occupancy forecast from booking history (pickup method).
+
+Every booked room-night is counted in a per-room-type histogram indexed by
+night and lead time, i.e. how many days before the night the booking was
+created (capped at FORECAST_MAX_LEAD). Reverse cumulative sums along the
+lead axis give each night's on-the-books curve. Averaging, per weekday,
+how much past nights picked up after each lead gives the pickup curve,
+and a future night's forecast is what is on the books now plus the
+average pickup still to come at its lead, capped at the room count. The
+booking-pace curve is the share of a night's final room-nights already on
+the books at each lead. Cancelled bookings are left out.
+
+The histogram covers FORECAST_HISTORY_DAYS of past nights plus
+FORECAST_MAX_DAYS ahead and is kept between requests. Each request only
+folds in bookings created since the last one (by id) and bookings whose
+status changed (`booking_changed`). It is rebuilt from scratch when the
+date rolls over or after FORECAST_REBUILD_SECONDS, which also picks up
+status changes made by other workers. Each property keeps its own history
+(utils/tenancy).
+"""
+from datetime import date
+import os
+import threading
+import time
+from typing import Optional
+
+from fastapi import HTTPException
+import numpy as np
+from sqlalchemy import func, select, union_all
+from sqlmodel import Session
+
+from ..models import ArchivedBooking, ArchivedBookingMeta, Booking, BookingMeta, Room
+from .archive import archive_needed
+from .tenancy import current_property_id
+from .write_queue import after_commit
+
+FORECAST_HISTORY_DAYS = int(os.getenv("FORECAST_HISTORY_DAYS", "365"))
+FORECAST_MAX_DAYS = int(os.getenv("FORECAST_MAX_DAYS", "365"))
+FORECAST_MAX_LEAD = int(os.getenv("FORECAST_MAX_LEAD", "365"))
+FORECAST_REBUILD_SECONDS = float(os.getenv("FORECAST_REBUILD_SECONDS", "3600"))
+
+
+class _History:
+    """Room-night histograms for the nights [origin, origin + nights)."""
+
+    def __init__(self, today: date):
+        self.today = today
+        self.origin = today.toordinal() - FORECAST_HISTORY_DAYS
+        self.nights = FORECAST_HISTORY_DAYS + FORECAST_MAX_DAYS
+        self.counts: dict[str, np.ndarray] = {}  # room_type -> int32 [night, lead]
+        self.last_id = 0
+        self.excluded: set[int] = set()  # ids at or below last_id left out as cancelled
+        self.built_at = time.monotonic()
+        self.version = 0
+        self._curves: Optional[tuple[int, dict]] = None
+
+    def add(self, rows, sign: int = 1) -> None:
+        """Count (room_type, check_in, check_out, created_at) rows `sign` times."""
+        by_type: dict[str, list[tuple[int, int, int]]] = {}
+        for room_type, check_in, check_out, created_at in rows:
+            by_type.setdefault(room_type, []).append(
+                (check_in.toordinal(), check_out.toordinal(), created_at.date().toordinal())
+            )
+        for room_type, stays in by_type.items():
+            data = np.array(stays, dtype=np.int64)
+            first = np.maximum(data[:, 0], self.origin)
+            stop = np.minimum(data[:, 1], self.origin + self.nights)
+            lengths = np.maximum(stop - first, 0)
+            total = int(lengths.sum())
+            if not total:
+                continue
+            # One entry per booked night: its night index and lead time.
+            starts = np.repeat(first, lengths)
+            steps = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+            nights = starts + steps
+            leads = np.clip(nights - np.repeat(data[:, 2], lengths), 0, FORECAST_MAX_LEAD)
+            counts = self.counts.get(room_type)
+            if counts is None:
+                counts = self.counts[room_type] = np.zeros((self.nights, FORECAST_MAX_LEAD + 1), dtype=np.int32)
+            np.add.at(counts, (nights - self.origin, leads), sign)
+        self.version += 1
+
+    def curves(self) -> dict:
+        """room_type -> (on-the-books [night], pickup [weekday, lead], pace [lead]), cached per version."""
+        if self._curves is not None and self._curves[0] == self.version:
+            return self._curves[1]
+        today = self.today.toordinal() - self.origin
+        weekday = (self.origin + np.arange(self.nights) - 1) % 7  # date.fromordinal(1) is a Monday
+        past_weekday = weekday[:today]
+        curves = {}
+        for room_type, counts in self.counts.items():
+            # on_books[n, L]: room-nights for night n booked at least L days ahead.
+            on_books = np.cumsum(counts[:, ::-1], axis=1, dtype=np.int64)[:, ::-1]
+            final = on_books[:today, 0]
+            picked_up = final[:, None] - on_books[:today]
+            pickup = np.zeros((7, FORECAST_MAX_LEAD + 1))
+            for day in range(7):
+                rows = picked_up[past_weekday == day]
+                if len(rows):
+                    pickup[day] = rows.mean(axis=0)
+            booked = final.sum()
+            pace = on_books[:today].sum(axis=0) / booked if booked else np.zeros(FORECAST_MAX_LEAD + 1)
+            curves[room_type] = (on_books[:, 0], pickup, pace)
+        self._curves = (self.version, curves)
+        return curves
+
+
+_histories: dict[Optional[int], _History] = {}  # property id -> history
+_lock = threading.Lock()  # held while a history is built, refreshed or read
+_changed: dict[Optional[int], set[int]] = {}  # property id -> booking ids changed since its last refresh
+_changed_lock = threading.Lock()
+
+
+def _stay_rows(booking, meta, *where):
+    return (
+        select(booking.room_type, booking.check_in, booking.check_out, booking.created_at, booking.id)
+        .outerjoin(meta, meta.booking_id == booking.id)
+        .where(func.coalesce(meta.status, "pending") != "cancelled", *where)
+    )
+
+
+def _build(session: Session, today: date) -> _History:
+    history = _History(today)
+    first = date.fromordinal(history.origin)
+    last = date.fromordinal(history.origin + history.nights)
+    # Fix the id horizon first; anything newer is picked up by the next refresh.
+    history.last_id = max(
+        session.execute(select(func.max(Booking.id))).scalar() or 0,
+        session.execute(select(func.max(ArchivedBooking.id))).scalar() or 0,
+    )
+    stmt = _stay_rows(
+        Booking, BookingMeta, Booking.check_out > first, Booking.check_in < last, Booking.id <= history.last_id
+    )
+    if archive_needed(session, first):
+        stmt = union_all(
+            stmt,
+            _stay_rows(
+                ArchivedBooking, ArchivedBookingMeta, ArchivedBooking.check_out > first, ArchivedBooking.check_in < last
+            ),
+        )
+    history.add(row[:4] for row in session.execute(stmt))
+    history.excluded = set(
+        session.execute(
+            select(BookingMeta.booking_id).where(
+                BookingMeta.status == "cancelled", BookingMeta.booking_id <= history.last_id
+            )
+        ).scalars()
+    )
+    return history
+
+
+def _refresh(session: Session, history: _History, changed: set[int]) -> None:
+    """Fold in bookings created after `last_id` and re-check the `changed` ones."""
+    rows = session.execute(
+        select(
+            Booking.room_type, Booking.check_in, Booking.check_out, Booking.created_at, Booking.id,
+            func.coalesce(BookingMeta.status, "pending"),
+        )
+        .outerjoin(BookingMeta, BookingMeta.booking_id == Booking.id)
+        .where((Booking.id > history.last_id) | Booking.id.in_(changed))
+    ).all()
+    added, removed = [], []
+    for *stay, booking_id, status in rows:
+        counted = booking_id <= history.last_id and booking_id not in history.excluded
+        wanted = status != "cancelled"
+        if booking_id > history.last_id and not wanted:
+            history.excluded.add(booking_id)
+        elif wanted and not counted:
+            added.append(stay)
+            history.excluded.discard(booking_id)
+        elif counted and not wanted:
+            removed.append(stay)
+            history.excluded.add(booking_id)
+    if added:
+        history.add(added)
+    if removed:
+        history.add(removed, sign=-1)
+    history.last_id = max([history.last_id] + [row[4] for row in rows])
+
+
+def _note_changed(booking_ids: tuple[int, ...]) -> None:
+    # Ids from another property are harmless: its refresh query cannot see them.
+    with _changed_lock:
+        for changed in _changed.values():
+            changed.update(booking_ids)
+
+
+def booking_changed(*booking_ids: int) -> None:
+    """Note status changes, once they commit, so the next forecast re-checks these bookings."""
+    after_commit(lambda: _note_changed(booking_ids))
+
+
+def _take_changed(key: Optional[int]) -> set[int]:
+    with _changed_lock:
+        changed = _changed.get(key, set())
+        _changed[key] = set()
+    return changed
+
+
+def _curves(session: Session) -> tuple[_History, dict]:
+    """The current property's up-to-date history and its curves."""
+    key = current_property_id()
+    today = date.today()
+    with _lock:
+        history = _histories.get(key)
+        if (
+            history is None
+            or history.today != today
+            or time.monotonic() - history.built_at > FORECAST_REBUILD_SECONDS
+        ):
+            _take_changed(key)
+            history = _histories[key] = _build(session, today)
+        else:
+            _refresh(session, history, _take_changed(key))
+        return history, history.curves()
+
+
+def forecast(session: Session, days: int = 30, room_type: Optional[str] = None) -> dict:
+    """Projected occupancy for the next `days` nights (at most FORECAST_MAX_DAYS)."""
+    days = max(1, min(days, FORECAST_MAX_DAYS))
+    history, curves = _curves(session)
+    rooms = dict(session.execute(select(Room.room_type, func.count()).group_by(Room.room_type)).all())
+    if room_type is not None and room_type not in rooms and room_type not in curves:
+        raise HTTPException(status_code=404, detail="Unknown room type")
+    today = history.today.toordinal() - history.origin
+    leads = np.minimum(np.arange(days), FORECAST_MAX_LEAD)
+    weekday = (history.today.toordinal() + np.arange(days) - 1) % 7
+    types = sorted(set(rooms) | set(curves)) if room_type is None else [room_type]
+
+    result, total_forecast, total_rooms = {}, np.zeros(days), 0
+    for name in types:
+        count = rooms.get(name, 0)
+        if name in curves:
+            on_books, pickup, pace = curves[name]
+            booked = on_books[today:today + days].astype(float)
+            projected = booked + pickup[weekday, leads]
+            pace = pace[:days]
+        else:
+            booked = projected = np.zeros(days)
+            pace = np.zeros(min(days, FORECAST_MAX_LEAD + 1))
+        if count:
+            projected = np.minimum(projected, count)
+        occupancy = projected / count if count else np.zeros(days)
+        total_forecast += projected
+        total_rooms += count
+        result[name] = {
+            "rooms": count,
+            "on_the_books": booked.astype(int).tolist(),
+            "forecast": np.round(projected, 2).tolist(),
+            "occupancy": np.round(occupancy, 4).tolist(),
+            "pace": np.round(pace, 4).tolist(),
+        }
+    return {
+        "start": history.today,
+        "days": days,
+        "room_types": result,
+        "occupancy": np.round(total_forecast / total_rooms, 4).tolist() if total_rooms else [0.0] * days,
+    }
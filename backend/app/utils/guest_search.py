@@ -0,0 +1,247 @@
+"""Search-as-you-type lookup over guest profiles.
+
+Every GuestProfile carries normalised copies of its name, email and phone
+(kept current by mapper events below) with B-tree indexes for prefix
+lookups. On top of that a substring index is installed where the database
+supports one: an FTS5 trigram table kept in sync by triggers on SQLite, or
+a ``pg_trgm`` GIN index on Postgres. Prefix hits rank first, then substring
+hits ordered by how early the match occurs. The raw-SQL substring pass
+filters by `current_property_id` itself (utils/tenancy), so its candidate
+limit is not spent on other properties' guests.
+"""
+from sqlalchemy import event, or_, select, text
+from sqlmodel import Session
+import logging
+import re
+import unicodedata
+
+from ..models import GuestProfile
+from .tenancy import current_property_id
+
+MAX_LIMIT = 50
+SUBSTRING_CANDIDATES = 200
+_PREFIX_END = "\uffff"
+
+# engine url -> "fts5" | "trgm" | None
+_substring_index: dict[str, str | None] = {}
+
+_TRGM_EXPR = (
+    "(coalesce(name_norm, '') || ' ' || coalesce(email_norm, '') || ' ' || coalesce(phone_digits, ''))"
+)
+
+
+def normalize_name(value: str | None) -> str:
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.casefold().split())
+
+
+def normalize_email(value: str | None) -> str:
+    return (value or "").strip().lower()
+
+
+def phone_digits(value: str | None) -> str:
+    return re.sub(r"\D", "", value or "")
+
+
+def normalized_columns(guest_name: str | None, email: str | None, phone: str | None) -> dict:
+    """Values for the search columns of a guest row (used by bulk loaders too)."""
+    return {
+        "name_norm": normalize_name(guest_name),
+        "email_norm": normalize_email(email),
+        "phone_digits": phone_digits(phone),
+    }
+
+
+@event.listens_for(GuestProfile, "before_insert")
+@event.listens_for(GuestProfile, "before_update")
+def _fill_search_columns(mapper, connection, target):
+    for key, value in normalized_columns(target.guest_name, target.email, target.phone).items():
+        setattr(target, key, value)
+
+
+def install_guest_search(engine) -> str | None:
+    """Backfill search columns and create the substring index. Idempotent."""
+    with engine.begin() as conn:
+        missing = conn.execute(
+            text("SELECT id, guest_name, email, phone FROM guestprofile WHERE name_norm IS NULL")
+        ).all()
+        if missing:
+            conn.execute(
+                text(
+                    "UPDATE guestprofile SET name_norm = :name_norm, email_norm = :email_norm, "
+                    "phone_digits = :phone_digits WHERE id = :id"
+                ),
+                [{"id": row.id, **normalized_columns(row.guest_name, row.email, row.phone)} for row in missing],
+            )
+
+    mode = None
+    try:
+        if engine.dialect.name == "sqlite":
+            mode = _install_fts5(engine)
+        elif engine.dialect.name == "postgresql":
+            mode = _install_trgm(engine)
+    except Exception as e:
+        logging.warning("Guest substring index unavailable, using prefix search only: %s", e)
+    _substring_index[str(engine.url)] = mode
+    return mode
+
+
+def _install_fts5(engine) -> str:
+    with engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'guestprofile_fts'")
+        ).first()
+        if exists:
+            return "fts5"
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE guestprofile_fts USING fts5("
+            "name_norm, email_norm, phone_digits, content='guestprofile', content_rowid='id', tokenize='trigram')"
+        ))
+        conn.execute(text(
+            "CREATE TRIGGER guestprofile_fts_ai AFTER INSERT ON guestprofile BEGIN "
+            "INSERT INTO guestprofile_fts(rowid, name_norm, email_norm, phone_digits) "
+            "VALUES (new.id, new.name_norm, new.email_norm, new.phone_digits); END"
+        ))
+        conn.execute(text(
+            "CREATE TRIGGER guestprofile_fts_ad AFTER DELETE ON guestprofile BEGIN "
+            "INSERT INTO guestprofile_fts(guestprofile_fts, rowid, name_norm, email_norm, phone_digits) "
+            "VALUES ('delete', old.id, old.name_norm, old.email_norm, old.phone_digits); END"
+        ))
+        conn.execute(text(
+            "CREATE TRIGGER guestprofile_fts_au AFTER UPDATE ON guestprofile BEGIN "
+            "INSERT INTO guestprofile_fts(guestprofile_fts, rowid, name_norm, email_norm, phone_digits) "
+            "VALUES ('delete', old.id, old.name_norm, old.email_norm, old.phone_digits); "
+            "INSERT INTO guestprofile_fts(rowid, name_norm, email_norm, phone_digits) "
+            "VALUES (new.id, new.name_norm, new.email_norm, new.phone_digits); END"
+        ))
+        conn.execute(text("INSERT INTO guestprofile_fts(guestprofile_fts) VALUES ('rebuild')"))
+    return "fts5"
+
+
+def _install_trgm(engine) -> str:
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_guestprofile_search_trgm ON guestprofile USING gin ({_TRGM_EXPR} gin_trgm_ops)"
+        ))
+    return "trgm"
+
+
+def _detect_substring_index(session: Session) -> str | None:
+    engine = session.get_bind()
+    key = str(engine.url)
+    if key not in _substring_index:
+        mode = None
+        if engine.dialect.name == "sqlite":
+            found = session.exec(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'guestprofile_fts'")
+            ).first()
+            mode = "fts5" if found else None
+        elif engine.dialect.name == "postgresql":
+            found = session.exec(
+                text("SELECT 1 FROM pg_indexes WHERE indexname = 'ix_guestprofile_search_trgm'")
+            ).first()
+            mode = "trgm" if found else None
+        _substring_index[key] = mode
+    return _substring_index[key]
+
+
+def _is_phone_query(q: str, digits: str) -> bool:
+    return len(digits) >= 3 and not re.search(r"[^\d\s()+.-]", q)
+
+
+def _row(guest, match: str) -> dict:
+    return {
+        "id": guest.id,
+        "guest_name": guest.guest_name,
+        "email": guest.email,
+        "phone": guest.phone,
+        "match": match,
+    }
+
+
+def search_guests(session: Session, q: str, limit: int = 10) -> list[dict]:
+    """Return up to `limit` guests matching `q`, best matches first.
+
+    Ranking: exact email/phone, then name, email and phone prefixes, then
+    substring matches from the trigram index, earliest match first.
+    """
+    limit = max(1, min(limit, MAX_LIMIT))
+    name_q = normalize_name(q)
+    email_q = normalize_email(q)
+    digits_q = phone_digits(q)
+    if not name_q:
+        return []
+    is_phone = _is_phone_query(q, digits_q)
+
+    columns = (GuestProfile.id, GuestProfile.guest_name, GuestProfile.email, GuestProfile.phone)
+    prefix_filters = [("name", GuestProfile.name_norm, name_q), ("email", GuestProfile.email_norm, email_q)]
+    if is_phone:
+        prefix_filters.append(("phone", GuestProfile.phone_digits, digits_q))
+
+    results: list[dict] = []
+    seen: set[int] = set()
+    for match, column, value in prefix_filters:
+        rows = session.exec(
+            select(*columns)
+            .where(column >= value, column < value + _PREFIX_END)
+            .order_by(column, GuestProfile.id)
+            .limit(limit)
+        ).all()
+        for guest in rows:
+            if guest.id in seen:
+                continue
+            seen.add(guest.id)
+            exact = normalize_email(guest.email) == email_q or (is_phone and phone_digits(guest.phone) == digits_q)
+            results.append(_row(guest, "exact" if exact else match))
+    results.sort(key=lambda r: r["match"] != "exact")
+    if len(results) >= limit or len(name_q) < 3:
+        return results[:limit]
+
+    term = digits_q if is_phone else name_q
+    mode = _detect_substring_index(session)
+    # Substring candidates are fetched unordered (cheap with LIMIT) and ranked
+    # here; ordering every match by bm25/similarity costs tens of ms on common terms.
+    property_id = current_property_id()
+    params = {"n": SUBSTRING_CANDIDATES}
+    property_filter = ""
+    if property_id is not None:
+        params["property_id"] = property_id
+        property_filter = "AND g.property_id = :property_id" if mode == "fts5" else "AND property_id = :property_id"
+    if mode == "fts5":
+        stmt = text(
+            "SELECT f.rowid FROM guestprofile_fts f JOIN guestprofile g ON g.id = f.rowid "
+            f"WHERE f.guestprofile_fts MATCH :q {property_filter} LIMIT :n"
+        ).bindparams(q='"' + term.replace('"', '""') + '"', **params)
+    elif mode == "trgm":
+        stmt = text(
+            f"SELECT id FROM guestprofile WHERE {_TRGM_EXPR} ILIKE :pattern {property_filter} LIMIT :n"
+        ).bindparams(pattern=f"%{term}%", **params)
+    else:
+        # No substring index: bounded scan so the endpoint still answers.
+        stmt = (
+            select(GuestProfile.id)
+            .where(or_(GuestProfile.name_norm.contains(term), GuestProfile.email_norm.contains(term),
+                       GuestProfile.phone_digits.contains(term)))
+            .limit(SUBSTRING_CANDIDATES)
+        )
+    ids = [row[0] for row in session.exec(stmt).all() if row[0] not in seen]
+    if ids:
+        candidates = session.exec(
+            select(*columns, GuestProfile.name_norm, GuestProfile.email_norm, GuestProfile.phone_digits)
+            .where(GuestProfile.id.in_(ids))
+        ).all()
+
+        def rank(guest):
+            positions = [
+                field.find(term) for field in (guest.name_norm or "", guest.email_norm or "", guest.phone_digits or "")
+            ]
+            hits = [p for p in positions if p >= 0]
+            return (min(hits) if hits else len(term) + 1000, len(guest.name_norm or ""), guest.id)
+
+        candidates.sort(key=rank)
+        results.extend(_row(g, "contains") for g in candidates[: limit - len(results)])
+    return results
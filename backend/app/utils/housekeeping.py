@@ -0,0 +1,211 @@
+"""Housekeeping task generation and assignment.
+
+Checkouts create a cleaning task for the room. Unassigned tasks go to the
+active housekeeping staff member with the lowest cost, where cost is their
+open workload (tasks weighted by priority) plus a walking penalty: the
+distance from the new room to the nearest room already on their list,
+using FloorPlanItem coordinates, with a flat penalty for a different
+floor. When a task completes only that staff member's queue is
+re-planned: pending tasks are pulled over from the busiest colleague while
+that narrows the gap, picking the rooms closest to where the freed staff
+member is working.
+"""
+from datetime import datetime
+from math import hypot
+from typing import Optional
+import os
+
+from sqlmodel import Session, select
+
+from ..models import FloorPlanItem, HousekeepingTask, StaffMember
+
+PRIORITY_WEIGHTS = {"low": 1.0, "medium": 2.0, "high": 3.0, "urgent": 5.0}
+HOUSEKEEPING_ROLE = "housekeeping"
+CHECKOUT_TASK_PRIORITY = os.getenv("HOUSEKEEPING_CHECKOUT_PRIORITY", "high")
+# One priority-weight unit of workload is worth this many floor plan units of walking.
+DISTANCE_PER_WEIGHT = float(os.getenv("HOUSEKEEPING_DISTANCE_PER_WEIGHT", "500"))
+# Changing floors costs as much as this much extra workload.
+FLOOR_CHANGE_WEIGHT = float(os.getenv("HOUSEKEEPING_FLOOR_CHANGE_WEIGHT", "1.5"))
+
+Position = tuple[str, float, float]  # (floor, x, y)
+
+
+def _weight(task: HousekeepingTask) -> float:
+    return PRIORITY_WEIGHTS.get((task.priority or "").lower(), PRIORITY_WEIGHTS["medium"])
+
+
+def _is_open(task: HousekeepingTask) -> bool:
+    return task.status != "completed"
+
+
+def _positions(session: Session, tasks: list[HousekeepingTask]) -> dict[str, Position]:
+    """Map room_id / room_number of `tasks` to the centre of their floor plan item."""
+    keys = {t.room_id for t in tasks} | {t.room_number for t in tasks}
+    if not keys:
+        return {}
+    items = session.exec(
+        select(FloorPlanItem).where(FloorPlanItem.room_id.in_(keys) | FloorPlanItem.room_number.in_(keys))
+    ).all()
+    found: dict[str, Position] = {}
+    for item in items:
+        centre = (item.floor, item.x + item.width / 2, item.y + item.height / 2)
+        found.setdefault(item.room_number, centre)
+        found[item.room_id] = centre
+    return found
+
+
+def _position(task: HousekeepingTask, positions: dict[str, Position]) -> Optional[Position]:
+    return positions.get(task.room_id) or positions.get(task.room_number)
+
+
+def _travel(position: Optional[Position], route: list[Position]) -> float:
+    """Walking penalty, in workload units, for adding `position` to a route."""
+    if position is None or not route:
+        return 0.0
+    best = None
+    for floor, x, y in route:
+        cost = hypot(position[1] - x, position[2] - y) / DISTANCE_PER_WEIGHT
+        if floor != position[0]:
+            cost += FLOOR_CHANGE_WEIGHT
+        best = cost if best is None else min(best, cost)
+    return best
+
+
+class _Plan:
+    """Open workload and room positions per staff member, loaded once per call."""
+
+    def __init__(self, session: Session):
+        self.staff = {
+            s.id: s
+            for s in session.exec(
+                select(StaffMember).where(StaffMember.role == HOUSEKEEPING_ROLE, StaffMember.status == "active")
+            ).all()
+        }
+        self.open = session.exec(
+            select(HousekeepingTask).where(HousekeepingTask.status != "completed")
+        ).all()
+        self.positions = _positions(session, self.open)
+        self.load = {staff_id: 0.0 for staff_id in self.staff}
+        self.routes: dict[int, list[Position]] = {staff_id: [] for staff_id in self.staff}
+        for task in self.open:
+            if task.assigned_staff_id in self.staff:
+                self._add(task.assigned_staff_id, task)
+
+    def _add(self, staff_id: int, task: HousekeepingTask) -> None:
+        self.load[staff_id] += _weight(task)
+        position = _position(task, self.positions)
+        if position is not None:
+            self.routes[staff_id].append(position)
+
+    def _remove(self, staff_id: int, task: HousekeepingTask) -> None:
+        self.load[staff_id] -= _weight(task)
+        position = _position(task, self.positions)
+        if position is not None and position in self.routes[staff_id]:
+            self.routes[staff_id].remove(position)
+
+    def best_staff(self, task: HousekeepingTask) -> Optional[int]:
+        position = _position(task, self.positions)
+        return min(
+            self.staff,
+            key=lambda staff_id: (self.load[staff_id] + _travel(position, self.routes[staff_id]), staff_id),
+            default=None,
+        )
+
+    def assign(self, session: Session, task: HousekeepingTask, staff_id: int) -> None:
+        if task.assigned_staff_id in self.staff:
+            self._remove(task.assigned_staff_id, task)
+        task.assigned_staff_id = staff_id
+        task.assigned_to = self.staff[staff_id].name
+        self._add(staff_id, task)
+        session.add(task)
+
+
+def assign_tasks(session: Session, tasks: Optional[list[HousekeepingTask]] = None) -> dict[int, int]:
+    """Assign `tasks` (default: every open unassigned task), highest priority first.
+
+    Tasks with a free-text `assigned_to` but no staff id are left alone so
+    manual assignments stick. Returns {task_id: staff_id}; the caller commits.
+    """
+    plan = _Plan(session)
+    if tasks is None:
+        tasks = [t for t in plan.open if t.assigned_staff_id is None and not (t.assigned_to or "").strip()]
+    else:
+        # Route through the plan's own instances so workload stays consistent.
+        by_id = {t.id: t for t in plan.open}
+        tasks = [by_id.get(t.id, t) for t in tasks if _is_open(t)]
+
+    def order(task):
+        # Within a priority, walk floor by floor so neighbouring rooms are planned together.
+        position = _position(task, plan.positions) or ("", 0.0, 0.0)
+        return (-_weight(task), position, task.created_at or datetime.min, task.id or 0)
+
+    assigned = {}
+    for task in sorted(tasks, key=order):
+        if task.assigned_staff_id in plan.staff:
+            continue
+        staff_id = plan.best_staff(task)
+        if staff_id is None:
+            break
+        plan.assign(session, task, staff_id)
+        assigned[task.id] = staff_id
+    return assigned
+
+
+def rebalance_after_completion(session: Session, task: HousekeepingTask) -> dict[int, int]:
+    """Re-plan around the staff member who just finished `task`.
+
+    Pending (not yet started) tasks move from the busiest colleague to the
+    freed staff member, nearest rooms first, while each move narrows the gap
+    between them. Unassigned tasks are picked up as well. The caller commits.
+    """
+    moved = assign_tasks(session)
+    plan = _Plan(session)
+    freed = task.assigned_staff_id
+    if freed not in plan.staff:
+        return moved
+    while True:
+        busiest = max(plan.staff, key=lambda staff_id: (plan.load[staff_id], -staff_id))
+        if busiest == freed:
+            break
+        candidates = [
+            t for t in plan.open
+            if t.assigned_staff_id == busiest and t.status == "pending"
+            and plan.load[freed] + _weight(t) < plan.load[busiest]
+        ]
+        if not candidates:
+            break
+        route = plan.routes[freed]
+        pick = min(candidates, key=lambda t: (_travel(_position(t, plan.positions), route), -_weight(t), t.id))
+        plan.assign(session, pick, freed)
+        moved[pick.id] = freed
+    return moved
+
+
+def create_checkout_task(session: Session, room_id: str, room_number: str, guest_name: str) -> Optional[HousekeepingTask]:
+    """Queue a cleaning task for a room whose guest just checked out.
+
+    Skipped when the room already has an open cleaning task. The task is
+    assigned straight away if a housekeeper is on duty; the caller commits.
+    """
+    existing = session.exec(
+        select(HousekeepingTask.id).where(
+            HousekeepingTask.room_id == room_id,
+            HousekeepingTask.task_type == "cleaning",
+            HousekeepingTask.status != "completed",
+        )
+    ).first()
+    if existing is not None:
+        return None
+    task = HousekeepingTask(
+        room_id=room_id,
+        room_number=room_number,
+        task_type="cleaning",
+        status="pending",
+        priority=CHECKOUT_TASK_PRIORITY,
+        assigned_to="",
+        description=f"Checkout cleaning after {guest_name}",
+    )
+    session.add(task)
+    session.flush()
+    assign_tasks(session, [task])
+    return task
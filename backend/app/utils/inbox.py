@@ -0,0 +1,124 @@
+"""Admin inbox over contact messages.
+
+Messages are ``new`` until an admin reads or archives them. Pages are
+keyset scans newest first over (created_at, id): pass the last row's
+``created_at`` and ``id`` as ``before``/``before_id`` for the next page.
+The unread count is the ``contact_messages_unread`` counter
+(utils/counters), adjusted by the exact number of rows each status UPDATE
+changed, so concurrent updates cannot double count. A daily job deletes
+archived messages older than MESSAGE_RETENTION_DAYS in batches and
+re-syncs the counter.
+"""
+from datetime import datetime, timedelta
+import os
+from typing import Optional
+
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlmodel import Session
+
+from ..models import ContactMessage
+from ..schemas import ContactMessageRead
+from . import counters
+from .jobs import in_transaction
+from .serialization import columns
+
+UNREAD_COUNTER = "contact_messages_unread"
+MESSAGE_RETENTION_DAYS = int(os.getenv("MESSAGE_RETENTION_DAYS", "180"))  # 0 keeps archived messages forever
+MESSAGE_RETENTION_INTERVAL = float(os.getenv("MESSAGE_RETENTION_INTERVAL", "86400"))
+MESSAGE_PURGE_BATCH = 1000
+
+FOLDERS = ("inbox", "new", "read", "archived", "all")
+
+
+RECOUNT_UNREAD = select(func.count()).select_from(ContactMessage).where(ContactMessage.status == "new")
+
+
+def unread_count(session: Session) -> int:
+    return counters.get(session, UNREAD_COUNTER, RECOUNT_UNREAD)
+
+
+def record_new(session: Session) -> None:
+    """Count a message added in the current transaction."""
+    counters.add(session, UNREAD_COUNTER, 1)
+
+
+def page(
+    session: Session,
+    folder: str = "inbox",
+    limit: int = 50,
+    before: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+) -> ORJSONResponse:
+    table = ContactMessage.__table__
+    stmt = select(*columns(ContactMessage, ContactMessageRead))
+    if folder == "inbox":
+        stmt = stmt.where(table.c.status.in_(("new", "read")))
+    elif folder != "all":
+        stmt = stmt.where(table.c.status == folder)
+    if before is not None:
+        if before_id is None:
+            stmt = stmt.where(table.c.created_at < before)
+        else:
+            stmt = stmt.where(
+                or_(table.c.created_at < before, and_(table.c.created_at == before, table.c.id < before_id))
+            )
+    result = session.execute(stmt.order_by(table.c.created_at.desc(), table.c.id.desc()).limit(limit))
+    keys = tuple(result.keys())
+    return ORJSONResponse([dict(zip(keys, row)) for row in result])
+
+
+def set_status(session: Session, ids: list[int], status: str) -> int:
+    """Move messages to `status`; returns how many changed. The caller commits."""
+    table = ContactMessage.__table__
+    now = datetime.utcnow()
+    if status == "new":
+        values = {"status": status, "read_at": None, "archived_at": None}
+    else:
+        values = {
+            "status": status,
+            "read_at": func.coalesce(table.c.read_at, now),
+            "archived_at": now if status == "archived" else None,
+        }
+    targets = table.c.id.in_(ids)
+    if status == "new":
+        changed = session.execute(update(table).where(targets, table.c.status != "new").values(values)).rowcount
+        counters.add(session, UNREAD_COUNTER, changed)
+        return changed
+    left_new = session.execute(update(table).where(targets, table.c.status == "new").values(values)).rowcount
+    others = session.execute(
+        update(table).where(targets, table.c.status.not_in(("new", status))).values(values)
+    ).rowcount
+    counters.add(session, UNREAD_COUNTER, -left_new)
+    return left_new + others
+
+
+def purge_archived(before: datetime, batch_size: int = MESSAGE_PURGE_BATCH) -> int:
+    """Delete messages archived before `before`, one transaction per batch."""
+    table = ContactMessage.__table__
+    due = (
+        select(table.c.id)
+        .where(table.c.status == "archived", table.c.archived_at < before)
+        .order_by(table.c.id)
+        .limit(batch_size)
+    )
+    purged = 0
+    while True:
+        count = in_transaction(lambda conn: conn.execute(delete(table).where(table.c.id.in_(due))).rowcount)
+        if not count:
+            return purged
+        purged += count
+
+
+def _resync(conn) -> int:
+    with Session(bind=conn, join_transaction_mode="create_savepoint") as session:
+        value = counters.reset(session, UNREAD_COUNTER, RECOUNT_UNREAD)
+        session.commit()
+        return value
+
+
+def run_retention() -> dict:
+    purged = 0
+    if MESSAGE_RETENTION_DAYS > 0:
+        purged = purge_archived(datetime.utcnow() - timedelta(days=MESSAGE_RETENTION_DAYS))
+    return {"purged": purged, "unread": in_transaction(_resync)}
@@ -0,0 +1,161 @@
+"""Inventory stock ledger.
+
+Quantities only change through `adjust_stock` / `count_stock`, which apply
+the change as a single ``UPDATE ... SET quantity = quantity + :delta`` (so
+concurrent kitchen and bar updates add up instead of overwriting each
+other) and append a StockMovement row. `status` is derived in the same
+statement from the item's `low_threshold`: ``out`` at or below zero,
+``low`` at or below the threshold, otherwise ``available``.
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import Float, case, func, literal, select, update
+from sqlmodel import Session
+
+from ..models import InventoryItem, StockMovement
+
+# Reasons that take stock out of the store (used for consumption summaries).
+CONSUMPTION_REASONS = ("consume", "waste")
+
+
+def derive_status(quantity: float, low_threshold: float) -> str:
+    if quantity <= 0:
+        return "out"
+    if quantity <= low_threshold:
+        return "low"
+    return "available"
+
+
+def _status_expr(quantity):
+    return case(
+        (quantity <= 0, "out"),
+        (quantity <= InventoryItem.low_threshold, "low"),
+        else_="available",
+    )
+
+
+def _record(session: Session, item_id: int, delta: float, quantity_after: float, reason: str,
+            note: Optional[str], actor: Optional[str]) -> StockMovement:
+    movement = StockMovement(
+        item_id=item_id, delta=delta, quantity_after=quantity_after, reason=reason, note=note, actor=actor
+    )
+    session.add(movement)
+    return movement
+
+
+def _updated_quantity(session: Session, stmt, item_id: int) -> Optional[float]:
+    if session.get_bind().dialect.update_returning:
+        row = session.execute(stmt.returning(InventoryItem.quantity)).first()
+        return row[0] if row else None
+    if session.execute(stmt).rowcount == 0:
+        return None
+    # The UPDATE holds the row (Postgres) or database (SQLite) write lock, so this read is ours.
+    return session.execute(select(InventoryItem.quantity).where(InventoryItem.id == item_id)).scalar_one()
+
+
+def adjust_stock(
+    session: Session,
+    item_id: int,
+    delta: float,
+    reason: str = "adjust",
+    note: Optional[str] = None,
+    actor: Optional[str] = None,
+    allow_negative: bool = False,
+) -> StockMovement:
+    """Atomically add `delta` to an item's quantity and log it. The caller commits.
+
+    Raises 404 for an unknown item and 409 when a withdrawal would take the
+    quantity below zero (unless `allow_negative`).
+    """
+    new_quantity = InventoryItem.quantity + delta
+    stmt = (
+        update(InventoryItem)
+        .where(InventoryItem.id == item_id)
+        .values(quantity=new_quantity, status=_status_expr(new_quantity), updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    if delta < 0 and not allow_negative:
+        stmt = stmt.where(new_quantity >= 0)
+    quantity = _updated_quantity(session, stmt, item_id)
+    if quantity is None:
+        if session.get(InventoryItem, item_id) is None:
+            raise HTTPException(status_code=404, detail="Inventory item not found")
+        raise HTTPException(status_code=409, detail="Insufficient stock")
+    _expire(session, item_id)
+    return _record(session, item_id, delta, quantity, reason, note, actor)
+
+
+def count_stock(
+    session: Session, item_id: int, quantity: float, note: Optional[str] = None, actor: Optional[str] = None
+) -> StockMovement:
+    """Set the quantity from a physical count, logging the difference. The caller commits."""
+    current = session.execute(
+        select(InventoryItem.quantity).where(InventoryItem.id == item_id).with_for_update()
+    ).scalar_one_or_none()
+    if current is None:
+        raise HTTPException(status_code=404, detail="Inventory item not found")
+    session.execute(
+        update(InventoryItem)
+        .where(InventoryItem.id == item_id)
+        .values(quantity=quantity, status=_status_expr(literal(quantity, Float)), updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    _expire(session, item_id)
+    return _record(session, item_id, quantity - current, quantity, "count", note, actor)
+
+
+def _expire(session: Session, item_id: int) -> None:
+    # The UPDATEs bypass the ORM, so drop any stale copy this session holds.
+    item = session.identity_map.get(session.identity_key(InventoryItem, item_id))
+    if item is not None:
+        session.expire(item, ["quantity", "status", "updated_at"])
+
+
+def _bucket(session: Session, period: str):
+    created = StockMovement.created_at
+    if session.get_bind().dialect.name == "sqlite":
+        formats = {"day": "%Y-%m-%d", "week": "%Y-W%W", "month": "%Y-%m"}
+        return func.strftime(formats[period], created)
+    formats = {"day": "YYYY-MM-DD", "week": 'IYYY-"W"IW', "month": "YYYY-MM"}
+    return func.to_char(created, formats[period])
+
+
+def consumption_summary(
+    session: Session,
+    start: date,
+    end: date,
+    period: str = "day",
+    category: Optional[str] = None,
+    item_id: Optional[int] = None,
+) -> list[dict]:
+    """Consumed, restocked and net movement per item and period between `start` and `end` (inclusive)."""
+    bucket = _bucket(session, period).label("period")
+    consumed = func.sum(case((StockMovement.reason.in_(CONSUMPTION_REASONS), -StockMovement.delta), else_=0))
+    restocked = func.sum(case((StockMovement.reason == "restock", StockMovement.delta), else_=0))
+    stmt = (
+        select(
+            bucket,
+            StockMovement.item_id,
+            InventoryItem.name,
+            InventoryItem.category,
+            InventoryItem.unit,
+            consumed.label("consumed"),
+            restocked.label("restocked"),
+            func.sum(StockMovement.delta).label("net"),
+            func.count().label("movements"),
+        )
+        .outerjoin(InventoryItem, InventoryItem.id == StockMovement.item_id)  # keeps deleted items' history
+        .where(
+            StockMovement.created_at >= datetime.combine(start, time.min),
+            StockMovement.created_at < datetime.combine(end + timedelta(days=1), time.min),
+        )
+        .group_by(bucket, StockMovement.item_id, InventoryItem.name, InventoryItem.category, InventoryItem.unit)
+        .order_by(bucket, StockMovement.item_id)
+    )
+    if category:
+        stmt = stmt.where(InventoryItem.category == category)
+    if item_id is not None:
+        stmt = stmt.where(StockMovement.item_id == item_id)
+    return [dict(row._mapping) for row in session.execute(stmt)]
@@ -0,0 +1,70 @@
+"""Periodic background jobs.
+
+Jobs are registered at startup and each runs on its own daemon thread:
+first after JOBS_INITIAL_DELAY seconds (or the interval, if shorter) so the
+database warm-up can finish, then every `interval` seconds. Exceptions are
+logged and the job keeps its schedule. Every worker process runs its own
+copy, so jobs must be safe to run concurrently. BACKGROUND_JOBS=false
+disables them (e.g. on extra workers or when a cron runs them instead).
+Jobs that write should do so through `in_transaction`, which routes the
+work through the SQLite write queue when that is enabled.
+"""
+import logging
+import os
+import threading
+from typing import Callable
+
+BACKGROUND_JOBS = os.getenv("BACKGROUND_JOBS", "true").lower() in ("1", "true", "yes")
+JOBS_INITIAL_DELAY = float(os.getenv("JOBS_INITIAL_DELAY", "60"))
+
+logger = logging.getLogger("app.jobs")
+
+_jobs: dict[str, tuple[float, Callable[[], object]]] = {}
+_threads: dict[str, threading.Thread] = {}
+_stop = threading.Event()
+
+
+def register(name: str, interval: float, fn: Callable[[], object]) -> None:
+    """Schedule `fn` every `interval` seconds; a non-positive interval disables it."""
+    if interval > 0:
+        _jobs[name] = (interval, fn)
+
+
+def _loop(name: str, interval: float, fn: Callable[[], object]) -> None:
+    delay = min(JOBS_INITIAL_DELAY, interval)
+    while not _stop.wait(delay):
+        try:
+            result = fn()
+            logger.info("Job %s finished: %s", name, result)
+        except Exception:
+            logger.exception("Job %s failed", name)
+        delay = interval
+
+
+def in_transaction(fn: Callable[[object], object]):
+    """Run `fn(connection)` in one committed transaction and return its result."""
+    from . import write_queue
+
+    if write_queue.enabled():
+        return write_queue.submit(fn)
+    from ..db_core import get_engine
+
+    with get_engine().begin() as conn:
+        return fn(conn)
+
+
+def start() -> None:
+    """Start a thread for every registered job that is not running yet."""
+    if not BACKGROUND_JOBS:
+        return
+    _stop.clear()
+    for name, (interval, fn) in _jobs.items():
+        if name in _threads and _threads[name].is_alive():
+            continue
+        thread = threading.Thread(target=_loop, args=(name, interval, fn), name=f"job-{name}", daemon=True)
+        _threads[name] = thread
+        thread.start()
+
+
+def stop() -> None:
+    _stop.set()
@@ -0,0 +1,258 @@
+"""Opt-in sampling profiler for individual requests.
+
+A request is profiled when any of these is configured and matches:
+
+* ``PROFILE_TOKEN`` is set and the request sends it in the ``X-Profile`` header;
+* a random draw falls under ``PROFILE_SAMPLE_RATE`` (0..1);
+* the request is still running after ``PROFILE_SLOW_MS`` (only the part
+  after the threshold is captured, which is where the time goes).
+
+With none of them set the middleware is a straight pass-through. Profiled
+requests are sampled by one background thread every
+``PROFILE_INTERVAL_MS`` using ``sys._current_frames()``; a thread's stack
+is attributed to a request when it is executing that request's endpoint
+(so concurrent calls to the same endpoint share samples) or, on the event
+loop, when it runs inside that request's middleware call. Results are
+written in folded-stack format (``frame;frame;frame count``, readable by
+speedscope or flamegraph.pl) to ``PROFILE_DIR``, keeping at most
+``PROFILE_MAX_FILES`` profiles.
+"""
+from datetime import datetime
+import hmac
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+
+import anyio
+
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "0"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "./profiles")
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))
+HEADER = b"x-profile"
+
+PROFILE_ID = re.compile(r"^\d{8}T\d{6}-[0-9a-f]{8}$")
+
+logger = logging.getLogger("app.profiler")
+
+
+def enabled() -> bool:
+    return bool(PROFILE_TOKEN) or PROFILE_SAMPLE_RATE > 0 or PROFILE_SLOW_MS > 0
+
+
+class _Profile:
+    __slots__ = ("scope", "frame", "start", "forced", "trigger", "counts", "samples")
+
+    def __init__(self, scope, frame, forced: bool, trigger: str):
+        self.scope = scope
+        # The middleware's own coroutine frame: matches event-loop work such as response serialisation.
+        self.frame = frame
+        self.start = time.perf_counter()
+        self.forced = forced
+        self.trigger = trigger
+        self.counts: dict[str, int] = {}
+        self.samples = 0
+
+    def codes(self) -> set:
+        # Starlette fills in scope["endpoint"] once routing has happened.
+        endpoint = self.scope.get("endpoint")
+        codes = set()
+        while endpoint is not None:
+            code = getattr(endpoint, "__code__", None)
+            if code is not None:
+                codes.add(code)
+            endpoint = getattr(endpoint, "__wrapped__", None)
+        return codes
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class _Sampler(threading.Thread):
+    def __init__(self):
+        super().__init__(name="request-profiler", daemon=True)
+        self.active: dict[int, _Profile] = {}
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+
+    def add(self, profile: _Profile) -> None:
+        with self.lock:
+            self.active[id(profile)] = profile
+        self.wake.set()
+
+    def remove(self, profile: _Profile) -> None:
+        with self.lock:
+            self.active.pop(id(profile), None)
+
+    def run(self):
+        interval = PROFILE_INTERVAL_MS / 1000
+        slow = PROFILE_SLOW_MS / 1000
+        me = threading.get_ident()
+        while True:
+            with self.lock:
+                profiles = list(self.active.values())
+            if not profiles:
+                self.wake.clear()
+                self.wake.wait()
+                continue
+            time.sleep(interval)
+            # Held while sampling so a finishing request never sees its counts change mid-write.
+            with self.lock:
+                self._sample(me, slow)
+
+    def _sample(self, me: int, slow: float) -> None:
+        now = time.perf_counter()
+        due = [p for p in self.active.values() if p.forced or now - p.start >= slow]
+        if not due:
+            return
+        wanted = [(p, p.codes()) for p in due]
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == me:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(frame)
+                frame = frame.f_back
+            stack.reverse()  # outermost first
+            for profile, codes in wanted:
+                for depth, f in enumerate(stack):
+                    if f is profile.frame or f.f_code in codes:
+                        key = ";".join(_frame_label(s.f_code) for s in stack[depth:])
+                        profile.counts[key] = profile.counts.get(key, 0) + 1
+                        profile.samples += 1
+                        break
+
+
+_sampler: _Sampler | None = None
+_sampler_lock = threading.Lock()
+
+
+def _get_sampler() -> _Sampler:
+    global _sampler
+    if _sampler is None:
+        with _sampler_lock:
+            if _sampler is None:
+                _sampler = _Sampler()
+                _sampler.start()
+    return _sampler
+
+
+def _write_profile(profile: _Profile, status: int, duration_ms: float) -> str:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    profile_id = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+    route = profile.scope.get("route")
+    meta = {
+        "id": profile_id,
+        "created_at": datetime.utcnow().isoformat(),
+        "method": profile.scope.get("method"),
+        "path": profile.scope.get("path"),
+        "route": getattr(route, "path", None),
+        "status": status,
+        "duration_ms": round(duration_ms, 2),
+        "trigger": profile.trigger,
+        "samples": profile.samples,
+        "interval_ms": PROFILE_INTERVAL_MS,
+    }
+    folded = "".join(f"{stack} {count}\n" for stack, count in sorted(profile.counts.items()))
+    with open(os.path.join(PROFILE_DIR, f"{profile_id}.folded"), "w") as fh:
+        fh.write(folded)
+    with open(os.path.join(PROFILE_DIR, f"{profile_id}.json"), "w") as fh:
+        json.dump(meta, fh)
+    _trim()
+    return profile_id
+
+
+def _trim() -> None:
+    ids = sorted(name[:-5] for name in os.listdir(PROFILE_DIR) if name.endswith(".json"))
+    for old in ids[: max(0, len(ids) - PROFILE_MAX_FILES)]:
+        for ext in (".json", ".folded"):
+            try:
+                os.remove(os.path.join(PROFILE_DIR, old + ext))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles() -> list[dict]:
+    """Metadata of the stored profiles, newest first."""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    profiles = []
+    for name in sorted(os.listdir(PROFILE_DIR), reverse=True):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(PROFILE_DIR, name)) as fh:
+                profiles.append(json.load(fh))
+        except (OSError, ValueError):
+            continue
+    return profiles
+
+
+def profile_path(profile_id: str) -> str | None:
+    """Path of a stored folded profile, or None for unknown/malformed ids."""
+    if not PROFILE_ID.match(profile_id):
+        return None
+    path = os.path.join(PROFILE_DIR, f"{profile_id}.folded")
+    return path if os.path.exists(path) else None
+
+
+class ProfilerMiddleware:
+    """ASGI middleware deciding which requests to profile (see module docstring)."""
+
+    def __init__(self, app):
+        self.app = app
+        self.enabled = enabled()
+
+    def _trigger(self, scope) -> str | None:
+        if PROFILE_TOKEN:
+            for name, value in scope.get("headers", ()):
+                if name == HEADER:
+                    if hmac.compare_digest(value.decode("latin-1"), PROFILE_TOKEN):
+                        return "header"
+                    break
+        if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+            return "sample"
+        if PROFILE_SLOW_MS > 0:
+            return "slow"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if not self.enabled or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        trigger = self._trigger(scope)
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        profile = _Profile(scope, sys._getframe(), forced=trigger != "slow", trigger=trigger)
+        sampler = _get_sampler()
+        sampler.add(profile)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.remove(profile)
+            duration_ms = (time.perf_counter() - profile.start) * 1000
+            if profile.samples and (profile.forced or duration_ms >= PROFILE_SLOW_MS):
+                try:
+                    profile_id = await anyio.to_thread.run_sync(_write_profile, profile, status["code"], duration_ms)
+                    logger.info("Profiled %s %s (%.1f ms) -> %s", scope.get("method"), scope.get("path"),
+                                duration_ms, profile_id)
+                except OSError:
+                    logger.exception("Could not write request profile")
@@ -0,0 +1,216 @@
+"""Rate calendar and stay quotes.
+
+A room type's nightly rate starts from its base price (the average
+Room.price of its rooms, which is what reports used on their own before)
+and active RateRule rows adjust it in ascending priority: a rule covers an
+optional date range, optional weekdays and stays of at least `min_nights`,
+and replaces the rate (`nightly_rate`), scales it (`multiplier`) or both.
+
+Rules are compiled into a dense NumPy array per room type with one row per
+distinct minimum-stay threshold and one column per night, plus its running
+sum along the nights. A stay's price is then two lookups and a
+subtraction, so whole month grids, batches of quotes and report revenue
+are priced in single vectorised calls. Calendars cover
+RATE_CALENDAR_PAST_DAYS before today to RATE_CALENDAR_FUTURE_DAYS after and
+are cached; ranges reaching outside that window (old report periods, long
+stays at its edge) get a one-off calendar of just that range, so requests
+cannot grow the cached one. Public quotes and grids must check in within
+the window. Cached calendars are dropped by `invalidate` after rate or room
+changes in this process and rebuilt after RATE_CALENDAR_TTL seconds so
+changes made by other workers show up. Each property has its own rooms,
+rules and calendars (utils/tenancy).
+"""
+from datetime import date, timedelta
+import os
+from typing import Iterable, Optional, Sequence
+
+from fastapi import HTTPException
+import numpy as np
+from sqlalchemy import func, select
+from sqlmodel import Session
+
+from ..models import RateRule, Room
+from . import report_cache
+from .cache import TTLCache
+from .tenancy import current_property_id
+from .write_queue import after_commit
+
+RATE_CALENDAR_TTL = float(os.getenv("RATE_CALENDAR_TTL", "60"))
+RATE_CALENDAR_PAST_DAYS = int(os.getenv("RATE_CALENDAR_PAST_DAYS", "400"))
+RATE_CALENDAR_FUTURE_DAYS = int(os.getenv("RATE_CALENDAR_FUTURE_DAYS", "730"))
+
+# property id -> (first night, end night (exclusive), {room_type: RateCalendar})
+_cache = TTLCache(RATE_CALENDAR_TTL, maxsize=64)
+
+
+class RateCalendar:
+    """Nightly rates of one room type for the nights [start, start + days)."""
+
+    def __init__(self, start: date, days: int, base: float, rules: Sequence[RateRule]):
+        self.start = start
+        self.days = days
+        self.thresholds = np.array(sorted({1} | {max(rule.min_nights, 1) for rule in rules}))
+        ordinals = start.toordinal() + np.arange(days)
+        weekday = (ordinals - 1) % 7  # date.fromordinal(1) is a Monday
+        rates = np.full((len(self.thresholds), days), float(base))
+        for rule in rules:
+            nights = np.ones(days, dtype=bool)
+            if rule.start_date is not None:
+                nights &= ordinals >= rule.start_date.toordinal()
+            if rule.end_date is not None:
+                nights &= ordinals <= rule.end_date.toordinal()
+            if rule.weekdays:
+                nights &= np.isin(weekday, parse_weekdays(rule.weekdays))
+            covered = (self.thresholds >= rule.min_nights)[:, None] & nights[None, :]
+            if rule.nightly_rate is not None:
+                rates[covered] = rule.nightly_rate
+            if rule.multiplier != 1:
+                rates[covered] *= rule.multiplier
+        self.rates = rates
+        self.cumulative = np.zeros((len(self.thresholds), days + 1))
+        np.cumsum(rates, axis=1, out=self.cumulative[:, 1:])
+
+    def tiers(self, stay_nights: np.ndarray) -> np.ndarray:
+        """Row of `rates` that applies to stays of `stay_nights` nights."""
+        return np.searchsorted(self.thresholds, stay_nights, side="right") - 1
+
+    def charge(self, stay_nights: np.ndarray, first: np.ndarray, stop: np.ndarray) -> np.ndarray:
+        """Sum of the nightly rates of nights [first, stop) (offsets from `start`) for stays of `stay_nights`."""
+        rows = self.tiers(stay_nights)
+        return self.cumulative[rows, stop] - self.cumulative[rows, first]
+
+    def nightly(self, stay_nights: int = 1) -> np.ndarray:
+        return self.rates[self.tiers(np.array([stay_nights]))[0]]
+
+
+def parse_weekdays(value: str) -> list[int]:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def rule_values(data: dict) -> dict:
+    """RateRule column values from a create/update payload; 422 on an inverted date range."""
+    values = dict(data)
+    if "weekdays" in values:
+        weekdays = values["weekdays"]
+        values["weekdays"] = ",".join(str(day) for day in sorted(set(weekdays))) if weekdays else None
+    start, end = values.get("start_date"), values.get("end_date")
+    if start and end and end < start:
+        raise HTTPException(status_code=422, detail="end_date must not be before start_date")
+    return values
+
+
+def _compile(session: Session, start: date, end: date) -> dict[str, RateCalendar]:
+    bases = dict(session.execute(select(Room.room_type, func.avg(Room.price)).group_by(Room.room_type)).all())
+    rules: dict[str, list[RateRule]] = {}
+    for rule in session.execute(
+        select(RateRule).where(RateRule.is_active.is_(True)).order_by(RateRule.priority, RateRule.id)
+    ).scalars():
+        rules.setdefault(rule.room_type, []).append(rule)
+    days = (end - start).days
+    return {
+        room_type: RateCalendar(start, days, bases.get(room_type) or 0.0, rules.get(room_type, ()))
+        for room_type in set(bases) | set(rules)
+    }
+
+
+def _window() -> tuple[date, date]:
+    today = date.today()
+    return today - timedelta(days=RATE_CALENDAR_PAST_DAYS), today + timedelta(days=RATE_CALENDAR_FUTURE_DAYS)
+
+
+def check_window(first: date, last: date) -> None:
+    """422 unless the check-ins [first, last] fall inside the calendar window."""
+    start, stop = _window()
+    if first < start or last >= stop:
+        last_allowed = stop - timedelta(days=1)
+        raise HTTPException(status_code=422, detail=f"check_in must be between {start} and {last_allowed}")
+
+
+def calendars(session: Session, start: Optional[date] = None, end: Optional[date] = None) -> dict[str, RateCalendar]:
+    """Calendars of every room type covering at least the nights [start, end)."""
+    first, stop = _window()
+    if (start is not None and start < first) or (end is not None and end > stop):
+        return _compile(session, start or first, end or stop)
+    key = current_property_id()
+    cached = _cache.get(key)
+    if cached is not None and cached[0] == first:
+        return cached[2]
+    compiled = _compile(session, first, stop)
+    _cache.set(key, (first, stop, compiled))
+    return compiled
+
+
+def invalidate() -> None:
+    """Drop the calendars and the report results priced from them, once the write commits."""
+    after_commit(_cache.clear)
+    report_cache.invalidate()
+
+
+def calendar(session: Session, room_type: str, start: date, end: date) -> RateCalendar:
+    """Calendar for `room_type` covering [start, end); 404 for a type with neither rooms nor rules."""
+    found = calendars(session, start, end).get(room_type)
+    if found is None:
+        raise HTTPException(status_code=404, detail="Unknown room type")
+    return found
+
+
+def quote(session: Session, room_type: str, check_ins: Sequence[date], nights: Sequence[int]) -> list[float]:
+    """Total price of each stay (check_ins[i], nights[i]), in one vectorised lookup."""
+    stay_nights = np.asarray(nights, dtype=np.int64)
+    ordinals = np.fromiter((d.toordinal() for d in check_ins), dtype=np.int64, count=len(check_ins))
+    first_night = date.fromordinal(int(ordinals.min()))
+    check_window(first_night, date.fromordinal(int(ordinals.max())))
+    last_night = date.fromordinal(int((ordinals + stay_nights).max()))
+    cal = calendar(session, room_type, first_night, last_night)
+    first = ordinals - cal.start.toordinal()
+    return np.round(cal.charge(stay_nights, first, first + stay_nights), 2).tolist()
+
+
+def grid(session: Session, room_type: str, start: date, days: int, nights: int) -> list[float]:
+    """Price of a `nights`-night stay checking in on each of the `days` days from `start`."""
+    check_window(start, start)
+    cal = calendar(session, room_type, start, start + timedelta(days=days + nights))
+    first = np.arange(days) + (start - cal.start).days
+    return np.round(cal.charge(np.full(days, nights), first, first + nights), 2).tolist()
+
+
+def revenue(
+    session: Session,
+    stays: Iterable[tuple[str, date, date]],
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> tuple[int, float]:
+    """(booked nights, revenue) of (room_type, check_in, check_out) stays, clipped to [start, end).
+
+    Nights are priced at the rate for the whole stay's length, so a long
+    stay straddling the window keeps its length-of-stay rate.
+    """
+    by_type: dict[str, list[tuple[int, int]]] = {}
+    for room_type, check_in, check_out in stays:
+        by_type.setdefault(room_type, []).append((check_in.toordinal(), check_out.toordinal()))
+    if not by_type:
+        return 0, 0.0
+    spans = np.array([span for spans in by_type.values() for span in spans], dtype=np.int64)
+    lo = spans[:, 0] if start is None else np.maximum(spans[:, 0], start.toordinal())
+    hi = spans[:, 1] if end is None else np.minimum(spans[:, 1], end.toordinal())
+    if not (hi > lo).any():
+        return 0, 0.0
+    cals = calendars(session, date.fromordinal(int(lo.min())), date.fromordinal(int(hi.max())))
+    booked = 0
+    total = 0.0
+    offset = 0
+    for room_type, type_spans in by_type.items():
+        count = len(type_spans)
+        stay_nights = np.maximum(spans[offset:offset + count, 1] - spans[offset:offset + count, 0], 0)
+        first, stop = lo[offset:offset + count], hi[offset:offset + count]
+        offset += count
+        billed = stop > first
+        if not billed.any():
+            continue
+        booked += int((stop - first)[billed].sum())
+        cal = cals.get(room_type)
+        if cal is None:
+            continue
+        origin = cal.start.toordinal()
+        total += float(cal.charge(stay_nights[billed], first[billed] - origin, stop[billed] - origin).sum())
+    return booked, total
@@ -0,0 +1,200 @@
+"""Read-replica routing.
+
+With DATABASE_REPLICA_URLS set (comma-separated database URLs), read-only
+routes take their session from `db_core.get_read_session`, which binds it
+to the next healthy replica in round-robin order instead of the primary.
+Everything else, including every write, stays on the primary.
+
+A replica is checked at most every REPLICA_CHECK_INTERVAL seconds when it
+is picked: one round trip that also reads its replication lag on PostgreSQL
+and MySQL. Replicas that fail the check, lag more than REPLICA_MAX_LAG
+seconds or fail to hand out a connection are skipped until their next
+check. With no healthy replica reads go to the primary.
+
+Read-after-write: `ReadRoutingMiddleware` keeps a client (its bearer token,
+else its address) on the primary for REPLICA_STICKY_SECONDS after each
+POST/PUT/PATCH/DELETE of theirs that flushed changes, so a form submit followed by a list refresh
+or reference lookup sees its own write. Caches filled from a replica
+(reports, dashboard, rate calendars) can be REPLICA_MAX_LAG seconds
+staler than their TTL, much like another worker's copy.
+
+For local testing, point both URLs at SQLite files, e.g.
+``DATABASE_REPLICA_URLS=sqlite:///./replica.sqlite`` holding a copy of
+the primary.
+"""
+from contextvars import ContextVar
+import itertools
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import event, text
+from sqlmodel import Session
+
+from .cache import TTLCache
+from .metrics import Counter, Gauge
+from .write_queue import WRITE_METHODS
+
+load_dotenv()
+
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+REPLICA_MAX_LAG = float(os.getenv("REPLICA_MAX_LAG", "5"))
+REPLICA_CHECK_INTERVAL = float(os.getenv("REPLICA_CHECK_INTERVAL", "10"))
+REPLICA_STICKY_SECONDS = float(os.getenv("REPLICA_STICKY_SECONDS", "10"))
+
+REPLICA_HEALTHY = Gauge("db_replica_healthy", "1 while a read replica is in rotation.", ("replica",))
+READ_ROUTED = Counter("db_reads_routed_total", "Read-only sessions by the database they were bound to.", ("target",))
+
+_LAG_QUERIES = {
+    # Zero when not a standby or when everything received has been replayed.
+    "postgresql": (
+        "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() "
+        "THEN 0 ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+    ),
+}
+
+_primary_only: ContextVar[bool] = ContextVar("replica_primary_only", default=False)
+_recent_writers = TTLCache(REPLICA_STICKY_SECONDS, maxsize=10000)
+# Set by write requests; shared with the writer thread, which runs on a copy of the context.
+_wrote: ContextVar[Optional[list]] = ContextVar("replica_wrote", default=None)
+
+
+@event.listens_for(Session, "after_flush")
+def _note_write(session, flush_context):
+    wrote = _wrote.get()
+    if wrote is not None and not wrote:
+        wrote.append(True)
+
+
+def _lag(conn) -> float:
+    """Replication lag in seconds of the database behind `conn`; raises when it is unusable."""
+    dialect = conn.dialect.name
+    if dialect in _LAG_QUERIES:
+        return float(conn.execute(text(_LAG_QUERIES[dialect])).scalar() or 0)
+    if dialect in ("mysql", "mariadb"):
+        row = conn.exec_driver_sql("SHOW REPLICA STATUS").mappings().first()
+        if row is None:
+            return 0.0  # not a replica
+        lag = row.get("Seconds_Behind_Source", row.get("Seconds_Behind_Master"))
+        if lag is None:
+            raise RuntimeError("replication is not running")
+        return float(lag)
+    conn.execute(text("SELECT 1"))
+    return 0.0
+
+
+class _Replica:
+    def __init__(self, name: str, engine):
+        self.name = name
+        self.engine = engine
+        self.healthy: Optional[bool] = None  # unknown until the first check
+        self.checked_at: Optional[float] = None
+
+    def usable(self, now: float) -> bool:
+        if self.checked_at is None or now - self.checked_at >= REPLICA_CHECK_INTERVAL:
+            self.check(now)
+        return bool(self.healthy)
+
+    def check(self, now: float) -> None:
+        self.checked_at = now
+        try:
+            with self.engine.connect() as conn:
+                lag = _lag(conn)
+        except Exception as e:
+            self._set(False, "check failed: %s", e)
+            return
+        if lag > REPLICA_MAX_LAG:
+            self._set(False, "lagging %.1fs behind (REPLICA_MAX_LAG=%s)", lag, REPLICA_MAX_LAG)
+        else:
+            self._set(True, "in rotation")
+
+    def failed(self, error: BaseException) -> None:
+        """Take the replica out of rotation until its next check."""
+        self.checked_at = time.monotonic()
+        self._set(False, "connection failed: %s", error)
+
+    def _set(self, healthy: bool, message: str, *args) -> None:
+        if healthy != self.healthy:
+            logging.getLogger(__name__).log(
+                logging.INFO if healthy else logging.WARNING, "Read replica %s " + message, self.name, *args
+            )
+        self.healthy = healthy
+        REPLICA_HEALTHY.set(1 if healthy else 0, replica=self.name)
+
+
+class ReplicaSet:
+    """Round-robin over the replicas that pass their health check."""
+
+    def __init__(self, engines: list):
+        self.replicas = [_Replica(str(i), engine) for i, engine in enumerate(engines)]
+        self._next = itertools.count()
+        self._lock = threading.Lock()
+
+    def pick(self) -> Optional[_Replica]:
+        """The next usable replica, or None when reads should go to the primary."""
+        if not self.replicas or _primary_only.get():
+            return None
+        start = next(self._next)
+        now = time.monotonic()
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            # One thread runs a due check; the others skip the replica meanwhile.
+            if replica.checked_at is None or now - replica.checked_at >= REPLICA_CHECK_INTERVAL:
+                if not self._lock.acquire(blocking=False):
+                    continue
+                try:
+                    usable = replica.usable(now)
+                finally:
+                    self._lock.release()
+            else:
+                usable = replica.healthy
+            if usable:
+                return replica
+        return None
+
+
+def _client_key(scope) -> Optional[str]:
+    for key, value in scope.get("headers", ()):
+        if key == b"authorization":
+            return value.decode("latin-1")
+    client = scope.get("client")
+    return client[0] if client else None
+
+
+class ReadRoutingMiddleware:
+    """ASGI middleware keeping a client's reads on the primary shortly after its writes."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not DATABASE_REPLICA_URLS:
+            await self.app(scope, receive, send)
+            return
+        key = _client_key(scope)
+        token = _primary_only.set(key is not None and _recent_writers.get(key) is not None)
+        if scope["method"] not in WRITE_METHODS or key is None:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                _primary_only.reset(token)
+            return
+
+        wrote: list = []
+        wrote_token = _wrote.set(wrote)
+
+        async def send_wrapper(message):
+            # Stamp before the response goes out: the write has committed by then
+            # and the client's next request may follow immediately.
+            if message["type"] == "http.response.start" and wrote:
+                _recent_writers.set(key, True)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _wrote.reset(wrote_token)
+            _primary_only.reset(token)
@@ -0,0 +1,85 @@
+"""Cached report results with single-flight computation.
+
+`cached(key, compute)` returns the stored result for `key` (e.g. the
+endpoint and its date range) in the current property (utils/tenancy) or
+runs `compute`. Concurrent callers with
+the same key while it runs wait for that one computation instead of each
+hitting the database. Results live for REPORT_CACHE_TTL seconds.
+
+`invalidate` drops everything once the current write has committed (see
+write_queue.after_commit). A computation that was already running when
+it was called still answers the callers waiting on it, but its result is
+not stored. Booking creation and room/rate changes invalidate. The summaries do not
+depend on booking status, so status updates do not. Like the other
+caches this is per worker process; the TTL bounds how stale another
+worker's copy can get.
+"""
+import os
+import threading
+from typing import Any, Callable, Hashable
+
+from .cache import TTLCache
+from .tenancy import current_property_id
+from .write_queue import after_commit
+
+REPORT_CACHE_TTL = float(os.getenv("REPORT_CACHE_TTL", "60"))
+
+_cache = TTLCache(REPORT_CACHE_TTL, maxsize=256)
+_inflight: dict[Hashable, "_Flight"] = {}
+_lock = threading.Lock()
+_generation = 0
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+def cached(key: Hashable, compute: Callable[[], Any]) -> Any:
+    key = (current_property_id(), key)
+    with _lock:
+        hit = _cache.get(key)
+        if hit is not None:
+            return hit
+        flight = _inflight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _inflight[key] = _Flight()
+            generation = _generation
+    if not leader:
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+    try:
+        flight.result = compute()
+    except BaseException as e:  # noqa: B902 - re-raised to every waiter
+        flight.error = e
+        raise
+    else:
+        with _lock:
+            if generation == _generation:
+                _cache.set(key, flight.result)
+        return flight.result
+    finally:
+        with _lock:
+            if _inflight.get(key) is flight:
+                del _inflight[key]
+        flight.done.set()
+
+
+def _invalidate() -> None:
+    global _generation
+    with _lock:
+        _generation += 1
+        _cache.clear()
+        # Later callers start a fresh computation instead of joining a stale one.
+        _inflight.clear()
+
+
+def invalidate() -> None:
+    after_commit(_invalidate)
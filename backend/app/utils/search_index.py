@@ -0,0 +1,272 @@
+"""Cross-entity full-text search over bookings, guests, staff and messages.
+
+SQLite keeps one FTS5 table, ``search_index``, populated by triggers on the
+four source tables so every write (ORM, core or raw SQL) stays in sync.
+Rowids encode the entity (``id * 4 + code``) so trigger deletes hit the
+rowid index instead of scanning. Postgres gets one ``tsvector`` GIN
+expression index per table, which the database maintains itself.
+
+Bookings are searched in both the hot table and the archive (utils/archive
+moves rows with their ids). Each booking has one index entry whichever table
+holds it: inserts replace the entry, and deletes keep it while the other
+table still has the row.
+
+The queries are raw SQL, so they filter property-scoped tables to the
+current property themselves (utils/tenancy); messages are shared.
+"""
+from sqlalchemy import text
+from sqlmodel import Session, SQLModel
+import logging
+import re
+
+from .tenancy import current_property_id
+
+# type -> (rowid code, source tables, title SQL, body SQL); `{p}` is the row
+# alias (``new.``/``old.`` in triggers, empty in queries).
+ENTITIES = {
+    "booking": (
+        0,
+        ("booking", "archivedbooking"),
+        "coalesce({p}reference_number, '') || ' ' || {p}name",
+        "{p}email || ' ' || coalesce({p}phone, '') || ' ' || {p}room_type",
+    ),
+    "guest": (
+        1,
+        ("guestprofile",),
+        "{p}guest_name",
+        "{p}email || ' ' || {p}phone || ' ' || coalesce({p}preferences, '') || ' ' || coalesce({p}notes, '')",
+    ),
+    "staff": (
+        2,
+        ("staffmember",),
+        "{p}name",
+        "{p}email || ' ' || {p}phone || ' ' || {p}role || ' ' || coalesce({p}department, '') "
+        "|| ' ' || coalesce({p}staff_code, '')",
+    ),
+    "message": (
+        3,
+        ("contactmessage",),
+        "{p}name",
+        "{p}email || ' ' || {p}message",
+    ),
+}
+MAX_PAGE_SIZE = 100
+
+# engine url -> "fts5" | "tsvector" | None
+_mode: dict[str, str | None] = {}
+
+
+def _terms(q: str) -> list[str]:
+    return [t for t in re.findall(r"\w+", q.lower()) if t]
+
+
+def _scoped(table: str) -> bool:
+    return "property_id" in SQLModel.metadata.tables[table].c
+
+
+def install_search_index(engine) -> str | None:
+    """Create the search index (and its triggers) if missing. Idempotent."""
+    mode = None
+    try:
+        if engine.dialect.name == "sqlite":
+            mode = _install_fts5(engine)
+        elif engine.dialect.name == "postgresql":
+            mode = _install_tsvector(engine)
+    except Exception as e:
+        logging.warning("Full-text search index unavailable, falling back to LIKE scans: %s", e)
+    _mode[str(engine.url)] = mode
+    return mode
+
+
+def _fts5_triggers() -> dict[str, str]:
+    """Trigger name -> CREATE statement for every source table."""
+    triggers = {}
+    for code, tables, title, body in ENTITIES.values():
+        for table in tables:
+            rowid = f"old.id * 4 + {code}"
+            insert_new = (
+                f"DELETE FROM search_index WHERE rowid = new.id * 4 + {code}; "
+                f"INSERT INTO search_index(rowid, title, body) VALUES "
+                f"(new.id * 4 + {code}, {title.format(p='new.')}, {body.format(p='new.')});"
+            )
+            others = " AND ".join(
+                f"NOT EXISTS (SELECT 1 FROM {other} WHERE id = old.id)" for other in tables if other != table
+            )
+            delete_old = f"DELETE FROM search_index WHERE rowid = {rowid}{' AND ' + others if others else ''};"
+            triggers[f"{table}_search_ai"] = f"CREATE TRIGGER {table}_search_ai AFTER INSERT ON {table} BEGIN {insert_new} END"
+            triggers[f"{table}_search_ad"] = f"CREATE TRIGGER {table}_search_ad AFTER DELETE ON {table} BEGIN {delete_old} END"
+            triggers[f"{table}_search_au"] = (
+                f"CREATE TRIGGER {table}_search_au AFTER UPDATE ON {table} BEGIN {delete_old} {insert_new} END"
+            )
+    return triggers
+
+
+def _install_fts5(engine) -> str:
+    triggers = _fts5_triggers()
+    with engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'")
+        ).first()
+        installed = set(conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'")).scalars())
+        if exists and installed >= set(triggers):
+            return "fts5"
+        if not exists:
+            conn.execute(text(
+                "CREATE VIRTUAL TABLE search_index USING fts5("
+                "title, body, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            ))
+        # Older installs lack the archive triggers: recreate them all and rebuild.
+        for name, create in triggers.items():
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+            conn.execute(text(create))
+    rebuild_search_index(engine)
+    return "fts5"
+
+
+def _tsvector(title: str, body: str) -> str:
+    return f"to_tsvector('simple', coalesce({title}, '') || ' ' || coalesce({body}, ''))"
+
+
+def _install_tsvector(engine) -> str:
+    with engine.begin() as conn:
+        for _, tables, title, body in ENTITIES.values():
+            for table in tables:
+                conn.execute(text(
+                    f"CREATE INDEX IF NOT EXISTS ix_{table}_search_tsv ON {table} "
+                    f"USING gin (({_tsvector(title.format(p=''), body.format(p=''))}))"
+                ))
+    return "tsvector"
+
+
+def rebuild_search_index(engine) -> None:
+    """Repopulate the SQLite FTS table from the source tables (e.g. after a restore)."""
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM search_index"))
+        for code, tables, title, body in ENTITIES.values():
+            for table in tables:
+                conn.execute(text(
+                    f"INSERT INTO search_index(rowid, title, body) "
+                    f"SELECT id * 4 + {code}, {title.format(p='')}, {body.format(p='')} FROM {table}"
+                ))
+
+
+def _detect_mode(session: Session) -> str | None:
+    engine = session.get_bind()
+    key = str(engine.url)
+    if key not in _mode:
+        mode = None
+        if engine.dialect.name == "sqlite":
+            found = session.exec(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'")
+            ).first()
+            mode = "fts5" if found else None
+        elif engine.dialect.name == "postgresql":
+            found = session.exec(text("SELECT 1 FROM pg_indexes WHERE indexname = 'ix_booking_search_tsv'")).first()
+            mode = "tsvector" if found else None
+        _mode[key] = mode
+    return _mode[key]
+
+
+def search(session: Session, q: str, types: list[str] | None = None, page: int = 1, page_size: int = 20) -> dict:
+    """Search every entity for `q` and return one page of typed hits."""
+    page = max(page, 1)
+    page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+    wanted = [t for t in (types or ENTITIES) if t in ENTITIES]
+    terms = _terms(q)
+    empty = {"query": q, "page": page, "page_size": page_size, "has_more": False, "items": []}
+    if not terms or not wanted:
+        return empty
+
+    offset = (page - 1) * page_size
+    mode = _detect_mode(session)
+    if mode == "fts5":
+        rows = _search_fts5(session, terms, wanted, page_size + 1, offset)
+    elif mode == "tsvector":
+        rows = _search_tsvector(session, terms, wanted, page_size + 1, offset)
+    else:
+        rows = _search_like(session, terms, wanted, page_size + 1, offset)
+
+    by_code = {ENTITIES[t][0]: t for t in ENTITIES}
+    items = [
+        {"type": entity if isinstance(entity, str) else by_code[entity], "id": entity_id, "title": title,
+         "snippet": snippet, "score": round(float(score), 4)}
+        for entity, entity_id, title, snippet, score in rows[:page_size]
+    ]
+    return {**empty, "has_more": len(rows) > page_size, "items": items}
+
+
+def _search_fts5(session: Session, terms: list[str], wanted: list[str], limit: int, offset: int):
+    match = " AND ".join('"' + t.replace('"', '""') + '"*' for t in terms)
+    codes = ", ".join(str(ENTITIES[t][0]) for t in wanted)
+    entity_filter = "" if len(wanted) == len(ENTITIES) else f"AND (rowid % 4) IN ({codes})"
+    params = {"match": match, "limit": limit, "offset": offset}
+    property_filter = ""
+    property_id = current_property_id()
+    if property_id is not None:
+        # Primary key probes of the hits' source rows.
+        cases = " ".join(
+            f"WHEN {code} THEN " + " OR ".join(
+                f"EXISTS (SELECT 1 FROM {table} WHERE id = search_index.rowid / 4 AND property_id = :property_id)"
+                for table in tables
+            )
+            for code, tables, _, _ in ENTITIES.values()
+            if _scoped(tables[0])
+        )
+        property_filter = f"AND CASE search_index.rowid % 4 {cases} ELSE 1 END"
+        params["property_id"] = property_id
+    stmt = text(
+        "SELECT rowid % 4, rowid / 4, title, snippet(search_index, 1, '', '', '…', 12), bm25(search_index, 4.0, 1.0) "
+        f"FROM search_index WHERE search_index MATCH :match {entity_filter} {property_filter} "
+        "ORDER BY bm25(search_index, 4.0, 1.0) LIMIT :limit OFFSET :offset"
+    ).bindparams(**params)
+    # bm25 is lower-is-better; flip it so callers always see higher = better.
+    return [(code, entity_id, title, snip, -score) for code, entity_id, title, snip, score in session.exec(stmt).all()]
+
+
+def _search_tsvector(session: Session, terms: list[str], wanted: list[str], limit: int, offset: int):
+    tsquery = " & ".join(f"{t}:*" for t in terms)
+    params = {"tsquery": tsquery, "limit": limit, "offset": offset}
+    property_id = current_property_id()
+    selects = []
+    for entity in wanted:
+        _, tables, title, body = ENTITIES[entity]
+        vector = _tsvector(title.format(p=""), body.format(p=""))
+        condition = f"{vector} @@ q"
+        if property_id is not None and _scoped(tables[0]):
+            condition += " AND property_id = :property_id"
+            params["property_id"] = property_id
+        selects.extend(
+            f"SELECT '{entity}' AS entity, id, {title.format(p='')} AS title, "
+            f"left({body.format(p='')}, 160) AS snippet, ts_rank({vector}, q) AS score "
+            f"FROM {table}, to_tsquery('simple', :tsquery) AS q WHERE {condition}"
+            for table in tables
+        )
+    stmt = text(
+        " UNION ALL ".join(selects) + " ORDER BY score DESC LIMIT :limit OFFSET :offset"
+    ).bindparams(**params)
+    return session.exec(stmt).all()
+
+
+def _search_like(session: Session, terms: list[str], wanted: list[str], limit: int, offset: int):
+    selects = []
+    params = {"limit": limit, "offset": offset}
+    property_id = current_property_id()
+    for entity in wanted:
+        _, tables, title, body = ENTITIES[entity]
+        haystack = f"lower({title.format(p='')} || ' ' || {body.format(p='')})"
+        conditions = []
+        for i, term in enumerate(terms):
+            params[f"t{i}"] = f"%{term}%"
+            conditions.append(f"{haystack} LIKE :t{i}")
+        if property_id is not None and _scoped(tables[0]):
+            params["property_id"] = property_id
+            conditions.append("property_id = :property_id")
+        selects.extend(
+            f"SELECT '{entity}' AS entity, id, {title.format(p='')} AS title, "
+            f"substr({body.format(p='')}, 1, 160) AS snippet, 0 AS score FROM {table} WHERE {' AND '.join(conditions)}"
+            for table in tables
+        )
+    stmt = text(" UNION ALL ".join(selects) + " LIMIT :limit OFFSET :offset").bindparams(**params)
+    return session.exec(stmt).all()
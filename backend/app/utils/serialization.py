@@ -0,0 +1,36 @@
+"""Fast JSON for list endpoints.
+
+The app's default response class is ``ORJSONResponse``. List handlers go one
+step further with `rows_response`: they select only the columns named by
+their response schema and hand the row tuples straight to orjson, skipping
+ORM instances, ``jsonable_encoder`` and response-model validation (the
+schema still documents the endpoint through ``response_model``).
+"""
+from typing import Any, Iterable, Optional
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlmodel import Session
+
+
+def columns(model, schema: type[BaseModel]) -> list:
+    """Column attributes of `model` for the fields of `schema`, in schema order.
+
+    ORM attributes rather than ``__table__`` columns, so the selects stay
+    property-scoped (utils/tenancy) while still returning plain rows.
+    """
+    return [getattr(model, name) for name in schema.model_fields]
+
+
+def rows_response(
+    session: Session,
+    model,
+    schema: type[BaseModel],
+    where: Iterable[Any] = (),
+    order_by: Optional[Any] = None,
+) -> ORJSONResponse:
+    stmt = select(*columns(model, schema)).where(*where).order_by(order_by if order_by is not None else model.id)
+    result = session.execute(stmt)
+    keys = tuple(result.keys())
+    return ORJSONResponse([dict(zip(keys, row)) for row in result])
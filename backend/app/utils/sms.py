@@ -1,5 +1,7 @@
 from dotenv import load_dotenv
 import os
+import time
+from .metrics import NOTIFY_LATENCY, NOTIFY_FAILURES
 
 load_dotenv()
 
@@ -11,10 +13,14 @@ def send_sms(to: str, body: str):
     """Send SMS via Twilio. Returns status dict."""
     if not TWILIO_ACCOUNT_SID or not TWILIO_AUTH_TOKEN or not TWILIO_FROM:
         return {"status": "SMS skipped (missing credentials)"}
+    start = time.perf_counter()
     try:
         from twilio.rest import Client
         client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
         msg = client.messages.create(to=to, from_=TWILIO_FROM, body=body)
         return {"status": "SMS sent", "sid": msg.sid}
     except Exception as e:
+        NOTIFY_FAILURES.inc(channel="sms")
         return {"status": "SMS failed", "error": str(e)}
+    finally:
+        NOTIFY_LATENCY.observe(time.perf_counter() - start, channel="sms")
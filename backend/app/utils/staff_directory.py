@@ -0,0 +1,86 @@
+"""Column-projected staff directory.
+
+Roster screens only need a handful of StaffMember columns, so the list
+endpoints select exactly the fields asked for with ``?fields=`` (field
+names and/or the presets below). `password_hash` is never selectable, and
+bank/next-of-kin/address details only come from the per-staff detail
+endpoint. Results are paged with page/page_size; the total number of
+matches is returned in ``X-Total-Count``.
+"""
+from typing import Optional
+
+from fastapi import HTTPException
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import func, select
+from sqlmodel import Session
+
+from ..models import StaffMember
+from ..schemas import StaffRead
+
+MAX_PAGE_SIZE = 500
+
+DETAIL_ONLY_FIELDS = ("account_details", "address", "next_of_kin_name", "next_of_kin_phone")
+LIST_FIELDS = tuple(name for name in StaffRead.model_fields if name not in DETAIL_ONLY_FIELDS)
+
+STAFF_FIELD_SETS = {
+    "directory": ("id", "name", "email", "phone", "role", "department", "status"),
+    "roster": ("id", "name", "email", "phone", "role", "department", "status", "staff_code", "shift", "salary"),
+    "all": LIST_FIELDS,
+}
+DEFAULT_FIELD_SET = "directory"
+
+
+def parse_fields(value: Optional[str]) -> list[str]:
+    """Resolve a ``fields`` parameter to column names (id always included); 422 on unknown names."""
+    names = ["id"]
+    for part in (value or DEFAULT_FIELD_SET).split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if part in STAFF_FIELD_SETS:
+            names.extend(STAFF_FIELD_SETS[part])
+        elif part in LIST_FIELDS:
+            names.append(part)
+        else:
+            raise HTTPException(status_code=422, detail=f"Unknown staff field: {part}")
+    return list(dict.fromkeys(names))
+
+
+def directory_response(
+    session: Session,
+    fields: Optional[str] = None,
+    department: Optional[str] = None,
+    role: Optional[str] = None,
+    status: Optional[str] = None,
+    page: int = 1,
+    page_size: int = 100,
+) -> ORJSONResponse:
+    names = parse_fields(fields)
+    page = max(page, 1)
+    page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+    criteria = []
+    if department:
+        criteria.append(StaffMember.department == department)
+    if role:
+        criteria.append(StaffMember.role == role)
+    if status:
+        criteria.append(StaffMember.status == status)
+
+    total = session.execute(select(func.count()).select_from(StaffMember).where(*criteria)).scalar_one()
+    result = session.execute(
+        select(*(getattr(StaffMember, name) for name in names))
+        .where(*criteria)
+        .order_by(StaffMember.id)
+        .limit(page_size)
+        .offset((page - 1) * page_size)
+    )
+    keys = tuple(result.keys())
+    return ORJSONResponse([dict(zip(keys, row)) for row in result], headers={"X-Total-Count": str(total)})
+
+
+def export_rows(session: Session) -> list[dict]:
+    """Every staff member with the StaffRead columns, for CSV/XLSX exports."""
+    result = session.execute(
+        select(*(getattr(StaffMember, name) for name in StaffRead.model_fields)).order_by(StaffMember.id)
+    )
+    return [dict(row._mapping) for row in result]
@@ -0,0 +1,211 @@
+"""Multi-property scoping.
+
+Each hotel run by a deployment is a Property row, and the per-hotel tables
+inherit `PropertyScoped`, which gives them a ``property_id`` column. Every
+request is bound to one property by `PropertyMiddleware`: the
+``property_id`` claim of its bearer token, else the ``X-Property-Id``
+header, else DEFAULT_PROPERTY_ID. Staff tokens are pinned to the property
+they logged in to (tokens without the claim to DEFAULT_PROPERTY_ID); admin
+tokens (and anonymous requests such as the public booking site) may pick
+one with the header. Requests for an unknown or inactive property are
+rejected; the active ids are cached for PROPERTY_CACHE_TTL seconds and
+dropped by `invalidate_properties` when properties change.
+
+While a request is bound, a session hook adds ``property_id = <current>``
+to every ORM SELECT, UPDATE and DELETE that touches a scoped model
+(``with_loader_criteria``, so joins, aliases and ``session.get`` are
+covered), and new rows default to the current property, so route handlers
+need no changes. Code running outside a request (background jobs, startup,
+scripts) is unbound and sees every property. Statements built on
+``Model.__table__`` or raw SQL bypass the hook; use the ORM attributes, or
+filter with `current_property_id` yourself (utils/search_index does).
+In-process caches of per-property data key their entries by
+`current_property_id`.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+import logging
+import os
+from typing import Optional
+
+from dotenv import load_dotenv
+from fastapi.responses import ORJSONResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import Integer, bindparam, column, event, text
+from sqlalchemy.orm import with_loader_criteria
+from sqlmodel import Field, Session, SQLModel, select
+
+from .cache import TTLCache
+from .security import decode_access_token
+from .write_queue import after_commit
+
+load_dotenv()
+
+DEFAULT_PROPERTY_ID = int(os.getenv("DEFAULT_PROPERTY_ID", "1"))
+PROPERTY_CACHE_TTL = float(os.getenv("PROPERTY_CACHE_TTL", "60"))
+PROPERTY_HEADER = "x-property-id"
+
+_current: ContextVar[Optional[int]] = ContextVar("property_id", default=None)
+_active = TTLCache(PROPERTY_CACHE_TTL, maxsize=1)  # None -> frozenset of active property ids
+
+
+def current_property_id() -> Optional[int]:
+    """The property the running request is bound to (None outside requests)."""
+    return _current.get()
+
+
+def insert_property_id() -> int:
+    return _current.get() or DEFAULT_PROPERTY_ID
+
+
+@contextmanager
+def bound(property_id: Optional[int]):
+    """Run a block as if inside a request for `property_id` (None: every property)."""
+    token = _current.set(property_id)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+class PropertyScoped(SQLModel):
+    """Base of models that belong to one property."""
+
+    # Rows that predate multi-property support belong to the default property.
+    property_id: int = Field(
+        default_factory=insert_property_id,
+        sa_column_kwargs={"server_default": text(str(DEFAULT_PROPERTY_ID))},
+    )
+
+
+# with_loader_criteria first runs its lambda against PropertyScoped itself,
+# which has no mapped column; the placeholder stands in for that one call.
+_PLACEHOLDER = column("property_id")
+# Read when the statement executes, so one option (and one cached
+# compilation per statement) serves every property.
+_CURRENT = bindparam("current_property_id", type_=Integer, callable_=current_property_id)
+
+
+def _property_column(cls):
+    return cls.property_id if "property_id" in cls.__dict__ else _PLACEHOLDER
+
+
+_SCOPE = with_loader_criteria(
+    PropertyScoped,
+    lambda cls: _property_column(cls) == _CURRENT,
+    include_aliases=True,
+    track_closure_variables=False,
+)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _scope_statement(state):
+    if (
+        _current.get() is None
+        or not (state.is_select or state.is_update or state.is_delete)
+        or state.is_column_load
+        or state.is_relationship_load
+    ):
+        return
+    state.statement = state.statement.options(_SCOPE)
+
+
+def _header(scope, name: bytes) -> Optional[bytes]:
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value
+    return None
+
+
+def resolve(authorization: Optional[str], header: Optional[str]) -> int:
+    """Property of a request from its Authorization and X-Property-Id values; ValueError on a bad header."""
+    claims = {}
+    if authorization and authorization.lower().startswith("bearer "):
+        try:
+            claims = decode_access_token(authorization.split(" ", 1)[1])
+        except Exception:
+            claims = {}  # the route's own auth dependency answers 401
+    requested = int(header) if header else None
+    if claims.get("role") == "admin" and requested is not None:
+        return requested
+    pinned = claims.get("property_id")
+    if pinned is not None:
+        return int(pinned)
+    if claims:
+        # Staff tokens issued before multi-property support carry no claim;
+        # they must not pick a property with the header either.
+        return DEFAULT_PROPERTY_ID
+    return requested if requested is not None else DEFAULT_PROPERTY_ID
+
+
+def _load_active() -> Optional[frozenset]:
+    from ..db_core import get_engine, wait_until_ready
+    from ..models import Property
+
+    wait_until_ready()
+    try:
+        with Session(get_engine()) as session:
+            ids = frozenset(session.exec(select(Property.id).where(Property.is_active.is_(True))).all())
+    except Exception:
+        # Schema not created yet or database down: the route's own queries report that.
+        logging.getLogger(__name__).warning("Could not load active properties", exc_info=True)
+        return None
+    _active.set(None, ids)
+    return ids
+
+
+def active_property_ids() -> Optional[frozenset]:
+    """Ids of the active properties (None when they cannot be read)."""
+    ids = _active.get(None)
+    return ids if ids is not None else _load_active()
+
+
+def invalidate_properties() -> None:
+    """Drop the cached active ids once the current write commits."""
+    after_commit(_active.clear)
+
+
+class PropertyMiddleware:
+    """ASGI middleware binding each HTTP request to its property."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        authorization = _header(scope, b"authorization")
+        header = _header(scope, PROPERTY_HEADER.encode())
+        try:
+            property_id = resolve(
+                authorization.decode("latin-1") if authorization else None,
+                header.decode("latin-1").strip() if header else None,
+            )
+        except ValueError:
+            response = ORJSONResponse({"detail": "Invalid X-Property-Id header"}, status_code=400)
+            await response(scope, receive, send)
+            return
+        active = _active.get(None)
+        if active is None:
+            active = await run_in_threadpool(_load_active)
+        if active is not None and property_id not in active:
+            response = ORJSONResponse({"detail": "Unknown or inactive property"}, status_code=400)
+            await response(scope, receive, send)
+            return
+        token = _current.set(property_id)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current.reset(token)
+
+
+def install_default_property(engine) -> None:
+    """Create the default Property row that existing data belongs to. Idempotent."""
+    from ..models import Property
+
+    with Session(engine) as session:
+        if session.get(Property, DEFAULT_PROPERTY_ID) is None:
+            session.add(Property(id=DEFAULT_PROPERTY_ID, name="Main property", code="main"))
+            session.commit()
+    _active.clear()
@@ -0,0 +1,233 @@
+"""Single-writer queue for SQLite deployments (SQLITE_WRITE_QUEUE=true).
+
+SQLite allows one writer at a time; with several worker threads writing,
+requests pile up in the busy handler or fail with "database is locked".
+In queue mode every mutating route (POST/PUT/PATCH/DELETE, see
+`QueuedWriteRoute`) runs its handler on one dedicated writer thread that
+owns a single connection. The writer takes whatever jobs are waiting (up to
+WRITE_QUEUE_MAX_BATCH), runs each one inside its own SAVEPOINT (the
+request's `session.commit()` releases it, errors roll it back) and then
+commits the whole group with one COMMIT, i.e. one fsync for many requests.
+Callers get their response only after that commit. Reads keep using the
+normal pool and stay concurrent because the database is switched to WAL.
+
+Writes made outside the request session (e.g. via `get_engine()` directly)
+bypass the queue and still rely on the busy timeout.
+"""
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+import contextvars
+import functools
+import inspect
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.routing import APIRoute
+from sqlalchemy import create_engine, event
+from sqlmodel import Session
+from starlette.responses import Response
+
+from .metrics import Gauge, Histogram
+
+SQLITE_WRITE_QUEUE = os.getenv("SQLITE_WRITE_QUEUE", "false").lower() in ("1", "true", "yes")
+WRITE_QUEUE_MAX_BATCH = int(os.getenv("WRITE_QUEUE_MAX_BATCH", "64"))
+# Optional extra wait (ms) for more jobs before committing a group; 0 batches only what is already queued.
+WRITE_QUEUE_WAIT_MS = float(os.getenv("WRITE_QUEUE_WAIT_MS", "0"))
+WRITE_QUEUE_TIMEOUT = float(os.getenv("WRITE_QUEUE_TIMEOUT", "30"))
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+WRITE_QUEUE_DEPTH = Gauge("db_write_queue_depth", "Units of work waiting for the SQLite writer thread.")
+WRITE_GROUP_SIZE = Histogram(
+    "db_write_group_size", "Units of work committed per SQLite group commit.", buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+)
+
+_enabled: bool | None = None
+_writer: "_Writer | None" = None
+_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    """True when queue mode is on and the app is running on SQLite."""
+    global _enabled
+    if _enabled is None:
+        from ..db_core import get_engine
+
+        _enabled = SQLITE_WRITE_QUEUE and get_engine().dialect.name == "sqlite"
+    return _enabled
+
+
+def set_enabled(value: bool | None) -> None:
+    """Force queue mode on/off (None re-reads the environment); used by benchmarks."""
+    global _enabled
+    _enabled = value
+
+
+class _Job:
+    __slots__ = ("fn", "future")
+
+    def __init__(self, fn: Callable):
+        self.fn = fn
+        self.future: Future = Future()
+
+
+class _Writer(threading.Thread):
+    def __init__(self, url: str):
+        super().__init__(name="sqlite-writer", daemon=True)
+        self.jobs: queue.Queue[_Job] = queue.Queue()
+        self.engine = create_engine(url)
+        self.callbacks: list[Callable[[], Any]] = []  # see after_commit
+
+        # pysqlite's implicit transactions break SAVEPOINT; take over BEGIN
+        # (as IMMEDIATE, so the write lock is held for the whole group).
+        @event.listens_for(self.engine, "connect")
+        def _connect(dbapi_connection, _):
+            dbapi_connection.isolation_level = None
+            dbapi_connection.execute("PRAGMA journal_mode=WAL")
+
+        @event.listens_for(self.engine, "begin")
+        def _begin(connection):
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+    def run(self):
+        with self.engine.connect() as conn:
+            while True:
+                group = [self.jobs.get()]
+                if WRITE_QUEUE_WAIT_MS:
+                    time.sleep(WRITE_QUEUE_WAIT_MS / 1000)
+                while len(group) < WRITE_QUEUE_MAX_BATCH:
+                    try:
+                        group.append(self.jobs.get_nowait())
+                    except queue.Empty:
+                        break
+                WRITE_QUEUE_DEPTH.set(self.jobs.qsize())
+                self._run_group(conn, group)
+
+    def _run_group(self, conn, group: list[_Job]) -> None:
+        results = []
+        try:
+            with conn.begin():
+                for job in group:
+                    if not job.future.set_running_or_notify_cancel():
+                        continue  # its request timed out waiting; it gets no response
+                    try:
+                        results.append((job, job.fn(conn), None))
+                    except BaseException as e:  # noqa: B902 - delivered to the waiting request
+                        results.append((job, None, e))
+        except Exception as e:
+            logging.exception("SQLite group commit of %d units of work failed", len(group))
+            results = [(job, None, error or e) for job, _, error in results]
+        callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                logging.exception("after_commit callback failed")
+        WRITE_GROUP_SIZE.observe(len(group))
+        for job, result, error in results:
+            if error is not None:
+                job.future.set_exception(error)
+            else:
+                job.future.set_result(result)
+
+
+def _writer_instance() -> _Writer:
+    global _writer
+    if _writer is None:
+        with _lock:
+            if _writer is None:
+                from ..db_core import get_engine
+
+                _writer = _Writer(str(get_engine().url))
+                _writer.start()
+    return _writer
+
+
+def on_writer_thread() -> bool:
+    return _writer is not None and threading.current_thread() is _writer
+
+
+def after_commit(fn: Callable[[], Any]) -> None:
+    """Run `fn` once the current write is committed.
+
+    On the writer thread a request's `session.commit()` only releases its
+    savepoint, so `fn` (e.g. a cache invalidation) waits for the group
+    COMMIT; everywhere else it runs straight away.
+    """
+    if on_writer_thread():
+        _writer.callbacks.append(fn)
+    else:
+        fn()
+
+
+def submit(fn: Callable[[Any], Any]) -> Any:
+    """Run `fn(connection)` on the writer thread and return its result once committed.
+
+    A job still waiting in the queue after WRITE_QUEUE_TIMEOUT seconds is
+    cancelled and the caller gets the timeout; once the writer has started
+    it the caller waits for the commit, so a timed-out write never lands.
+    """
+    if on_writer_thread():
+        raise RuntimeError("submit() called from the writer thread")
+    job = _Job(fn)
+    writer = _writer_instance()
+    writer.jobs.put(job)
+    WRITE_QUEUE_DEPTH.set(writer.jobs.qsize())
+    try:
+        return job.future.result(timeout=WRITE_QUEUE_TIMEOUT)
+    except FutureTimeout:
+        if job.future.cancel():
+            raise
+        return job.future.result()
+
+
+def _run_endpoint(conn, endpoint: Callable, args: tuple, kwargs: dict):
+    sessions = [value for value in kwargs.values() if isinstance(value, Session)]
+    for session in sessions:
+        if session.in_transaction():
+            session.close()  # e.g. used by a dependency; reopen on the writer connection
+        session.bind = conn
+        session.join_transaction_mode = "create_savepoint"
+    try:
+        result = endpoint(*args, **kwargs)
+        # Serialise here: lazy loads after this point would use the writer's connection from another thread.
+        return result if isinstance(result, Response) else jsonable_encoder(result)
+    finally:
+        for session in sessions:
+            session.close()
+
+
+def exempt(endpoint: Callable) -> Callable:
+    """Keep a mutating-method route off the writer thread (e.g. logins that only read)."""
+    endpoint._write_queue_exempt = True
+    return endpoint
+
+
+def _queued(endpoint: Callable) -> Callable:
+    @functools.wraps(endpoint)
+    def queued(*args, **kwargs):
+        if not enabled() or on_writer_thread():
+            return endpoint(*args, **kwargs)
+        ctx = contextvars.copy_context()  # keeps per-request state such as query stats
+        return submit(lambda conn: ctx.run(_run_endpoint, conn, endpoint, args, kwargs))
+
+    queued._write_queued = True
+    return queued
+
+
+class QueuedWriteRoute(APIRoute):
+    """Route class that sends sync mutating handlers through the writer queue when enabled."""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        methods = {m.upper() for m in kwargs.get("methods") or ()}
+        if (
+            methods & WRITE_METHODS
+            and not inspect.iscoroutinefunction(endpoint)
+            and not getattr(endpoint, "_write_queue_exempt", False)
+            and not getattr(endpoint, "_write_queued", False)
+        ):
+            endpoint = _queued(endpoint)
+        super().__init__(path, endpoint, **kwargs)
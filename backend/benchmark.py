@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""Benchmark the hot API endpoints in-process against a seeded SQLite file.
+
+Usage:
+  python benchmark.py --scale small --output bench.json
+  python benchmark.py --scale large --output after.json --baseline before.json
+  python benchmark.py --write-contention 16
+
+
+The app runs through FastAPI's TestClient (requires ``httpx``), so no
+server is needed. Data comes from seed.py, is deterministic for a given
+``--seed`` and is reused between runs unless ``--reseed`` is passed. Each endpoint
+reports p50/p99/mean latency and the peak Python heap allocated during a
+single call; ``--baseline`` prints the relative change against an earlier
+result file. The ``serialize_*`` entries time the list-endpoint serialisation
+paths directly: ORM instances through ``jsonable_encoder`` (what FastAPI does
+for a raw list of models) against row tuples through orjson
+(app/utils/serialization.py). ``--write-contention N`` additionally hammers two write
+endpoints from N threads, once with direct commits and once through the
+SQLite single-writer queue (app/utils/write_queue.py), and reports
+throughput, latency and error counts for both.
+"""
+import sys
+import os
+import argparse
+import json
+import logging
+import platform
+import statistics
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+# Ensure `app` package (backend/app) is importable
+ROOT = os.path.dirname(os.path.abspath(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+SCALES = {
+    "small": {"rooms": 50, "bookings": 10_000, "staff": 100, "guests": 1_000},
+    "large": {"rooms": 500, "bookings": 1_000_000, "staff": 5_000, "guests": 100_000},
+}
+
+ADMIN_EMAIL = "bench-admin@example.com"
+BENCH_PASSWORD = "bench-password"
+# seed.py gives staff member 0 this role and the password "staff-0".
+STAFF_ROLE = "receptionist"
+STAFF_PASSWORD = "staff-0"
+
+
+def seed_fixture(engine, counts: dict, seed: int) -> None:
+    """Load the seed.py dataset plus the admin account the benchmark logs in with."""
+    from sqlalchemy import insert
+    from app.models import AdminUser
+    from app.utils.security import hash_password
+    from seed import seed_database
+
+    seed_database(engine, {"tasks": counts["rooms"] * 10, **counts}, seed=seed)
+    with engine.begin() as conn:
+        conn.execute(insert(AdminUser.__table__), [{"email": ADMIN_EMAIL, "password_hash": hash_password(BENCH_PASSWORD)}])
+
+
+def _measure(call, iterations: int) -> dict:
+    call()  # warm-up
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    timings.sort()
+    return {
+        "iterations": iterations,
+        "p50_ms": round(statistics.median(timings), 3),
+        "p99_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.99))], 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "peak_mem_kb": round(peak / 1024, 1),
+    }
+
+
+def _check(response):
+    if response.status_code >= 400:
+        raise RuntimeError(f"{response.request.method} {response.request.url} -> {response.status_code}: {response.text[:200]}")
+    return response
+
+
+def run_benchmarks(client, iterations: int) -> dict:
+    from app.utils.security import create_access_token
+
+    token = _check(client.post("/api/admin/login", json={"email": ADMIN_EMAIL, "password": BENCH_PASSWORD})).json()["access_token"]
+    auth = {"Authorization": f"Bearer {token}"}
+    erp_auth = {"Authorization": f"Bearer {create_access_token({'sub': ADMIN_EMAIL, 'role': 'admin'})}"}
+    heavy = max(3, iterations // 5)
+    booking_payload = {
+        "name": "Bench Guest",
+        "email": "bench@example.com",
+        "room_type": "deluxe",
+        "check_in": "2026-03-01",
+        "check_out": "2026-03-04",
+    }
+
+    cases = {
+        "admin_bookings": (lambda: _check(client.get("/api/admin/bookings", headers=auth)), heavy),
+        "reports_summary": (lambda: _check(client.get("/api/admin/reports/summary", headers=auth)), iterations),
+        "export_bookings_csv": (lambda: _check(client.get("/api/admin/reports/bookings.csv", headers=auth)), heavy),
+        "export_bookings_xlsx": (lambda: _check(client.get("/api/admin/reports/bookings.xlsx", headers=auth)), heavy),
+        "erp_login": (
+            lambda: _check(client.post("/api/erp/login", json={"role": STAFF_ROLE, "password": STAFF_PASSWORD})),
+            heavy,
+        ),
+        "submit_booking": (lambda: _check(client.post("/api/booking/", json=booking_payload)), iterations),
+        "public_announcements": (lambda: _check(client.get("/api/public/announcements")), iterations),
+        "admin_staff": (lambda: _check(client.get("/api/admin/staff", headers=auth)), iterations),
+        "admin_rooms": (lambda: _check(client.get("/api/admin/rooms", headers=auth)), iterations),
+        "erp_guests": (lambda: _check(client.get("/api/erp/guests", headers=erp_auth)), heavy),
+        "rate_grid": (
+            lambda: _check(client.get("/api/public/rates/grid", params={"room_type": "deluxe", "start": "2026-03-01", "days": 31, "nights": 3})),
+            iterations,
+        ),
+    }
+
+    results = {}
+    for name, (call, n) in cases.items():
+        results[name] = _measure(call, n)
+        print(f"{name:<24} p50={results[name]['p50_ms']:>10.2f}ms  p99={results[name]['p99_ms']:>10.2f}ms  "
+              f"peak={results[name]['peak_mem_kb']:>10.1f}KiB")
+    return results
+
+
+def run_serialization(engine, iterations: int) -> dict:
+    """List serialisation in isolation: ORM + jsonable_encoder + json vs row tuples + orjson."""
+    from fastapi.encoders import jsonable_encoder
+    from sqlmodel import Session, select
+    from app.models import GuestProfile, StaffMember
+    from app.schemas import GuestProfileRead, StaffRead
+    from app.utils.serialization import rows_response
+
+    results = {}
+    for name, model, schema in (("guests", GuestProfile, GuestProfileRead), ("staff", StaffMember, StaffRead)):
+        with Session(engine) as session:
+            def orm():
+                rows = session.exec(select(model)).all()
+                return json.dumps(jsonable_encoder(rows)).encode()
+
+            def fast():
+                return rows_response(session, model, schema).body
+
+            for path, call in (("orm", orm), ("rows", fast)):
+                key = f"serialize_{name}_{path}"
+                results[key] = _measure(call, iterations)
+                session.expunge_all()
+            speedup = results[f"serialize_{name}_orm"]["p50_ms"] / max(results[f"serialize_{name}_rows"]["p50_ms"], 1e-6)
+            print(f"serialize_{name:<14} orm p50={results[f'serialize_{name}_orm']['p50_ms']:>9.2f}ms  "
+                  f"rows p50={results[f'serialize_{name}_rows']['p50_ms']:>9.2f}ms  speedup={speedup:.1f}x")
+    return results
+
+
+def run_write_contention(client, threads: int, per_thread: int) -> dict:
+    """Concurrent bookings and stock adjustments, direct commits vs the writer queue."""
+    from app.utils import write_queue
+
+    token = _check(client.post("/api/admin/login", json={"email": ADMIN_EMAIL, "password": BENCH_PASSWORD})).json()["access_token"]
+    auth = {"Authorization": f"Bearer {token}"}
+    item_id = _check(client.post("/api/erp/inventory", json={"name": "Bench stock", "quantity": 1e9}, headers=auth)).json()["id"]
+    booking_payload = {
+        "name": "Bench Writer",
+        "email": "writer@example.com",
+        "room_type": "deluxe",
+        "check_in": "2026-03-01",
+        "check_out": "2026-03-04",
+    }
+    calls = (
+        lambda: client.post("/api/booking/", json=booking_payload),
+        lambda: client.post(f"/api/erp/inventory/{item_id}/adjust", json={"delta": -1, "reason": "consume"}, headers=auth),
+    )
+
+    results = {}
+    for mode, queued in (("direct", False), ("queued", True)):
+        write_queue.set_enabled(queued)
+        timings, errors = [], []
+
+        def worker():
+            for i in range(per_thread):
+                start = time.perf_counter()
+                response = calls[i % len(calls)]()
+                timings.append((time.perf_counter() - start) * 1000)
+                if response.status_code >= 400:
+                    errors.append(response.status_code)
+
+        started = time.perf_counter()
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        elapsed = time.perf_counter() - started
+        timings.sort()
+        results[mode] = {
+            "threads": threads,
+            "requests": len(timings),
+            "throughput_rps": round(len(timings) / elapsed, 1),
+            "p50_ms": round(statistics.median(timings), 3),
+            "p99_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.99))], 3),
+            "errors": len(errors),
+        }
+        print(f"writes/{mode:<17} {results[mode]['throughput_rps']:>8.1f} req/s  p50={results[mode]['p50_ms']:>9.2f}ms  "
+              f"p99={results[mode]['p99_ms']:>9.2f}ms  errors={results[mode]['errors']}")
+    write_queue.set_enabled(None)
+    return results
+
+
+def compare(results: dict, baseline: dict) -> None:
+    print(f"\n{'endpoint':<24} {'p50 base':>10} {'p50 now':>10} {'change':>8}")
+    for name, current in results.items():
+        base = baseline.get("results", {}).get(name)
+        if not base or "p50_ms" not in base:
+            continue
+        change = (current["p50_ms"] - base["p50_ms"]) / base["p50_ms"] * 100 if base["p50_ms"] else 0.0
+        print(f"{name:<24} {base['p50_ms']:>10.2f} {current['p50_ms']:>10.2f} {change:>+7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Room Booker hot endpoints")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small", help="Dataset preset")
+    for entity in ("rooms", "bookings", "staff", "guests"):
+        parser.add_argument(f"--{entity}", type=int, help=f"Override the number of {entity}")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the synthetic dataset")
+    parser.add_argument("--db", default=None, help="SQLite file to use (default: bench-<scale>.sqlite)")
+    parser.add_argument("--reseed", action="store_true", help="Drop and regenerate the dataset")
+    parser.add_argument("--iterations", type=int, default=20, help="Timed iterations per endpoint")
+    parser.add_argument("--output", default="bench-results.json", help="Where to write the JSON results")
+    parser.add_argument("--baseline", default=None, help="Earlier result file to compare against")
+    parser.add_argument("--write-contention", type=int, default=0, metavar="THREADS",
+                        help="Also compare direct vs queued SQLite writes from this many threads")
+    args = parser.parse_args()
+
+    counts = dict(SCALES[args.scale])
+    for entity in counts:
+        if getattr(args, entity) is not None:
+            counts[entity] = getattr(args, entity)
+
+    db_path = os.path.abspath(args.db or f"bench-{args.scale}.sqlite")
+    if args.reseed and os.path.exists(db_path):
+        os.remove(db_path)
+    fresh = not os.path.exists(db_path)
+
+    # Must be set before the app (and its engine) is imported.
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["MAIL_USERNAME"] = ""
+    os.environ["MAIL_PASSWORD"] = ""
+    os.environ.pop("ADMIN_ALERT_EMAIL", None)
+    os.environ.pop("ADMIN_ALERT_PHONE", None)
+    # Archival/retention jobs would write to the fixture mid-run.
+    os.environ["BACKGROUND_JOBS"] = "false"
+
+    from fastapi.testclient import TestClient
+    from app.db_core import engine, init_db
+    from app.main import app
+
+    init_db()
+    if fresh:
+        start = time.perf_counter()
+        seed_fixture(engine, counts, args.seed)
+        print(f"Seeded {counts} into {db_path} in {time.perf_counter() - start:.1f}s")
+
+    with TestClient(app) as client:
+        results = run_benchmarks(client, args.iterations)
+    results.update(run_serialization(engine, args.iterations))
+    if args.write_contention:
+        # Lock waits show up as slow queries; keep the report readable.
+        logging.getLogger("app.sql").setLevel(logging.ERROR)
+        with TestClient(app, raise_server_exceptions=False) as client:
+            results["write_contention"] = run_write_contention(client, args.write_contention, args.iterations * 2)
+
+    payload = {
+        "meta": {
+            "scale": args.scale,
+            "counts": counts,
+            "seed": args.seed,
+            "iterations": args.iterations,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.utcnow().isoformat(),
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as fh:
+        json.dump(payload, fh, indent=2)
+    print(f"\nWrote {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            compare(results, json.load(fh))
+
+
+if __name__ == "__main__":
+    main()
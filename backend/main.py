@@ -1,29 +1,56 @@
-import sys, os
+import sys, os, time, logging
+_import_started = time.perf_counter()
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.db_core import init_db
-from app.routes import contact, booking, admin, erp
+from app.db_core import startup_db, startup_timings
+from app.routes import contact, booking, admin, erp, metrics
+from app.utils.metrics import MetricsMiddleware
+from app.utils.query_stats import QueryStatsMiddleware
+from app.utils.profiler import ProfilerMiddleware
+from app.utils.tenancy import PropertyMiddleware
+from app.utils.replicas import ReadRoutingMiddleware
+from app.utils import archive, inbox, jobs
 
-app = FastAPI(title="Room Booker API")
+app = FastAPI(title="Room Booker API", default_response_class=ORJSONResponse)
 
 origins_env = os.getenv("CORS_ORIGINS", "*")
 origins = [origin.strip() for origin in origins_env.split(",") if origin.strip()]
 
+# Inside CORS so its error responses still carry the CORS headers.
+app.add_middleware(PropertyMiddleware)
+app.add_middleware(ReadRoutingMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count"],
 )
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(ProfilerMiddleware)
 
 @app.on_event("startup")
 def on_startup():
-    init_db()
+    start = time.perf_counter()
+    startup_db()
+    jobs.register("booking-archive", archive.BOOKING_ARCHIVE_INTERVAL, archive.run_scheduled)
+    jobs.register("message-retention", inbox.MESSAGE_RETENTION_INTERVAL, inbox.run_retention)
+    jobs.start()
+    logging.getLogger(__name__).info(
+        "Startup: app import %.1f ms, startup hook %.1f ms",
+        startup_timings.get("app_import_ms", 0.0),
+        (time.perf_counter() - start) * 1000,
+    )
 
 app.include_router(contact.router)
 app.include_router(booking.router)
 app.include_router(admin.router)
 app.include_router(erp.router)
+app.include_router(metrics.router)
+
+startup_timings["app_import_ms"] = (time.perf_counter() - _import_started) * 1000
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""Generate a realistic synthetic hotel dataset for load testing and staging.
+
+Usage:
+  python seed.py --rooms 500 --bookings 1000000 --staff 5000 --guests 100000
+  python seed.py --scale small --seed 7 --wipe
+
+This script runs inside the `backend` directory and uses the same
+database configuration as the app (falls back to SQLite when Postgres
+is not available). Rows are written with chunked core inserts and the
+output is deterministic for a given ``--seed``. Staff member ``i`` can
+log in to the ERP with role ``<role>`` and password ``staff-<i>``.
+"""
+import sys
+import os
+import argparse
+import bisect
+import itertools
+import math
+import random
+import time
+from datetime import date, datetime, timedelta
+
+# Ensure `app` package (backend/app) is importable
+ROOT = os.path.dirname(os.path.abspath(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+SCALES = {
+    "small": {"rooms": 50, "bookings": 10_000, "staff": 100, "guests": 1_000, "tasks": 500},
+    "large": {"rooms": 500, "bookings": 1_000_000, "staff": 5_000, "guests": 100_000, "tasks": 50_000},
+}
+
+# name, share of rooms, base nightly price, capacity
+ROOM_TYPES = [
+    ("standard", 0.45, 120.0, 2),
+    ("deluxe", 0.25, 180.0, 2),
+    ("family", 0.12, 220.0, 4),
+    ("executive", 0.12, 300.0, 2),
+    ("suite", 0.06, 480.0, 3),
+]
+AMENITIES = ["wifi", "tv", "minibar", "balcony", "bathtub", "sea view", "desk", "coffee machine"]
+STAFF_ROLES = [
+    ("receptionist", "front_office", 0.14),
+    ("concierge", "front_office", 0.04),
+    ("housekeeping", "housekeeping", 0.30),
+    ("laundry", "housekeeping", 0.06),
+    ("manager", "management", 0.03),
+    ("chef", "food_beverage", 0.06),
+    ("kitchen_staff", "food_beverage", 0.12),
+    ("restaurant_waiter", "food_beverage", 0.10),
+    ("security", "security", 0.07),
+    ("maintenance", "maintenance", 0.05),
+    ("accountant", "finance", 0.03),
+]
+FIRST_NAMES = ["Ada", "Bola", "Chidi", "Dayo", "Emeka", "Funmi", "Gozie", "Hauwa", "Ife", "Jide",
+               "Kemi", "Lola", "Musa", "Ngozi", "Obi", "Tolu", "Uche", "Yemi", "Zainab", "Sam"]
+LAST_NAMES = ["Adeyemi", "Bello", "Chukwu", "Danjuma", "Eze", "Fashola", "Garba", "Ibrahim",
+              "Johnson", "Okafor", "Okeke", "Olawale", "Smith", "Usman", "Williams"]
+TASK_TYPES = ["cleaning", "cleaning", "cleaning", "turndown", "inspection", "maintenance", "laundry"]
+PRIORITIES = ["low", "medium", "medium", "high", "urgent"]
+ROOMS_PER_FLOOR = 20
+
+
+def _chunks(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _season_weights(start: date, days: int) -> list[float]:
+    """Demand per arrival day: summer and December peaks plus a weekend bump."""
+    weights = []
+    for offset in range(days):
+        d = start + timedelta(days=offset)
+        doy = d.timetuple().tm_yday
+        summer = math.exp(-((doy - 200) / 35.0) ** 2)
+        holidays = math.exp(-((doy - 355) / 12.0) ** 2)
+        weekend = 1.25 if d.weekday() >= 4 else 1.0
+        weights.append((0.6 + 0.8 * summer + 0.7 * holidays) * weekend)
+    return weights
+
+
+def _max_id(conn, table) -> int:
+    from sqlalchemy import func, select
+    return conn.execute(select(func.max(table.c.id))).scalar() or 0
+
+
+def _sync_sequences(conn, tables) -> None:
+    """Move Postgres id sequences past ids that were inserted explicitly."""
+    from sqlalchemy import text
+    if conn.dialect.name != "postgresql":
+        return
+    for table in tables:
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), (SELECT MAX(id) FROM {table.name}))"
+        ))
+
+
+def seed_database(
+    engine,
+    counts: dict,
+    seed: int = 42,
+    start: date = date(2023, 1, 1),
+    end: date = date(2026, 12, 31),
+    hash_rounds: int = 1000,
+    chunk_size: int = 50_000,
+    wipe: bool = False,
+) -> dict:
+    """Bulk-load synthetic rooms, bookings, staff, guests, tasks and floor plans.
+
+    Returns the number of rows written per table.
+    """
+    from sqlalchemy import delete, event, insert
+    from app.models import (
+        Announcement, Booking, BookingMeta, FloorPlanItem, GuestProfile, HousekeepingTask, Room, StaffMember,
+    )
+    from app.utils.guest_search import normalized_columns
+    from app.utils.security import pwd_context
+
+    rng = random.Random(seed)
+    now = datetime.combine(end, datetime.min.time())
+    written: dict[str, int] = {}
+    tables = [Room, Booking, BookingMeta, StaffMember, GuestProfile, HousekeepingTask, FloorPlanItem, Announcement]
+
+    def _fast_sqlite(dbapi_conn, _record):
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+    is_sqlite = engine.dialect.name == "sqlite"
+    if is_sqlite:
+        engine.dispose()
+        event.listen(engine, "connect", _fast_sqlite)
+    try:
+        with engine.begin() as conn:
+            if wipe:
+                for model in reversed(tables):
+                    conn.execute(delete(model.__table__))
+
+            # Rooms and their floor plan rectangles
+            room_offset = _max_id(conn, Room.__table__)
+            rooms = []
+            for i in range(counts["rooms"]):
+                pick = rng.random()
+                acc = 0.0
+                for name, share, price, capacity in ROOM_TYPES:
+                    acc += share
+                    if pick <= acc:
+                        break
+                floor = i // ROOMS_PER_FLOOR + 1
+                number = f"{floor}{i % ROOMS_PER_FLOOR + 1:02d}"
+                rooms.append({
+                    "id": room_offset + i + 1,
+                    "name": f"Room {number}",
+                    "room_type": name,
+                    "price": round(price * rng.uniform(0.9, 1.15), 2),
+                    "capacity": capacity,
+                    "amenities": ",".join(rng.sample(AMENITIES, rng.randint(2, 5))),
+                    "is_available": rng.random() > 0.1,
+                    "created_at": now,
+                })
+            for batch in _chunks(rooms, chunk_size):
+                conn.execute(insert(Room.__table__), batch)
+            written["room"] = len(rooms)
+
+            floorplan = []
+            for i, room in enumerate(rooms):
+                slot = i % ROOMS_PER_FLOOR
+                floorplan.append({
+                    "room_id": str(room["id"]),
+                    "room_number": room["name"].split(" ", 1)[1],
+                    "x": float((slot % 10) * 110),
+                    "y": float((slot // 10) * 160),
+                    "width": 100.0,
+                    "height": 140.0,
+                    "floor": str(i // ROOMS_PER_FLOOR + 1),
+                })
+            for batch in _chunks(floorplan, chunk_size):
+                conn.execute(insert(FloorPlanItem.__table__), batch)
+            written["floorplanitem"] = len(floorplan)
+
+            # Bookings follow a seasonal arrival curve; metas share the ids.
+            days = (end - start).days + 1
+            day_offsets = list(range(days))
+            cum_weights = []
+            total = 0.0
+            for w in _season_weights(start, days):
+                total += w
+                cum_weights.append(total)
+            type_names = [t[0] for t in ROOM_TYPES]
+            type_cum = list(itertools.accumulate(t[1] for t in ROOM_TYPES))
+            booking_offset = _max_id(conn, Booking.__table__)
+            statuses = ("pending", "confirmed", "confirmed", "confirmed", "cancelled")
+            payments = ("unpaid", "pending", "paid", "paid")
+            people = [(f"{f} {l}", f"{f.lower()}.{l.lower()}") for f in FIRST_NAMES for l in LAST_NAMES]
+            arrival_dates = [start + timedelta(days=o) for o in day_offsets]
+            midnights = [datetime.combine(d, datetime.min.time()) for d in arrival_dates]
+            stays = [timedelta(days=n) for n in range(22)]
+
+            def bookings():
+                # Hot loop for 1M+ rows: everything that can be is precomputed.
+                rnd = rng.random
+                arrivals = rng.choices(day_offsets, cum_weights=cum_weights, k=counts["bookings"])
+                for i, offset in enumerate(arrivals):
+                    check_in = arrival_dates[offset]
+                    nights = min(1 + int(-math.log(1.0 - rnd()) / 0.45), 21)
+                    lead_minutes = int(-math.log(1.0 - rnd()) * 30 * 1440)
+                    booking_id = booking_offset + i + 1
+                    name, handle = people[int(rnd() * len(people))]
+                    yield {
+                        "id": booking_id,
+                        "reference_number": f"BK{booking_id:08d}",
+                        "name": name,
+                        "email": f"{handle}{booking_id}@example.com",
+                        "phone": f"080{booking_id % 100_000_000:08d}",
+                        "room_type": type_names[min(bisect.bisect(type_cum, rnd() * type_cum[-1]), len(type_names) - 1)],
+                        "check_in": check_in,
+                        "check_out": check_in + stays[nights],
+                        "created_at": midnights[offset] - timedelta(minutes=lead_minutes),
+                    }
+
+            count = 0
+            for batch in _chunks(bookings(), chunk_size):
+                conn.execute(insert(Booking.__table__), batch)
+                conn.execute(insert(BookingMeta.__table__), [
+                    {
+                        "booking_id": b["id"],
+                        "status": statuses[int(rng.random() * len(statuses))],
+                        "payment_status": payments[int(rng.random() * len(payments))],
+                        "updated_at": b["created_at"],
+                    }
+                    for b in batch
+                ])
+                count += len(batch)
+            written["booking"] = written["bookingmeta"] = count
+
+            # Staff: unique cheap hashes so role + password logins stay unambiguous.
+            hasher = pwd_context.handler().using(rounds=hash_rounds) if hash_rounds else pwd_context
+            staff_offset = _max_id(conn, StaffMember.__table__)
+            role_weights = [r[2] for r in STAFF_ROLES]
+
+            def staff():
+                for i in range(counts["staff"]):
+                    role, department, _ = rng.choices(STAFF_ROLES, weights=role_weights)[0]
+                    if i < len(STAFF_ROLES):
+                        role, department, _ = STAFF_ROLES[i]
+                    first = FIRST_NAMES[rng.randrange(len(FIRST_NAMES))]
+                    last = LAST_NAMES[rng.randrange(len(LAST_NAMES))]
+                    n = staff_offset + i
+                    yield {
+                        "name": f"{first} {last}",
+                        "email": f"staff{n}@example.com",
+                        "phone": f"070{n:08d}",
+                        "role": role,
+                        "department": department,
+                        "staff_code": f"S{n:05d}",
+                        "gender": rng.choice(("male", "female")),
+                        "shift": rng.choice(("morning", "afternoon", "night")),
+                        "status": "active" if i < len(STAFF_ROLES) or rng.random() > 0.05 else "inactive",
+                        "salary": float(rng.randrange(80, 600) * 1000),
+                        "hired_at": start - timedelta(days=rng.randrange(2000)),
+                        "password_hash": hasher.hash(f"staff-{n}"),
+                        "created_at": now,
+                    }
+
+            count = 0
+            for batch in _chunks(staff(), chunk_size):
+                conn.execute(insert(StaffMember.__table__), batch)
+                count += len(batch)
+            written["staffmember"] = count
+
+            def guests():
+                for i in range(counts["guests"]):
+                    first = FIRST_NAMES[rng.randrange(len(FIRST_NAMES))]
+                    last = LAST_NAMES[rng.randrange(len(LAST_NAMES))]
+                    guest_name = f"{first} {last}"
+                    email = f"{first.lower()}.{last.lower()}.{i}@example.com"
+                    phone = f"081{i:08d}"
+                    yield {
+                        "guest_name": guest_name,
+                        "email": email,
+                        "phone": phone,
+                        **normalized_columns(guest_name, email, phone),
+                        "preferences": ",".join(rng.sample(("quiet room", "high floor", "late checkout",
+                                                            "extra pillows", "vegetarian"), rng.randint(0, 2))) or None,
+                        "created_at": now - timedelta(days=rng.randrange(days)),
+                    }
+
+            count = 0
+            for batch in _chunks(guests(), chunk_size):
+                conn.execute(insert(GuestProfile.__table__), batch)
+                count += len(batch)
+            written["guestprofile"] = count
+
+            housekeepers = [f"Housekeeper {i + 1}" for i in range(max(1, counts["staff"] // 10))]
+
+            def tasks():
+                for _ in range(counts["tasks"] if rooms else 0):
+                    room = rooms[rng.randrange(len(rooms))]
+                    created = now - timedelta(hours=rng.randrange(24 * 60))
+                    status = rng.choices(("completed", "in_progress", "pending"), weights=(0.85, 0.05, 0.10))[0]
+                    yield {
+                        "room_id": str(room["id"]),
+                        "room_number": room["name"].split(" ", 1)[1],
+                        "task_type": rng.choice(TASK_TYPES),
+                        "status": status,
+                        "priority": rng.choice(PRIORITIES),
+                        "assigned_to": rng.choice(housekeepers),
+                        "description": "Generated by seed.py",
+                        "created_at": created,
+                        "completed_at": created + timedelta(minutes=rng.randint(15, 90)) if status == "completed" else None,
+                    }
+
+            count = 0
+            for batch in _chunks(tasks(), chunk_size):
+                conn.execute(insert(HousekeepingTask.__table__), batch)
+                count += len(batch)
+            written["housekeepingtask"] = count
+
+            announcements = [
+                {
+                    "title": f"Notice {i + 1}",
+                    "message": "Synthetic announcement generated by seed.py",
+                    "audience": ("public", "staff", "all")[i % 3],
+                    "is_active": i % 4 != 0,
+                    "created_at": now - timedelta(days=i),
+                }
+                for i in range(30)
+            ]
+            conn.execute(insert(Announcement.__table__), announcements)
+            written["announcement"] = len(announcements)
+
+            # Rooms and bookings were given explicit ids above.
+            _sync_sequences(conn, (Room.__table__, Booking.__table__))
+    finally:
+        if is_sqlite:
+            event.remove(engine, "connect", _fast_sqlite)
+            engine.dispose()
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a Room Booker database with synthetic data")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small", help="Dataset preset")
+    for entity in ("rooms", "bookings", "staff", "guests", "tasks"):
+        parser.add_argument(f"--{entity}", type=int, help=f"Override the number of {entity}")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (same seed, same data)")
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2023, 1, 1), help="First arrival date")
+    parser.add_argument("--end", type=date.fromisoformat, default=date(2026, 12, 31), help="Last arrival date")
+    parser.add_argument("--hash-rounds", type=int, default=1000,
+                        help="PBKDF2 rounds for staff passwords (0 = production default)")
+    parser.add_argument("--chunk-size", type=int, default=50_000, help="Rows per bulk insert")
+    parser.add_argument("--wipe", action="store_true", help="Delete existing rows in the seeded tables first")
+    args = parser.parse_args()
+
+    counts = dict(SCALES[args.scale])
+    for entity in counts:
+        if getattr(args, entity) is not None:
+            counts[entity] = getattr(args, entity)
+
+    from app.db_core import init_db, engine
+
+    init_db()
+    started = time.perf_counter()
+    written = seed_database(
+        engine,
+        counts,
+        seed=args.seed,
+        start=args.start,
+        end=args.end,
+        hash_rounds=args.hash_rounds,
+        chunk_size=args.chunk_size,
+        wipe=args.wipe,
+    )
+    elapsed = time.perf_counter() - started
+    for table, n in written.items():
+        print(f"{table:<18} {n:>10,}")
+    print(f"Seeded {sum(written.values()):,} rows in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
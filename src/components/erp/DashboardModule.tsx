@@ -1,7 +1,7 @@
 import { useEffect, useState } from 'react';
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
-import { BedDouble, CalendarCheck, DollarSign, Users, TrendingUp, Sparkles } from 'lucide-react';
-import { erpReportSummary, erpListStaff, erpListHousekeeping, erpListCheckins, erpListRooms } from '@/lib/erp-api';
+import { BedDouble, CalendarCheck, DollarSign, Users, TrendingUp, Sparkles, LogIn, LogOut, CreditCard, Package } from 'lucide-react';
+import { erpDashboard, erpReportSummary, DashboardKpis } from '@/lib/erp-api';
 import { getERPToken } from '@/lib/erp-auth';
 
 const formatPrice = (price: number) =>
@@ -9,43 +9,35 @@ const formatPrice = (price: number) =>
 
 export function DashboardModule() {
   const [stats, setStats] = useState<any[]>([]);
-  const [pendingTasks, setPendingTasks] = useState(0);
-  const [inProgressTasks, setInProgressTasks] = useState(0);
-  const [completedTasks, setCompletedTasks] = useState(0);
-  const [todayCheckIns, setTodayCheckIns] = useState(0);
+  const [kpis, setKpis] = useState<DashboardKpis | null>(null);
 
   useEffect(() => {
     const token = getERPToken();
     if (!token) return;
-    Promise.all([
-      erpReportSummary(token),
-      erpListStaff(token),
-      erpListHousekeeping(token),
-      erpListCheckins(token),
-      erpListRooms(token),
-    ]).then(([report, staff, tasks, checkins, rooms]) => {
-      const activeStaff = staff.filter((s: any) => s.status === 'active').length;
-      const pending = tasks.filter((t: any) => t.status === 'pending').length;
-      const inProgress = tasks.filter((t: any) => t.status === 'in_progress').length;
-      const completed = tasks.filter((t: any) => t.status === 'completed').length;
-      const expected = checkins.filter((c: any) => c.status === 'expected').length;
-      setPendingTasks(pending);
-      setInProgressTasks(inProgress);
-      setCompletedTasks(completed);
-      setTodayCheckIns(expected);
-
-      const occupiedRooms = rooms.filter((r: any) => !r.is_available).length;
+    Promise.all([erpDashboard(token), erpReportSummary(token)]).then(([dashboard, report]) => {
+      setKpis(dashboard);
+      const openTasks = Object.values(dashboard.open_tasks_by_priority).reduce((sum, n) => sum + n, 0);
       setStats([
         { label: 'Estimated Revenue', value: formatPrice(report.estimated_revenue || 0), icon: DollarSign, color: 'text-green-600' },
         { label: 'Total Bookings', value: report.total_bookings || 0, icon: CalendarCheck, color: 'text-blue-600' },
-        { label: 'Occupancy Rate', value: `${((report.occupancy_rate || 0) * 100).toFixed(1)}%`, icon: TrendingUp, color: 'text-primary' },
-        { label: 'Occupied Rooms', value: `${occupiedRooms}/${rooms.length}`, icon: BedDouble, color: 'text-orange-600' },
-        { label: 'Active Staff', value: activeStaff, icon: Users, color: 'text-purple-600' },
-        { label: 'Pending Tasks', value: pending, icon: Sparkles, color: 'text-red-600' },
+        { label: 'Occupancy Tonight', value: `${(dashboard.occupancy_rate * 100).toFixed(1)}%`, icon: TrendingUp, color: 'text-primary' },
+        { label: 'Arrivals Today', value: dashboard.arrivals_today, icon: LogIn, color: 'text-blue-600' },
+        { label: 'Departures Today', value: dashboard.departures_today, icon: LogOut, color: 'text-blue-600' },
+        { label: 'In House', value: dashboard.in_house, icon: BedDouble, color: 'text-orange-600' },
+        { label: 'Pending Payments', value: dashboard.pending_payments, icon: CreditCard, color: 'text-yellow-600' },
+        { label: 'Dirty Rooms', value: dashboard.dirty_rooms, icon: Sparkles, color: 'text-red-600' },
+        { label: 'Low / Out of Stock', value: `${dashboard.low_stock_items} / ${dashboard.out_of_stock_items}`, icon: Package, color: 'text-red-600' },
+        ...(dashboard.active_staff !== undefined
+          ? [{ label: 'Active Staff', value: dashboard.active_staff, icon: Users, color: 'text-purple-600' }]
+          : []),
+        { label: 'Open Tasks', value: openTasks, icon: Sparkles, color: 'text-red-600' },
       ]);
     }).catch(() => undefined);
   }, []);
 
+  const tasksByStatus = kpis?.housekeeping_by_status ?? {};
+  const openByPriority = kpis?.open_tasks_by_priority ?? {};
+
   return (
     <div className="space-y-6">
       <div>
@@ -70,13 +62,15 @@ export function DashboardModule() {
       <div className="grid gap-4 lg:grid-cols-2">
         <Card>
           <CardHeader>
-            <CardTitle className="text-base">Expected Arrivals Today</CardTitle>
+            <CardTitle className="text-base">Open Tasks by Priority</CardTitle>
           </CardHeader>
-          <CardContent>
-            {todayCheckIns === 0 ? (
-              <p className="text-sm text-muted-foreground">No arrivals expected</p>
+          <CardContent className="space-y-1">
+            {Object.keys(openByPriority).length === 0 ? (
+              <p className="text-sm text-muted-foreground">No open tasks</p>
             ) : (
-              <p className="text-2xl font-bold text-primary">{todayCheckIns} guests</p>
+              Object.entries(openByPriority).map(([priority, count]) => (
+                <p key={priority} className="text-sm capitalize"><span className="font-medium">{count}</span> {priority}</p>
+              ))
             )}
           </CardContent>
         </Card>
@@ -85,9 +79,9 @@ export function DashboardModule() {
             <CardTitle className="text-base">Housekeeping Status</CardTitle>
           </CardHeader>
           <CardContent className="space-y-1">
-            <p className="text-sm"><span className="font-medium text-red-600">{pendingTasks}</span> pending</p>
-            <p className="text-sm"><span className="font-medium text-yellow-600">{inProgressTasks}</span> in progress</p>
-            <p className="text-sm"><span className="font-medium text-green-600">{completedTasks}</span> completed</p>
+            <p className="text-sm"><span className="font-medium text-red-600">{tasksByStatus.pending ?? 0}</span> pending</p>
+            <p className="text-sm"><span className="font-medium text-yellow-600">{tasksByStatus.in_progress ?? 0}</span> in progress</p>
+            <p className="text-sm"><span className="font-medium text-green-600">{tasksByStatus.completed ?? 0}</span> completed</p>
           </CardContent>
         </Card>
       </div>
@@ -18,6 +18,7 @@ type InventoryItem = {
   quantity: number;
   unit: string;
   status: string;
+  low_threshold: number;
   updated_at?: string;
 };
 
@@ -37,7 +38,7 @@ export function InventoryModule() {
   const { toast } = useToast();
   const [items, setItems] = useState<InventoryItem[]>([]);
   const [open, setOpen] = useState(false);
-  const [form, setForm] = useState({ name: "", category: "kitchen", quantity: "0", unit: "pcs", status: "available" });
+  const [form, setForm] = useState({ name: "", category: "kitchen", quantity: "0", unit: "pcs", low_threshold: "0" });
 
   const refresh = async () => {
     const token = getERPToken();
@@ -62,10 +63,10 @@ export function InventoryModule() {
       category: form.category,
       quantity: Number(form.quantity) || 0,
       unit: form.unit,
-      status: form.status,
+      low_threshold: Number(form.low_threshold) || 0,
     });
     toast({ title: "Inventory item added" });
-    setForm({ name: "", category: "kitchen", quantity: "0", unit: "pcs", status: "available" });
+    setForm({ name: "", category: "kitchen", quantity: "0", unit: "pcs", low_threshold: "0" });
     setOpen(false);
     refresh();
   };
@@ -112,17 +113,7 @@ export function InventoryModule() {
                     </SelectContent>
                   </Select>
                 </div>
-                <div>
-                  <Label>Status</Label>
-                  <Select value={form.status} onValueChange={v => setForm({ ...form, status: v })}>
-                    <SelectTrigger><SelectValue /></SelectTrigger>
-                    <SelectContent>
-                      {STATUS_OPTIONS.map(s => (
-                        <SelectItem key={s.value} value={s.value}>{s.label}</SelectItem>
-                      ))}
-                    </SelectContent>
-                  </Select>
-                </div>
+                <div><Label>Low Stock At</Label><Input type="number" value={form.low_threshold} onChange={e => setForm({ ...form, low_threshold: e.target.value })} /></div>
               </div>
               <div className="grid grid-cols-2 gap-3">
                 <div><Label>Quantity</Label><Input type="number" value={form.quantity} onChange={e => setForm({ ...form, quantity: e.target.value })} /></div>
@@ -162,16 +153,7 @@ export function InventoryModule() {
                       />
                     </TableCell>
                     <TableCell>{item.unit}</TableCell>
-                    <TableCell>
-                      <Select value={item.status} onValueChange={v => handleUpdate(item, { status: v })}>
-                        <SelectTrigger className="w-36"><SelectValue /></SelectTrigger>
-                        <SelectContent>
-                          {STATUS_OPTIONS.map(s => (
-                            <SelectItem key={s.value} value={s.value}>{s.label}</SelectItem>
-                          ))}
-                        </SelectContent>
-                      </Select>
-                    </TableCell>
+                    <TableCell>{STATUS_OPTIONS.find(s => s.value === item.status)?.label ?? item.status}</TableCell>
                     <TableCell>
                       <Button size="sm" variant="ghost" className="text-destructive" onClick={() => handleDelete(item.id)}>
                         <Trash2 className="h-4 w-4" />
@@ -8,12 +8,14 @@ import { Badge } from '@/components/ui/badge';
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '@/components/ui/select';
 import { Dialog, DialogContent, DialogHeader, DialogTitle, DialogTrigger } from '@/components/ui/dialog';
 import { useToast } from '@/hooks/use-toast';
-import { erpListStaff, erpCreateStaff, erpDeleteStaff, erpUpdateStaff, erpListStaffDocuments, erpAddStaffDocument, erpDeleteStaffDocument, erpResetStaffCode } from '@/lib/erp-api';
+import { erpListStaff, erpGetStaff, erpCreateStaff, erpDeleteStaff, erpUpdateStaff, erpListStaffDocuments, erpAddStaffDocument, erpDeleteStaffDocument, erpResetStaffCode } from '@/lib/erp-api';
 import { getERPToken } from '@/lib/erp-auth';
 import { uploadStaffDocument } from '@/lib/erp-upload';
 import { ROLE_OPTIONS, DEPARTMENT_OPTIONS, ROLE_LABELS, DEPARTMENT_LABELS, GENDER_OPTIONS, NIGERIA_STATES } from '@/lib/erp-constants';
 import { Plus, Trash2, Edit } from 'lucide-react';
 
+const STAFF_PAGE_SIZE = 100;
+
 const formatSalary = (s: number) => new Intl.NumberFormat('en-NG', { style: 'currency', currency: 'NGN', minimumFractionDigits: 0 }).format(s);
 
 type StaffMember = {
@@ -66,11 +68,23 @@ export function StaffModule() {
   const [detailsOpen, setDetailsOpen] = useState(false);
   const [detailsStaff, setDetailsStaff] = useState<StaffMember | null>(null);
 
-  const refresh = async () => {
+  const [staffPage, setStaffPage] = useState(1);
+  const [hasMoreStaff, setHasMoreStaff] = useState(false);
+  const [loadingStaff, setLoadingStaff] = useState(false);
+
+  const refresh = async (append = false) => {
     const token = getERPToken();
     if (!token) return;
-    const data = await erpListStaff(token);
-    setStaff(data as StaffMember[]);
+    setLoadingStaff(true);
+    try {
+      const page = append ? staffPage + 1 : 1;
+      const data = await erpListStaff(token, { fields: 'roster', page, page_size: STAFF_PAGE_SIZE });
+      setStaff(append ? [...staff, ...(data as StaffMember[])] : (data as StaffMember[]));
+      setStaffPage(page);
+      setHasMoreStaff(data.length === STAFF_PAGE_SIZE);
+    } finally {
+      setLoadingStaff(false);
+    }
   };
 
   useEffect(() => {
@@ -152,9 +166,17 @@ export function StaffModule() {
   };
 
   const statusColor = (s: string) => s === 'active' ? 'default' : s === 'on_leave' ? 'secondary' : 'destructive';
-  const openDetails = (member: StaffMember) => {
+  const openDetails = async (member: StaffMember) => {
+    // The roster rows only carry the list columns; show them while the full record loads.
     setDetailsStaff(member);
     setDetailsOpen(true);
+    const token = getERPToken();
+    if (!token) return;
+    try {
+      setDetailsStaff(await erpGetStaff(token, member.id));
+    } catch {
+      toast({ title: 'Failed to load staff details', variant: 'destructive' });
+    }
   };
 
   return (
@@ -340,6 +362,11 @@ export function StaffModule() {
               </TableBody>
             </Table>
           </div>
+          {hasMoreStaff && (
+            <Button variant="outline" className="mt-4" disabled={loadingStaff} onClick={() => refresh(true)}>
+              Load more
+            </Button>
+          )}
         </CardContent>
       </Card>
 
@@ -7,6 +7,12 @@
 
 const BACKEND_URL = import.meta.env.VITE_BACKEND_URL || 'http://localhost:8000';
 
+// Property (hotel) this site serves; the backend uses its default property when unset.
+// Signed-in requests carry the property in their token instead.
+const PROPERTY_HEADERS: Record<string, string> = import.meta.env.VITE_PROPERTY_ID
+  ? { 'X-Property-Id': import.meta.env.VITE_PROPERTY_ID }
+  : {};
+
 interface BookingPayload {
   name: string;
   email: string;
@@ -17,6 +23,21 @@ interface BookingPayload {
   payment_proof?: string | null;
 }
 
+interface BookingLookup {
+  id: number;
+  reference_number: string;
+  name: string;
+  email: string;
+  phone?: string | null;
+  room_type: string;
+  check_in: string;
+  check_out: string;
+  created_at: string;
+  status: string;
+  payment_status: string;
+  has_payment_proof: boolean;
+}
+
 interface ContactPayload {
   name: string;
   email: string;
@@ -57,7 +78,7 @@ interface PaymentAccountPayload {
 }
 
 export async function fetchPublicAnnouncements(): Promise<any[]> {
-  const response = await fetch(`${BACKEND_URL}/api/public/announcements`);
+  const response = await fetch(`${BACKEND_URL}/api/public/announcements`, { headers: PROPERTY_HEADERS });
   if (!response.ok) return [];
   return response.json();
 }
@@ -70,6 +91,7 @@ export async function submitBooking(booking: BookingPayload): Promise<{ message:
     method: 'POST',
     headers: {
       'Content-Type': 'application/json',
+      ...PROPERTY_HEADERS,
     },
     body: JSON.stringify(booking),
   });
@@ -82,8 +104,8 @@ export async function submitBooking(booking: BookingPayload): Promise<{ message:
   return response.json();
 }
 
-export async function fetchBookingByReference(reference: string): Promise<any> {
-  const response = await fetch(`${BACKEND_URL}/api/booking/reference/${reference}`);
+export async function fetchBookingByReference(reference: string): Promise<BookingLookup> {
+  const response = await fetch(`${BACKEND_URL}/api/booking/reference/${reference}`, { headers: PROPERTY_HEADERS });
   if (!response.ok) {
     const error = await response.json().catch(() => ({ detail: 'Not found' }));
     throw new Error(error.detail || 'Not found');
@@ -111,6 +133,50 @@ export async function submitContact(contact: ContactPayload): Promise<{ message:
   return response.json();
 }
 
+/**
+ * Price of a `nights`-night stay for each check-in day from `start` (month view)
+ */
+export async function fetchRateGrid(
+  roomType: string,
+  start: string,
+  days = 31,
+  nights = 1
+): Promise<{ room_type: string; start: string; nights: number; totals: number[] }> {
+  const params = new URLSearchParams({ room_type: roomType, start, days: String(days), nights: String(nights) });
+  const response = await fetch(`${BACKEND_URL}/api/public/rates/grid?${params}`, { headers: PROPERTY_HEADERS });
+
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({ detail: 'Unknown error' }));
+    throw new Error(error.detail || 'Failed to fetch rates');
+  }
+
+  return response.json();
+}
+
+/**
+ * Price several candidate stays of one room type in a single request
+ */
+export async function quoteStays(
+  roomType: string,
+  stays: { check_in: string; nights: number }[]
+): Promise<{ room_type: string; quotes: { check_in: string; check_out: string; nights: number; total: number }[] }> {
+  const response = await fetch(`${BACKEND_URL}/api/public/rates/quote`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      ...PROPERTY_HEADERS,
+    },
+    body: JSON.stringify({ room_type: roomType, stays }),
+  });
+
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({ detail: 'Unknown error' }));
+    throw new Error(error.detail || 'Quote failed');
+  }
+
+  return response.json();
+}
+
 /**
  * Admin login via FastAPI backend
  */
@@ -119,6 +185,7 @@ export async function adminLogin(email: string, password: string): Promise<Admin
     method: 'POST',
     headers: {
       'Content-Type': 'application/json',
+      ...PROPERTY_HEADERS,
     },
     body: JSON.stringify({ email, password }),
   });
@@ -152,8 +219,16 @@ export async function fetchAdminBookings(token: string): Promise<any[]> {
 /**
  * Fetch admin contact messages (requires authentication)
  */
-export async function fetchAdminMessages(token: string): Promise<any[]> {
-  const response = await fetch(`${BACKEND_URL}/api/admin/messages`, {
+export async function fetchAdminMessages(
+  token: string,
+  query: { folder?: 'inbox' | 'new' | 'read' | 'archived' | 'all'; limit?: number; before?: string; before_id?: number } = {}
+): Promise<any[]> {
+  const params = new URLSearchParams();
+  Object.entries(query).forEach(([key, value]) => {
+    if (value !== undefined && value !== null) params.set(key, String(value));
+  });
+  const qs = params.toString();
+  const response = await fetch(`${BACKEND_URL}/api/admin/messages${qs ? `?${qs}` : ''}`, {
     method: 'GET',
     headers: {
       'Authorization': `Bearer ${token}`,
@@ -167,6 +242,50 @@ export async function fetchAdminMessages(token: string): Promise<any[]> {
   return response.json();
 }
 
+/**
+ * Number of unread contact messages (requires authentication)
+ */
+export async function fetchUnreadMessageCount(token: string): Promise<number> {
+  const response = await fetch(`${BACKEND_URL}/api/admin/messages/unread-count`, {
+    method: 'GET',
+    headers: {
+      'Authorization': `Bearer ${token}`,
+    },
+  });
+
+  if (!response.ok) {
+    throw new Error('Failed to fetch unread count');
+  }
+
+  const data = await response.json();
+  return data.unread;
+}
+
+/**
+ * Mark a contact message new, read or archived (requires authentication)
+ */
+export async function updateAdminMessageStatus(
+  token: string,
+  messageId: number,
+  status: 'new' | 'read' | 'archived'
+): Promise<{ message: string; changed: number }> {
+  const response = await fetch(`${BACKEND_URL}/api/admin/messages/${messageId}`, {
+    method: 'PATCH',
+    headers: {
+      'Content-Type': 'application/json',
+      'Authorization': `Bearer ${token}`,
+    },
+    body: JSON.stringify({ status }),
+  });
+
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({ detail: 'Message update failed' }));
+    throw new Error(error.detail || 'Message update failed');
+  }
+
+  return response.json();
+}
+
 /**
  * Change admin password (requires authentication)
  */
@@ -314,8 +433,9 @@ export async function updatePaymentProof(
   if (!response.ok) throw new Error('Failed to update payment proof');
 }
 
-export async function fetchStaff(token: string): Promise<any[]> {
-  const response = await fetch(`${BACKEND_URL}/api/admin/staff`, {
+export async function fetchStaff(token: string, page = 1, pageSize = 100): Promise<any[]> {
+  const params = new URLSearchParams({ fields: 'directory', page: String(page), page_size: String(pageSize) });
+  const response = await fetch(`${BACKEND_URL}/api/admin/staff?${params.toString()}`, {
     method: 'GET',
     headers: { Authorization: `Bearer ${token}` },
   });
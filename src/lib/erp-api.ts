@@ -1,4 +1,6 @@
 const BACKEND_URL = import.meta.env.VITE_BACKEND_URL || "http://localhost:8000";
+// Property (hotel) to sign in to; the token then carries it (backend utils/tenancy).
+const PROPERTY_ID: string | undefined = import.meta.env.VITE_PROPERTY_ID;
 
 export type ERPLoginResponse = {
   access_token: string;
@@ -11,6 +13,7 @@ async function api<T>(path: string, token?: string, options: RequestInit = {}):
     ...(options.headers as Record<string, string> | undefined),
   };
   if (token) headers.Authorization = `Bearer ${token}`;
+  if (PROPERTY_ID) headers["X-Property-Id"] = PROPERTY_ID;
   const res = await fetch(`${BACKEND_URL}${path}`, { ...options, headers });
   if (!res.ok) {
     const err = await res.json().catch(() => ({ detail: "Request failed" }));
@@ -38,8 +41,26 @@ export function erpMe(token: string) {
   return api<{ email: string; role: string; name: string }>("/api/erp/me", token);
 }
 
-export function erpListStaff(token: string) {
-  return api<any[]>("/api/erp/staff", token);
+export type StaffDirectoryQuery = {
+  fields?: string;
+  department?: string;
+  role?: string;
+  status?: string;
+  page?: number;
+  page_size?: number;
+};
+
+export function erpListStaff(token: string, query: StaffDirectoryQuery = {}) {
+  const params = new URLSearchParams();
+  Object.entries(query).forEach(([key, value]) => {
+    if (value !== undefined && value !== "") params.set(key, String(value));
+  });
+  const qs = params.toString();
+  return api<any[]>(`/api/erp/staff${qs ? `?${qs}` : ""}`, token);
+}
+
+export function erpGetStaff(token: string, id: number) {
+  return api<any>(`/api/erp/staff/${id}`, token);
 }
 
 export function erpCreateStaff(token: string, payload: any) {
@@ -126,6 +147,10 @@ export function erpUpdateFloorplan(token: string, id: number, payload: any) {
   return api(`/api/erp/floorplan/${id}`, token, { method: "PUT", body: JSON.stringify(payload) });
 }
 
+export function erpBatchUpdateFloorplan(token: string, items: Array<{ id: number } & Record<string, any>>, rejectOverlaps = false) {
+  return api("/api/erp/floorplan", token, { method: "PATCH", body: JSON.stringify({ items, reject_overlaps: rejectOverlaps }) });
+}
+
 export function erpDeleteFloorplan(token: string, id: number) {
   return api(`/api/erp/floorplan/${id}`, token, { method: "DELETE" });
 }
@@ -142,6 +167,14 @@ export function erpUpdateInventory(token: string, id: number, payload: any) {
   return api(`/api/erp/inventory/${id}`, token, { method: "PUT", body: JSON.stringify(payload) });
 }
 
+export function erpAdjustInventory(token: string, id: number, delta: number, reason = "adjust", note?: string) {
+  return api(`/api/erp/inventory/${id}/adjust`, token, { method: "POST", body: JSON.stringify({ delta, reason, note }) });
+}
+
+export function erpInventoryMovements(token: string, id: number) {
+  return api<any[]>(`/api/erp/inventory/${id}/movements`, token);
+}
+
 export function erpDeleteInventory(token: string, id: number) {
   return api(`/api/erp/inventory/${id}`, token, { method: "DELETE" });
 }
@@ -182,6 +215,73 @@ export function erpUpdateRoom(token: string, roomId: number, payload: any) {
   return api(`/api/erp/rooms/${roomId}`, token, { method: "PUT", body: JSON.stringify(payload) });
 }
 
+export function erpListRateRules(token: string, roomType?: string) {
+  const qs = roomType ? `?room_type=${encodeURIComponent(roomType)}` : "";
+  return api<any[]>(`/api/erp/rate-rules${qs}`, token);
+}
+
+export function erpCreateRateRule(token: string, payload: any) {
+  return api("/api/erp/rate-rules", token, { method: "POST", body: JSON.stringify(payload) });
+}
+
+export function erpUpdateRateRule(token: string, id: number, payload: any) {
+  return api(`/api/erp/rate-rules/${id}`, token, { method: "PUT", body: JSON.stringify(payload) });
+}
+
+export function erpDeleteRateRule(token: string, id: number) {
+  return api(`/api/erp/rate-rules/${id}`, token, { method: "DELETE" });
+}
+
+export function erpRateCalendar(token: string, query: { start?: string; days?: number; nights?: number; room_type?: string } = {}) {
+  const params = new URLSearchParams();
+  Object.entries(query).forEach(([key, value]) => {
+    if (value !== undefined && value !== "") params.set(key, String(value));
+  });
+  const qs = params.toString();
+  return api<{ start: string; nights: number; rates: Record<string, number[]> }>(
+    `/api/erp/rates/calendar${qs ? `?${qs}` : ""}`,
+    token
+  );
+}
+
+export type OccupancyForecast = {
+  start: string;
+  days: number;
+  occupancy: number[];
+  room_types: Record<
+    string,
+    { rooms: number; on_the_books: number[]; forecast: number[]; occupancy: number[]; pace: number[] }
+  >;
+};
+
+export function erpOccupancyForecast(token: string, days = 30, roomType?: string) {
+  const params = new URLSearchParams({ days: String(days) });
+  if (roomType) params.set("room_type", roomType);
+  return api<OccupancyForecast>(`/api/erp/reports/forecast?${params}`, token);
+}
+
+export type DashboardKpis = {
+  date: string;
+  arrivals_today: number;
+  departures_today: number;
+  in_house: number;
+  pending_payments: number;
+  dirty_rooms: number;
+  housekeeping_by_status: Record<string, number>;
+  open_tasks_by_priority: Record<string, number>;
+  low_stock_items: number;
+  out_of_stock_items: number;
+  rooms_total: number;
+  rooms_unavailable: number;
+  booked_tonight: number;
+  occupancy_rate: number;
+  active_staff?: number;
+};
+
+export function erpDashboard(token: string) {
+  return api<DashboardKpis>("/api/erp/dashboard", token);
+}
+
 export function erpReportSummary(token: string) {
   return api<any>("/api/erp/reports/summary", token);
 }
@@ -201,3 +301,9 @@ export function erpAddStaffDocument(token: string, staffId: number, payload: any
 export function erpDeleteStaffDocument(token: string, staffId: number, docId: number) {
   return api(`/api/erp/staff/${staffId}/documents/${docId}`, token, { method: "DELETE" });
 }
+
+export type ERPBatchOperation = { op: string; id: number; data?: Record<string, any> };
+
+export function erpBatch(token: string, operations: ERPBatchOperation[]) {
+  return api<{ results: any[] }>("/api/erp/batch", token, { method: "POST", body: JSON.stringify({ operations }) });
+}
@@ -10,7 +10,14 @@ import { Tabs, TabsContent, TabsList, TabsTrigger } from '@/components/ui/tabs';
 import { Table, TableBody, TableCell, TableHead, TableHeader, TableRow } from '@/components/ui/table';
 import { useToast } from '@/hooks/use-toast';
 import { useAuth } from '@/hooks/useAuth';
-import { changeAdminPassword, fetchAdminBookings, fetchAdminMessages, updateAdminBookingStatus } from '@/lib/backend-api';
+import {
+  changeAdminPassword,
+  fetchAdminBookings,
+  fetchAdminMessages,
+  fetchUnreadMessageCount,
+  updateAdminBookingStatus,
+  updateAdminMessageStatus,
+} from '@/lib/backend-api';
 import { Loader2, LogOut, RefreshCcw, ShieldCheck, Mail, ClipboardList } from 'lucide-react';
 
 type AdminBooking = {
@@ -33,8 +40,11 @@ type AdminMessage = {
   email: string;
   message: string;
   created_at: string;
+  status: 'new' | 'read' | 'archived';
 };
 
+const MESSAGE_PAGE_SIZE = 50;
+
 const Admin = () => {
   const { toast } = useToast();
   const { token, user, signOut } = useAuth();
@@ -43,6 +53,9 @@ const Admin = () => {
   const [messages, setMessages] = useState<AdminMessage[]>([]);
   const [loading, setLoading] = useState(true);
   const [loadingMessages, setLoadingMessages] = useState(true);
+  const [unreadCount, setUnreadCount] = useState(0);
+  const [hasMoreMessages, setHasMoreMessages] = useState(false);
+  const [savingMessage, setSavingMessage] = useState<number | null>(null);
   const [currentPassword, setCurrentPassword] = useState('');
   const [newPassword, setNewPassword] = useState('');
   const [confirmPassword, setConfirmPassword] = useState('');
@@ -72,12 +85,22 @@ const Admin = () => {
     }
   };
 
-  const loadMessages = async () => {
+  const loadMessages = async (append = false) => {
     if (!token) return;
     setLoadingMessages(true);
     try {
-      const data = await fetchAdminMessages(token);
-      setMessages(data as AdminMessage[]);
+      const last = append ? messages[messages.length - 1] : undefined;
+      const [data, unread] = await Promise.all([
+        fetchAdminMessages(token, {
+          limit: MESSAGE_PAGE_SIZE,
+          before: last?.created_at,
+          before_id: last?.id,
+        }),
+        fetchUnreadMessageCount(token),
+      ]);
+      setMessages(append ? [...messages, ...(data as AdminMessage[])] : (data as AdminMessage[]));
+      setHasMoreMessages(data.length === MESSAGE_PAGE_SIZE);
+      setUnreadCount(unread);
     } catch (error) {
       toast({
         title: 'Failed to load messages',
@@ -140,6 +163,28 @@ const Admin = () => {
     }
   };
 
+  const handleMessageStatus = async (message: AdminMessage, status: 'read' | 'archived') => {
+    if (!token) return;
+    setSavingMessage(message.id);
+    try {
+      await updateAdminMessageStatus(token, message.id, status);
+      setMessages((current) =>
+        status === 'archived'
+          ? current.filter((m) => m.id !== message.id)
+          : current.map((m) => (m.id === message.id ? { ...m, status } : m))
+      );
+      setUnreadCount(await fetchUnreadMessageCount(token));
+    } catch (error) {
+      toast({
+        title: 'Update failed',
+        description: error instanceof Error ? error.message : 'Unknown error',
+        variant: 'destructive',
+      });
+    } finally {
+      setSavingMessage(null);
+    }
+  };
+
   useEffect(() => {
     if (!token) {
       navigate('/auth');
@@ -185,11 +230,11 @@ const Admin = () => {
             </Card>
             <Card>
               <CardHeader className="flex flex-row items-center justify-between">
-                <CardTitle className="text-base">Contact Messages</CardTitle>
+                <CardTitle className="text-base">Unread Messages</CardTitle>
                 <Mail className="h-4 w-4 text-muted-foreground" />
               </CardHeader>
               <CardContent className="text-3xl font-semibold">
-                {messages.length}
+                {unreadCount}
               </CardContent>
             </Card>
             <Card>
@@ -297,7 +342,7 @@ const Admin = () => {
                   <CardTitle>Contact Messages</CardTitle>
                 </CardHeader>
                 <CardContent>
-                  {loadingMessages ? (
+                  {loadingMessages && messages.length === 0 ? (
                     <div className="flex items-center gap-2 text-muted-foreground">
                       <Loader2 className="h-4 w-4 animate-spin" />
                       Loading messages...
@@ -313,21 +358,52 @@ const Admin = () => {
                           <TableHead>Email</TableHead>
                           <TableHead>Message</TableHead>
                           <TableHead>Created</TableHead>
+                          <TableHead>Actions</TableHead>
                         </TableRow>
                       </TableHeader>
                       <TableBody>
                         {messages.map((message) => (
-                          <TableRow key={message.id}>
+                          <TableRow key={message.id} className={message.status === 'new' ? 'font-medium' : undefined}>
                             <TableCell>{message.id}</TableCell>
                             <TableCell>{message.name}</TableCell>
                             <TableCell>{message.email}</TableCell>
                             <TableCell className="max-w-md whitespace-pre-wrap">{message.message}</TableCell>
                             <TableCell>{message.created_at}</TableCell>
+                            <TableCell className="space-x-2 whitespace-nowrap">
+                              {message.status === 'new' && (
+                                <Button
+                                  size="sm"
+                                  variant="outline"
+                                  disabled={savingMessage === message.id}
+                                  onClick={() => handleMessageStatus(message, 'read')}
+                                >
+                                  Mark Read
+                                </Button>
+                              )}
+                              <Button
+                                size="sm"
+                                variant="ghost"
+                                disabled={savingMessage === message.id}
+                                onClick={() => handleMessageStatus(message, 'archived')}
+                              >
+                                Archive
+                              </Button>
+                            </TableCell>
                           </TableRow>
                         ))}
                       </TableBody>
                     </Table>
                   )}
+                  {hasMoreMessages && (
+                    <Button
+                      variant="outline"
+                      className="mt-4"
+                      disabled={loadingMessages}
+                      onClick={() => loadMessages(true)}
+                    >
+                      Load more
+                    </Button>
+                  )}
                 </CardContent>
               </Card>
             </TabsContent>
@@ -31,6 +31,7 @@ import {
 import { Loader2, LogOut, RefreshCcw, Plus } from "lucide-react";
 
 const BACKEND_URL = import.meta.env.VITE_BACKEND_URL || "http://localhost:8000";
+const STAFF_PAGE_SIZE = 100;
 
 type Room = {
   id: number;
@@ -121,6 +122,8 @@ const AdminApp = () => {
   });
 
   const [staff, setStaff] = useState<Staff[]>([]);
+  const [staffPage, setStaffPage] = useState(1);
+  const [hasMoreStaff, setHasMoreStaff] = useState(false);
 
   const handleSignOut = async () => {
     await signOut();
@@ -178,12 +181,15 @@ const AdminApp = () => {
     }
   };
 
-  const loadStaff = async () => {
+  const loadStaff = async (append = false) => {
     if (!token) return;
     setLoadingStaff(true);
     try {
-      const data = await fetchStaff(token);
-      setStaff(data as Staff[]);
+      const page = append ? staffPage + 1 : 1;
+      const data = await fetchStaff(token, page, STAFF_PAGE_SIZE);
+      setStaff(append ? [...staff, ...(data as Staff[])] : (data as Staff[]));
+      setStaffPage(page);
+      setHasMoreStaff(data.length === STAFF_PAGE_SIZE);
     } catch (error) {
       toast({
         title: "Failed to load staff",
@@ -767,6 +773,16 @@ const AdminApp = () => {
                       </TableBody>
                     </Table>
                   )}
+                  {hasMoreStaff && (
+                    <Button
+                      variant="outline"
+                      className="mt-4"
+                      disabled={loadingStaff}
+                      onClick={() => loadStaff(true)}
+                    >
+                      Load more
+                    </Button>
+                  )}
                 </CardContent>
               </Card>
             </TabsContent>
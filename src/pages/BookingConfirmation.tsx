@@ -31,7 +31,7 @@ const BookingConfirmation = () => {
       .then(async (bookingData) => {
         setBooking(bookingData);
         if (bookingData) {
-          setProofUploaded(!!bookingData.payment_proof);
+          setProofUploaded(!!bookingData.has_payment_proof);
         }
       })
       .catch(console.error)